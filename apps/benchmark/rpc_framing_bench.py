@@ -0,0 +1,124 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Benchmark the message framing of the python RPC tracker and proxy.
+
+Compares the throughput of the previous recvall, which joins chunks of at
+most 1024 bytes, with the recv_into based one, and json messages with binary
+messages carrying a blob.
+"""
+import argparse
+import base64
+import json
+import socket
+import struct
+import threading
+import time
+
+from tvm.rpc import base
+
+
+def legacy_recvall(sock, nbytes):
+    """recvall before recv_into framing"""
+    res = []
+    nread = 0
+    while nread < nbytes:
+        chunk = sock.recv(min(nbytes - nread, 1024))
+        if not chunk:
+            raise IOError("connection reset")
+        nread += len(chunk)
+        res.append(chunk)
+    return b"".join(res)
+
+
+def legacy_sendjson(sock, data):
+    data = json.dumps(data)
+    sock.sendall(struct.pack("<i", len(data)))
+    sock.sendall(data.encode("utf-8"))
+
+
+def legacy_recvjson(sock):
+    size = struct.unpack("<i", legacy_recvall(sock, 4))[0]
+    return json.loads(legacy_recvall(sock, size).decode("utf-8"))
+
+
+def _transfer(send, recv, repeat):
+    """Run send in a thread and recv in the caller repeat times, return the seconds"""
+    server, client = socket.socketpair()
+    def _send():
+        for _ in range(repeat):
+            send(client)
+    thread = threading.Thread(target=_send)
+    tstart = time.time()
+    thread.start()
+    for _ in range(repeat):
+        recv(server)
+    cost = time.time() - tstart
+    thread.join()
+    server.close()
+    client.close()
+    return cost
+
+
+def bench_recvall(nbytes, repeat):
+    payload = b"x" * nbytes
+    def _send(sock):
+        sock.sendall(payload)
+    for name, func in [("legacy recvall", legacy_recvall), ("recvall", base.recvall)]:
+        cost = _transfer(_send, lambda sock, f=func: f(sock, nbytes), repeat)
+        print("%-24s %10.1f MB/s" % (name, nbytes * repeat / cost / 1e6))
+
+
+def bench_blob_message(nbytes, repeat):
+    blob = bytes(bytearray(range(256)) * (nbytes // 256))
+    def _legacy_send(sock):
+        legacy_sendjson(sock, ["upload", base64.b64encode(blob).decode("ascii")])
+    def _legacy_recv(sock):
+        base64.b64decode(legacy_recvjson(sock)[1])
+    cost = _transfer(_legacy_send, _legacy_recv, repeat)
+    print("%-24s %10.1f MB/s" % ("legacy json blob", nbytes * repeat / cost / 1e6))
+
+    cost = _transfer(lambda sock: base.sendmsg(sock, ["upload", blob], binary=True),
+                     lambda sock: base.recvmsg(sock, binary=True), repeat)
+    print("%-24s %10.1f MB/s" % ("binary blob", nbytes * repeat / cost / 1e6))
+
+
+def bench_small_message(repeat):
+    msg = [base.TrackerCode.REQUEST, "rasp3b", "user", 1]
+    for name, send, recv in [
+            ("legacy json message", legacy_sendjson, legacy_recvjson),
+            ("json message", base.sendjson, base.recvjson),
+            ("binary message", lambda sock, x: base.sendmsg(sock, x, True),
+             lambda sock: base.recvmsg(sock, True))]:
+        cost = _transfer(lambda sock, f=send: f(sock, msg), recv, repeat)
+        print("%-24s %10.1f kmsg/s" % (name, repeat / cost / 1e3))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=64 << 20,
+                        help="The number of bytes of each transfer")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="The number of large transfers")
+    parser.add_argument("--messages", type=int, default=100000,
+                        help="The number of small messages")
+    args = parser.parse_args()
+
+    print("--------------------------------------------------")
+    bench_recvall(args.size, args.repeat)
+    bench_blob_message(args.size, args.repeat)
+    bench_small_message(args.messages)
+    print("--------------------------------------------------")
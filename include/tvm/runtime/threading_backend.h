@@ -76,9 +76,13 @@ class ThreadGroup {
    *        `worker_callback` will only be called for values >= 1. This
    *        allows use of the main thread as a worker.
    *
+   * \param cpus The ids of the cores to bind the threads to, overriding mode.
+   *        Threads are assigned to them round robin (empty = choose by mode).
+   *
    * \return The number of workers to use.
    */
-  int Configure(AffinityMode mode, int nthreads, bool exclude_worker0);
+  int Configure(AffinityMode mode, int nthreads, bool exclude_worker0,
+                const std::vector<unsigned int>& cpus = {});
 
  private:
   Impl* impl_;
@@ -0,0 +1,488 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# pylint: disable=invalid-name
+"""Indexed, append-only binary store of tuning records.
+
+The json log format of :any:`autotvm.record` has to be fully parsed before
+any record can be used. This module stores records in a length-prefixed
+binary data file and keeps a sidecar index next to it:
+
+* ``<filename>``: magic header followed by ``<u64 length><payload>`` records.
+  A payload holds the measure result (error_no, all_cost, timestamp, costs)
+  followed by the json encoded input and config of the record.
+* ``<filename>.idx``: magic header followed by fixed-size entries
+  (offset, size, input id, error_no, mean cost, timestamp). The whole index
+  is loaded as one numpy structured array, i.e. costs and timestamps are
+  available as columns without touching the data file.
+* ``<filename>.keys``: the table of distinct inputs (target, task name, args)
+  referenced by the index entries.
+
+Best records are looked up by (target key, workload) or (model, workload),
+and only the selected record is decoded.
+"""
+
+import json
+import logging
+import os
+import struct
+
+import numpy as np
+
+from .. import __version__
+from .. import target as _target
+from . import task
+from .task import ConfigEntity
+from .measure import MeasureInput, MeasureResult
+from .record import AUTOTVM_LOG_VERSION, clean_json_to_python
+
+logger = logging.getLogger('autotvm')
+
+BINARY_RECORD_MAGIC = b"TVMREC\x00\x01"
+_INDEX_MAGIC = b"TVMIDX\x00\x01"
+_KEYS_MAGIC = b"TVMKEY\x00\x01"
+
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+# error_no, all_cost, timestamp, number of costs
+_RESULT_HEADER = struct.Struct("<iddI")
+
+_INDEX_DTYPE = np.dtype([("offset", "<u8"), ("size", "<u4"), ("input", "<u4"),
+                         ("error_no", "<i4"), ("cost", "<f8"), ("timestamp", "<f8")])
+
+
+def is_binary_record_file(filename):
+    """Check whether a file is a binary tuning record file.
+
+    Parameters
+    ----------
+    filename: str
+        The file to check
+
+    Returns
+    -------
+    ret: bool
+        True if the file starts with the binary record magic.
+    """
+    if not isinstance(filename, str) or not os.path.isfile(filename):
+        return False
+    with open(filename, "rb") as f:
+        return f.read(len(BINARY_RECORD_MAGIC)) == BINARY_RECORD_MAGIC
+
+
+def _encode_payload(inp, result):
+    """Encode a record pair to the binary payload and its json encoded input"""
+    input_json = json.dumps((str(inp.target), inp.task.name,
+                             inp.task.args, inp.task.kwargs)).encode()
+    config_json = json.dumps(inp.config.to_json_dict()).encode()
+    costs = result.costs if result.error_no == 0 else (1e9,)
+    return (_RESULT_HEADER.pack(result.error_no, result.all_cost,
+                                result.timestamp, len(costs)) +
+            struct.pack("<%dd" % len(costs), *costs) +
+            _U32.pack(len(input_json)) + input_json +
+            _U32.pack(len(config_json)) + config_json), input_json
+
+
+def _decode_payload(payload):
+    """Split a binary payload into result fields and the raw input/config json"""
+    error_no, all_cost, timestamp, n_costs = _RESULT_HEADER.unpack_from(payload, 0)
+    pos = _RESULT_HEADER.size
+    costs = struct.unpack_from("<%dd" % n_costs, payload, pos)
+    pos += 8 * n_costs
+    (n,) = _U32.unpack_from(payload, pos)
+    input_json = payload[pos + 4: pos + 4 + n]
+    pos += 4 + n
+    (n,) = _U32.unpack_from(payload, pos)
+    config_json = payload[pos + 4: pos + 4 + n]
+    return error_no, all_cost, timestamp, costs, input_json, config_json
+
+
+class BinaryRecordStore(object):
+    """An append-only binary store of tuning records with a workload index.
+
+    Records are appended with :any:`append` and can be read back in order by
+    iterating over the store. :any:`best_by_targetkey` and :any:`best_by_model`
+    decode only the best record of the queried workload.
+
+    The store supports a single writer. Partially written records, e.g. after
+    the writer was killed, are dropped when the store is opened again.
+
+    Parameters
+    ----------
+    filename: str
+        The data file. It is created on the first append if it does not exist.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.index_file = filename + ".idx"
+        self.keys_file = filename + ".keys"
+
+        self._input_json = []    # raw json of each distinct input
+        self._input_ids = {}     # raw json -> input id
+        self._inputs = []        # (target str, workload) of each input, parsed lazily
+        self._targets = {}       # target str -> Target
+        self._index = np.zeros(0, dtype=_INDEX_DTYPE)
+        self._pending = []       # index entries not yet merged into self._index
+        self._best_by_targetkey = None
+        self._best_by_model = None
+
+        self._data_end = len(BINARY_RECORD_MAGIC)
+        self._reader = None
+        self._data_out = self._index_out = self._keys_out = None
+
+        if os.path.isfile(filename):
+            if not is_binary_record_file(filename):
+                raise ValueError("%s is not a binary tuning record file" % filename)
+            self._load_index()
+
+    def __len__(self):
+        return len(self._index) + len(self._pending)
+
+    def __iter__(self):
+        """Yield all (MeasureInput, MeasureResult) pairs in insertion order"""
+        for offset in self.entries()["offset"]:
+            yield self._read(int(offset))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, ptype, value, trace):
+        self.close()
+
+    def entries(self):
+        """Get the index of the store as a numpy structured array.
+
+        Returns
+        -------
+        entries: numpy.ndarray
+            One row per record with the fields offset, size, input, error_no,
+            cost (mean of the costs) and timestamp.
+        """
+        if self._pending:
+            self._index = np.concatenate(
+                [self._index, np.array(self._pending, dtype=_INDEX_DTYPE)])
+            self._pending = []
+        return self._index
+
+    def append(self, inp, result):
+        """Append a record pair to the store.
+
+        Parameters
+        ----------
+        inp: autotvm.measure.MeasureInput
+        result: autotvm.measure.MeasureResult
+        """
+        # Same as load_from_file, records with an empty config are useless
+        if not inp.config._entity_map:
+            return
+        self._open_writers()
+        payload, input_json = _encode_payload(inp, result)
+        input_id, new_key = self._add_input(input_json)
+        if new_key:
+            self._keys_out.write(_U32.pack(len(input_json)) + input_json)
+
+        offset = self._data_end
+        self._data_out.write(_U64.pack(len(payload)) + payload)
+        self._data_end += _U64.size + len(payload)
+
+        cost = np.mean(result.costs) if result.error_no == 0 else 1e9
+        entry = (offset, _U64.size + len(payload), input_id,
+                 result.error_no, cost, result.timestamp)
+        self._index_out.write(np.array([entry], dtype=_INDEX_DTYPE).tobytes())
+        self._pending.append(entry)
+        self._best_by_targetkey = self._best_by_model = None
+
+    def flush(self):
+        """Flush appended records to disk. The data file is flushed before its index."""
+        for f in (self._data_out, self._keys_out, self._index_out):
+            if f is not None:
+                f.flush()
+
+    def close(self):
+        """Flush and close all file handles"""
+        self.flush()
+        for f in (self._data_out, self._keys_out, self._index_out, self._reader):
+            if f is not None:
+                f.close()
+        self._data_out = self._keys_out = self._index_out = self._reader = None
+
+    def best_by_targetkey(self, target_key, workload):
+        """Get the best valid record for a target key and a workload.
+
+        Parameters
+        ----------
+        target_key: str
+            A key of the target, e.g. "cpu"
+        workload: tuple
+            The workload of the task
+
+        Returns
+        -------
+        ret: tuple of (MeasureInput, MeasureResult) or None
+        """
+        if self._best_by_targetkey is None:
+            self._build_best_tables()
+        row = self._best_by_targetkey.get((target_key, workload))
+        return None if row is None else self._read(int(self._index["offset"][row]))
+
+    def best_by_model(self, model, workload):
+        """Get the best valid record for a target model and a workload.
+
+        Parameters
+        ----------
+        model: str
+            The model of the target
+        workload: tuple
+            The workload of the task
+
+        Returns
+        -------
+        ret: tuple of (MeasureInput, MeasureResult) or None
+        """
+        if self._best_by_model is None:
+            self._build_best_tables()
+        row = self._best_by_model.get((model, workload))
+        return None if row is None else self._read(int(self._index["offset"][row]))
+
+    def _add_input(self, input_json):
+        input_id = self._input_ids.get(input_json)
+        if input_id is not None:
+            return input_id, False
+        input_id = len(self._input_json)
+        self._input_ids[input_json] = input_id
+        self._input_json.append(input_json)
+        self._inputs.append(None)
+        return input_id, True
+
+    def _get_input(self, input_id):
+        """Get the target and the workload of an input"""
+        if self._inputs[input_id] is None:
+            tgt, task_name, task_args, _ = json.loads(self._input_json[input_id])
+            tgt = str(tgt)
+            if tgt not in self._targets:
+                self._targets[tgt] = _target.create(tgt)
+            workload = (clean_json_to_python(task_name),) + clean_json_to_python(task_args)
+            self._inputs[input_id] = (self._targets[tgt], workload)
+        return self._inputs[input_id]
+
+    def _build_best_tables(self):
+        """Select the best record of every input with numpy, then merge inputs by target"""
+        index = self.entries()
+        self._best_by_targetkey, self._best_by_model = {}, {}
+        rows = np.where(index["error_no"] == 0)[0]
+        if not rows.size:
+            return
+        # stable sort by (input, cost), the first row of each input is its best record
+        rows = rows[np.lexsort((index["cost"][rows], index["input"][rows]))]
+        inputs = index["input"][rows]
+        first = np.concatenate([[True], inputs[1:] != inputs[:-1]])
+
+        def _update(table, key, row):
+            other = table.get(key)
+            if other is None or (index["cost"][other], other) > (index["cost"][row], row):
+                table[key] = row
+
+        for row in rows[first]:
+            tgt, workload = self._get_input(int(index["input"][row]))
+            for k in tgt.keys:
+                _update(self._best_by_targetkey, (k, workload), row)
+            if tgt.model != 'unknown':
+                _update(self._best_by_model, (tgt.model, workload), row)
+
+    def _read(self, offset):
+        """Decode the record at an offset of the data file"""
+        if self._reader is None:
+            self._reader = open(self.filename, "rb")
+        self.flush()
+        self._reader.seek(offset)
+        (size,) = _U64.unpack(self._reader.read(_U64.size))
+        error_no, all_cost, timestamp, costs, input_json, config_json = \
+            _decode_payload(self._reader.read(size))
+
+        input_id, _ = self._add_input(input_json)
+        tgt, workload = self._get_input(input_id)
+        tsk = task.Task(workload[0], workload[1:])
+        config = ConfigEntity.from_json_dict(json.loads(config_json))
+        result = MeasureResult(costs, error_no, all_cost, timestamp)
+        config.cost = np.mean(costs)
+        return MeasureInput(tgt, tsk, config), result
+
+    def _load_index(self):
+        """Load the sidecar index and catch up with records missing from it"""
+        valid_keys, valid_index = len(_KEYS_MAGIC), len(_INDEX_MAGIC)
+        if os.path.isfile(self.keys_file) and os.path.isfile(self.index_file):
+            with open(self.keys_file, "rb") as f:
+                data = f.read()
+            pos = len(_KEYS_MAGIC) if data.startswith(_KEYS_MAGIC) else len(data)
+            while pos + _U32.size <= len(data):
+                (n,) = _U32.unpack_from(data, pos)
+                if pos + _U32.size + n > len(data):
+                    break
+                self._add_input(data[pos + _U32.size: pos + _U32.size + n])
+                pos += _U32.size + n
+            valid_keys = max(pos, valid_keys)
+
+            with open(self.index_file, "rb") as f:
+                data = f.read()
+            if data.startswith(_INDEX_MAGIC):
+                n = (len(data) - len(_INDEX_MAGIC)) // _INDEX_DTYPE.itemsize
+                index = np.frombuffer(data, dtype=_INDEX_DTYPE, count=n,
+                                      offset=len(_INDEX_MAGIC)).copy()
+                if n and int(index["input"].max()) >= len(self._input_json):
+                    logger.warning("Index of %s is inconsistent, rebuilding it", self.filename)
+                    index = index[:0]
+                    self._input_json, self._input_ids, self._inputs = [], {}, []
+                    valid_keys = len(_KEYS_MAGIC)
+                self._index = index
+                valid_index = len(_INDEX_MAGIC) + len(index) * _INDEX_DTYPE.itemsize
+            # the index may be ahead of a data file that was not completely flushed
+            covered = self._index["offset"] + self._index["size"]
+            if len(covered) and int(covered[-1]) > os.path.getsize(self.filename):
+                self._index = self._index[covered <= os.path.getsize(self.filename)]
+                valid_index = len(_INDEX_MAGIC) + len(self._index) * _INDEX_DTYPE.itemsize
+            if len(self._index):
+                last = self._index[-1]
+                self._data_end = int(last["offset"]) + int(last["size"])
+
+        # scan the tail of the data file which is not covered by the index
+        new_keys, new_entries = [], []
+        data_size = os.path.getsize(self.filename)
+        with open(self.filename, "rb") as f:
+            f.seek(self._data_end)
+            while self._data_end + _U64.size <= data_size:
+                (size,) = _U64.unpack(f.read(_U64.size))
+                if self._data_end + _U64.size + size > data_size:
+                    break
+                error_no, _, timestamp, costs, input_json, _ = _decode_payload(f.read(size))
+                input_id, new_key = self._add_input(input_json)
+                if new_key:
+                    new_keys.append(input_json)
+                cost = np.mean(costs) if error_no == 0 else 1e9
+                new_entries.append((self._data_end, _U64.size + size, input_id,
+                                    error_no, cost, timestamp))
+                self._data_end += _U64.size + size
+
+        if new_entries:
+            logger.debug("Index %d records missing from the index of %s",
+                         len(new_entries), self.filename)
+        self._pending = new_entries
+        self._repair(data_size, valid_keys, valid_index, new_keys, new_entries)
+
+    def _repair(self, data_size, valid_keys, valid_index, new_keys, new_entries):
+        """Drop partially written tails and persist the entries found by the scan"""
+        if data_size == self._data_end and not new_entries and \
+                os.path.isfile(self.index_file) and os.path.isfile(self.keys_file) and \
+                os.path.getsize(self.index_file) == valid_index and \
+                os.path.getsize(self.keys_file) == valid_keys:
+            return
+        try:
+            if data_size != self._data_end:
+                with open(self.filename, "r+b") as f:
+                    f.truncate(self._data_end)
+            for path, magic, valid in ((self.keys_file, _KEYS_MAGIC, valid_keys),
+                                       (self.index_file, _INDEX_MAGIC, valid_index)):
+                mode = "r+b" if os.path.isfile(path) else "wb"
+                with open(path, mode) as f:
+                    f.seek(0)
+                    f.write(magic)
+                    f.truncate(valid)
+            with open(self.keys_file, "ab") as f:
+                for input_json in new_keys:
+                    f.write(_U32.pack(len(input_json)) + input_json)
+            with open(self.index_file, "ab") as f:
+                f.write(np.array(new_entries, dtype=_INDEX_DTYPE).tobytes())
+        except (IOError, OSError) as err:
+            # a read-only store can still be used, the index is rebuilt in memory
+            logger.debug("Cannot update the index of %s: %s", self.filename, err)
+
+    def _open_writers(self):
+        if self._data_out is not None:
+            return
+        if not os.path.isfile(self.filename):
+            with open(self.filename, "wb") as f:
+                f.write(BINARY_RECORD_MAGIC)
+            self._repair(len(BINARY_RECORD_MAGIC), len(_KEYS_MAGIC), len(_INDEX_MAGIC), [], [])
+        self._data_out = open(self.filename, "ab")
+        self._keys_out = open(self.keys_file, "ab")
+        self._index_out = open(self.index_file, "ab")
+
+
+def convert_json_to_binary(in_file, out_file):
+    """Convert a json log file to a binary record file.
+    Records are appended if out_file already exists.
+
+    Parameters
+    ----------
+    in_file: str
+        The json log file
+    out_file: str
+        The binary record file
+    """
+    # pylint: disable=import-outside-toplevel
+    from .record import load_from_file
+    with BinaryRecordStore(out_file) as store:
+        for inp, res in load_from_file(in_file):
+            store.append(inp, res)
+
+
+def convert_binary_to_json(in_file, out_file):
+    """Convert a binary record file to a json (version 0.2) log file.
+
+    Parameters
+    ----------
+    in_file: str
+        The binary record file
+    out_file: str or file
+        The json log file
+    """
+    fout = open(out_file, 'w') if isinstance(out_file, str) else out_file
+    for row in iter_json_rows(in_file):
+        fout.write(row + "\n")
+    if isinstance(out_file, str):
+        fout.close()
+
+
+def iter_json_rows(in_file):
+    """Generator: the records of a binary record file as json (version 0.2) log rows,
+    without creating the records.
+
+    Parameters
+    ----------
+    in_file: str
+        The binary record file
+
+    Yields
+    ------
+    row: str
+        A row of a json log file, without the newline
+    """
+    store = BinaryRecordStore(in_file)
+    try:
+        with open(in_file, "rb") as f:
+            for offset in store.entries()["offset"]:
+                f.seek(int(offset))
+                (size,) = _U64.unpack(f.read(_U64.size))
+                error_no, all_cost, timestamp, costs, input_json, config_json = \
+                    _decode_payload(f.read(size))
+                yield json.dumps({
+                    "input": json.loads(input_json),
+                    "config": json.loads(config_json),
+                    "result": (costs, error_no, all_cost, timestamp),
+                    "version": AUTOTVM_LOG_VERSION,
+                    "tvm_version": __version__
+                })
+    finally:
+        store.close()
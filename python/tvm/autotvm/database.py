@@ -20,6 +20,8 @@ Database of MeasureInput/MeasureResult pair.
 This can be used for replaying measurement.
 """
 import os
+import sqlite3
+import threading
 
 from .record import encode, decode, measure_str_key
 
@@ -60,6 +62,36 @@ class Database(object):
         """
         raise NotImplementedError()
 
+    def load_batch(self, inputs, get_all=False):
+        """
+        Load the results of a batch of inputs
+
+        Parameters
+        ----------
+        inputs: Array of MeasureInput
+            the inputs to look up
+        get_all: bool, optional
+            Whether the latest result (or all matching results) should be returned
+
+        Returns
+        -------
+        results: Array of MeasureResult
+            the result of each input as returned by load
+        """
+        return [self.load(inp, get_all) for inp in inputs]
+
+    def save_batch(self, records):
+        """
+        Save a batch of results, extending the existing results
+
+        Parameters
+        ----------
+        records: Array of tuple (MeasureInput, MeasureResult)
+            the records to save
+        """
+        for inp, res in records:
+            self.save(inp, res, extend=True)
+
 
 def filter_inputs(db, measure_inputs, retry=False):
     """
@@ -83,8 +115,7 @@ def filter_inputs(db, measure_inputs, retry=False):
     """
     partial_results = list()
     unsaved = list()
-    for inp in measure_inputs:
-        res = db.load(inp)
+    for inp, res in zip(measure_inputs, db.load_batch(measure_inputs)):
         if res is None or (retry and res.error_no != 0):
             unsaved.append(inp)
             partial_results.append(None)
@@ -198,3 +229,191 @@ class DummyDatabase(RedisDatabase):
 
     def flush(self):
         self.db = {}
+
+
+class SQLiteDatabase(Database):
+    """
+    Record database in a local SQLite file.
+
+    Every measurement is a row indexed by its key, and by target, task name
+    and workload for queries. Saving only inserts rows, and saving the same
+    measurement (same key and timestamp) again is ignored. The file is opened
+    in WAL mode, so it can be shared by several tuning processes on one host.
+
+    Parameters
+    ----------
+    path: str
+        The path of the database file
+    timeout: float, optional
+        The seconds to wait for the lock of another process writing to the file
+    """
+    _SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS records ("
+        "id INTEGER PRIMARY KEY, key TEXT NOT NULL, target TEXT NOT NULL, "
+        "task_name TEXT NOT NULL, workload TEXT NOT NULL, cost REAL, "
+        "error_no INTEGER NOT NULL, timestamp REAL NOT NULL, record TEXT NOT NULL)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS records_key ON records (key, timestamp)",
+        "CREATE INDEX IF NOT EXISTS records_workload "
+        "ON records (target, task_name, workload, cost)",
+        "CREATE INDEX IF NOT EXISTS records_task ON records (task_name, cost)",
+    ]
+    # sqlite limits the number of parameters of a statement
+    _MAX_PARAMS = 500
+
+    def __init__(self, path, timeout=60.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            for stmt in SQLiteDatabase._SCHEMA:
+                conn.execute(stmt)
+
+    def _conn(self):
+        """Get the connection of the current thread, a connection
+        cannot be shared by threads or inherited by a forked process"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _row(inp, res):
+        cost = min(res.costs) if res.error_no == 0 and res.costs else None
+        return (measure_str_key(inp), str(inp.target), inp.task.name,
+                str(inp.task.workload), cost, res.error_no, res.timestamp, encode(inp, res))
+
+    @staticmethod
+    def _decode_rows(rows):
+        records = (decode(row[0]) for row in rows)
+        return [rec for rec in records if rec is not None]
+
+    def load(self, inp, get_all=False):
+        return self.load_batch([inp], get_all)[0]
+
+    def load_batch(self, inputs, get_all=False):
+        keys = [measure_str_key(inp) for inp in inputs]
+        found = {}
+        conn = self._conn()
+        unique_keys = list(set(keys))
+        for i in range(0, len(unique_keys), SQLiteDatabase._MAX_PARAMS):
+            batch = unique_keys[i:i + SQLiteDatabase._MAX_PARAMS]
+            rows = conn.execute(
+                "SELECT key, record FROM records WHERE key IN (%s) ORDER BY timestamp, id"
+                % ",".join("?" * len(batch)), batch).fetchall()
+            for key, record in rows:
+                rec = decode(record)
+                if rec is not None:
+                    found.setdefault(key, []).append(rec[1])
+
+        results = []
+        for key in keys:
+            if key not in found:
+                results.append(None)
+            elif get_all:
+                results.append(found[key])
+            else:
+                results.append(found[key][-1])
+        return results
+
+    def save(self, inp, res, extend=False):
+        conn = self._conn()
+        with conn:
+            if not extend:
+                conn.execute("DELETE FROM records WHERE key = ?", (measure_str_key(inp),))
+            conn.execute("INSERT OR IGNORE INTO records (key, target, task_name, workload, "
+                         "cost, error_no, timestamp, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         SQLiteDatabase._row(inp, res))
+
+    def save_batch(self, records):
+        """
+        Append a batch of records in one transaction
+
+        Parameters
+        ----------
+        records: Array of tuple (MeasureInput, MeasureResult)
+            the records to save
+        """
+        conn = self._conn()
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO records (key, target, task_name, workload, "
+                             "cost, error_no, timestamp, record) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             [SQLiteDatabase._row(inp, res) for inp, res in records])
+
+    def load_best(self, target=None, task_name=None, workload=None, k=1):
+        """
+        Get the k fastest valid records
+
+        Parameters
+        ----------
+        target: str or Target, optional
+            only the records of this target
+        task_name: str, optional
+            only the records of this task
+        workload: tuple, optional
+            only the records of this workload, see Task.workload
+        k: int, optional
+            the number of records
+
+        Returns
+        -------
+        list of records in tuple (MeasureInput, MeasureResult) sorted by cost
+        """
+        conds, params = ["error_no = 0"], []
+        for column, value in (("target", target), ("task_name", task_name),
+                              ("workload", workload)):
+            if value is not None:
+                conds.append("%s = ?" % column)
+                params.append(str(value))
+        rows = self._conn().execute(
+            "SELECT record FROM records WHERE %s ORDER BY cost, id LIMIT ?"
+            % " AND ".join(conds), params + [k]).fetchall()
+        return SQLiteDatabase._decode_rows(rows)
+
+    def filter(self, func):
+        """
+        Dump all of the records that match the given rule
+
+        Parameters
+        ----------
+        func: callable
+            The signature of the function is (MeasureInput, [MeasureResult]) -> bool
+
+        Returns
+        -------
+        list of records in tuple (MeasureInput, MeasureResult) matching the rule,
+        with the latest result of each input
+        """
+        matched_records = list()
+        results = {}
+        rows = self._conn().execute("SELECT key, record FROM records ORDER BY key, timestamp, id")
+        for key, record in rows:
+            rec = decode(record)
+            if rec is not None:
+                results.setdefault(key, []).append(rec)
+        for records in results.values():
+            inp = records[0][0]
+            ress = [rec[1] for rec in records]
+            if func(inp, ress):
+                matched_records.append((inp, ress[-1]))
+        return matched_records
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def flush(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM records")
+
+    def close(self):
+        """Close the connection of the current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
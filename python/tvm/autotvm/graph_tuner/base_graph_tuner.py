@@ -488,6 +488,65 @@ class BaseGraphTuner(object):
         self._iterate_layout_transform(self._create_matrix_callback)
         self._logger.info("Benchmarking layout transformation successful.")
 
+    def _prune_dominated_candidates(self):
+        """Remove the schedule candidates dominated by another candidate of the same node.
+
+        Candidate a of a node is dominated by candidate b if b is not slower than a,
+        and no layout transformation between b and any candidate of a neighbor node is
+        slower than the one between a and that candidate. Replacing a with b never
+        increases the total time, so a can be removed without losing the optimum.
+        Nodes sharing a candidate list, i.e. nodes with the same workload and
+        elemwise-like nodes with their first input, keep the same candidates.
+
+        Returns
+        -------
+        num_candidates : dict of int to int
+            The number of candidates of each node before pruning.
+        """
+        groups = {}
+        for idx in self._in_nodes_dict:
+            node_entry = self._node_list[idx]
+            if "record_candidates" in node_entry:
+                groups.setdefault(id(node_entry["record_candidates"]), []).append(idx)
+        num_candidates = {idx: len(self._node_list[idx]["record_candidates"])
+                          for group in groups.values() for idx in group}
+
+        for group in groups.values():
+            candidates = self._node_list[group[0]]["record_candidates"]
+            if len(candidates) <= 1:
+                continue
+            # the features of a candidate are its time, and the layout transformation
+            # times from and to all candidates of all neighbors
+            features = [np.array([[record[1].costs[0]] for record in candidates])]
+            edges = []
+            for key, cost in self._layout_transform_interlayer_cost.items():
+                if key[0] in group:
+                    features.append(np.array(cost))
+                    edges.append((key, 0))
+                if key[1] in group:
+                    features.append(np.array(cost).T)
+                    edges.append((key, 1))
+            features = np.concatenate(features, axis=1)
+
+            keep = []
+            for i in np.argsort(features[:, 0], kind="stable"):
+                if not any(np.all(features[j] <= features[i]) for j in keep):
+                    keep.append(i)
+            if len(keep) == len(candidates):
+                continue
+            keep.sort()
+            candidates[:] = [candidates[i] for i in keep]
+            for key, axis in edges:
+                cost = np.take(np.array(self._layout_transform_interlayer_cost[key]),
+                               keep, axis=axis)
+                self._layout_transform_interlayer_cost[key] = cost.tolist()
+
+        self._logger.info("Pruned dominated schedule candidates: %d -> %d",
+                          sum(num_candidates.values()),
+                          sum(len(self._node_list[idx]["record_candidates"])
+                              for idx in num_candidates))
+        return num_candidates
+
     @property
     def layout_transform_perf_records(self):
         """Get layout transformation dictionary for input graph.
@@ -121,32 +121,21 @@ class DPStage(object):
             full_states_shape = tuple([num_schedules, num_input_schedules] +
                                       [len(self._global_node_list[dep_idx]["record_candidates"])
                                        for dep_idx in input_dep])
-            self._full_states = np.zeros(full_states_shape).flatten().astype("float32")
             self._full_states_idx = [self._idx, input_idx] + input_dep
-            dep_multiplier = 1
-            for i in range(2, len(full_states_shape)):
-                dep_multiplier *= full_states_shape[i]
+            dep_multiplier = num_input_states // num_input_schedules
             input_node_time_counted = input_idx in self._global_counted_nodes_set
 
-            for i in range(num_schedules):
-                current_sch_time = float(self._record_list[i][1].costs[0])
-                for j in range(num_input_states):
-                    input_sch_idx = j // dep_multiplier
-                    layout_transform_time = \
-                        self._global_layout_transform_interlayer_cost \
-                            [(input_idx, self._idx)][input_sch_idx][i]
-
-                    if input_node_time_counted:
-                        total_time = current_sch_time + layout_transform_time
-                    else:
-                        total_time = \
-                            current_sch_time + layout_transform_time + input_flatten_states[j]
-                    current_state_idx = i * num_input_states + j
-                    self._full_states[current_state_idx] = total_time
-
+            # State (i, j) is the time of schedule i plus the layout transformation
+            # time from the input schedule of flattened input state j to schedule i.
+            sch_time = np.array([float(record[1].costs[0]) for record in self._record_list])
+            layout_transform_time = np.array(
+                self._global_layout_transform_interlayer_cost[(input_idx, self._idx)])
+            full_states = sch_time[:, None] + \
+                np.repeat(layout_transform_time.T, dep_multiplier, axis=1)
             if not input_node_time_counted:
+                full_states = full_states + input_flatten_states[None, :]
                 self._global_counted_nodes_set.add(input_idx)
-            self._full_states = self._full_states.reshape(full_states_shape)
+            self._full_states = full_states.astype("float32").reshape(full_states_shape)
 
             # If out degree of input node is 1, we can remove the dimension of input node,
             # since the states of input node will not be needed any more. Otherwise, input
@@ -205,42 +194,37 @@ class DPStage(object):
         states_list, aligned_node_list = DPStage.align_states(input_index_list,
                                                               self._global_stage_dict,
                                                               self._global_node_list)
-        target_node_idx, target_major_axis, target_multiplier, target_states = states_list[0]
+        target_node_idx, target_major_axis, _, target_states = states_list[0]
         aligned_shape = target_states.shape
-        self._full_states = np.zeros(aligned_shape).astype("float32").flatten()
         self._full_states_idx = list(aligned_node_list)
-        num_states = self._full_states.shape[0]
         node_time_counted = [item[0] in self._global_counted_nodes_set for item in states_list]
-        target_states = target_states.flatten()
-        src_states_list = [states_list[i][3].flatten() for i in range(1, len(states_list))]
-
-        for i in range(num_states):
-            target_sch_idx = (i % (target_multiplier *
-                                   aligned_shape[target_major_axis])) // target_multiplier
-            if node_time_counted[0]:
-                new_state = 0
-            else:
-                new_state = target_states[i]
 
+        full_states = np.zeros(aligned_shape)
+        # With a single non-boundary input, there is no layout transformation
+        # and the states stay zero.
+        if len(states_list) > 1:
+            if not node_time_counted[0]:
+                full_states += target_states
             for j in range(1, len(states_list)):
-                src_states = src_states_list[j - 1]
-                src_node_idx, src_major_axis, src_multiplier, _ = states_list[j]
-                src_sch_idx = (i % (src_multiplier *
-                                    aligned_shape[src_major_axis])) // src_multiplier
-                layout_transform_time = \
-                    self._global_layout_transform_interlayer_cost\
-                        [(src_node_idx, target_node_idx)][src_sch_idx][target_sch_idx]
-
-                if node_time_counted[j]:
-                    new_state += layout_transform_time
-                else:
-                    new_state += layout_transform_time + src_states[i]
-                self._full_states[i] = new_state
+                src_node_idx, src_major_axis, _, src_states = states_list[j]
+                # Broadcast the layout transformation time matrix along the axes
+                # of the source and target schedules in the aligned states.
+                layout_transform_time = np.array(
+                    self._global_layout_transform_interlayer_cost
+                    [(src_node_idx, target_node_idx)])
+                lt_shape = [1] * len(aligned_shape)
+                lt_shape[src_major_axis] = layout_transform_time.shape[0]
+                lt_shape[target_major_axis] = layout_transform_time.shape[1]
+                if src_major_axis > target_major_axis:
+                    layout_transform_time = layout_transform_time.T
+                full_states += layout_transform_time.reshape(lt_shape)
+                if not node_time_counted[j]:
+                    full_states += src_states
+        self._full_states = full_states.astype("float32")
 
         for i, node_counted in enumerate(node_time_counted):
             if not node_counted:
                 self._global_counted_nodes_set.add(states_list[i][0])
-        self._full_states = self._full_states.reshape(aligned_shape)
 
         # Remove dependency to reduce states
         reduced_states = np.array(self._full_states)
@@ -42,6 +42,7 @@ class DPTuner(BaseGraphTuner):
         """
         super(DPTuner, self).__init__(*args, **kwargs)
         self._num_states = self._max_num_states = None
+        self._num_forward_states = self._num_unpruned_states = None
         self._stage_dict = {}
         self._dep_dict = {}
         self._counted_nodes_set = set()
@@ -67,15 +68,23 @@ class DPTuner(BaseGraphTuner):
                                    "programming: got %d states but upper limit is %d." %
                                    (self._num_states, self._max_num_states))
 
-    def _forward(self):
+    def _forward(self, num_candidates=None):
         """Forward pass in DP to generate states for all stages.
+
+        num_candidates maps node index to its number of candidates before pruning,
+        used to count the states that would be created without pruning.
         """
         self._logger.info("Start forward pass...")
+        self._num_unpruned_states = None if num_candidates is None else 0
         for node_idx in sorted(self._in_nodes_dict.keys()):
             stage = DPStage(idx=node_idx, target_ops=self._target_ops,
                             **self._global_data_dict)
             self._check_num_states(stage.full_states.size)
             self._stage_dict[node_idx] = stage
+            if num_candidates is not None:
+                self._num_unpruned_states += int(np.prod(
+                    [num_candidates[idx] for idx in stage.full_states_idx or [node_idx]]))
+        self._num_forward_states = self._num_states
         self._logger.info("Finished forward pass.")
 
     def _backward(self):
@@ -106,18 +115,11 @@ class DPTuner(BaseGraphTuner):
         num_states = states_list[0][3].size
         self._check_num_states(num_states * len(output_idx_list))
         aligned_node_shape = states_list[0][3].shape
-        min_time = 0
-        min_pos = -1
+        # total time of every aligned state, the states are broadcast to the same shape
+        total_time = np.zeros(aligned_node_shape, dtype=states_list[0][3].dtype)
         for states in states_list:
-            min_time += np.amax(states[3])
-        flatten_states_list = [current_states[3].flatten() for current_states in states_list]
-        for i in range(num_states):
-            current_time = 0
-            for j, current_states in enumerate(states_list):
-                current_time += flatten_states_list[j][i]
-            if min_time > current_time:
-                min_time = current_time
-                min_pos = i
+            total_time += states[3]
+        min_pos = int(np.argmin(total_time))
         for i, states in enumerate(states_list):
             current_major_axis = states[1]
             current_sch_idx = (min_pos % (states[2] *
@@ -196,9 +198,27 @@ class DPTuner(BaseGraphTuner):
         """Run dynamic programming solver.
         """
         max_num_states = None if "max_num_states" not in kwargs else kwargs["max_num_states"]
+        prune_candidates = kwargs.get("prune_candidates", True)
         self._num_states = 0
         self._max_num_states = max_num_states
         self._logger.info("Start to run dynamic programming algorithm...")
-        self._forward()
+        num_candidates = self._prune_dominated_candidates() if prune_candidates else None
+        self._forward(num_candidates)
+        if num_candidates is not None:
+            self._logger.info("Number of states: %d, %d without pruning",
+                              self._num_forward_states, self._num_unpruned_states)
         self._backward()
         self._logger.info("Finished DPExecutor run.")
+
+    @property
+    def num_states(self):
+        """Get the number of states created by the forward pass of the last run,
+        and the number that would have been created without pruning candidates.
+
+        Returns
+        -------
+        num_states : tuple of (int, int or None)
+            The number of states, and the number without pruning or
+            None if candidates were not pruned.
+        """
+        return self._num_forward_states, self._num_unpruned_states
@@ -20,4 +20,4 @@ from .measure import MeasureInput, MeasureResult, MeasureErrorNo, measure_option
     create_measure_batch
 from .measure_methods import LocalBuilder, LocalRunner, RPCRunner, request_remote
 from .executor import Executor
-from .local_executor import LocalExecutor
+from .local_executor import LocalExecutor, LocalPoolExecutor
@@ -16,9 +16,13 @@
 # under the License.
 """Local based implementation of the executor using multiprocessing"""
 
+import collections
+import pickle
 import signal
+import time
 
-from multiprocessing import Process, Queue
+from multiprocessing import Process, Queue, Pipe
+from multiprocessing.connection import wait
 try:
     from queue import Empty
 except ImportError:
@@ -150,3 +154,256 @@ class LocalExecutor(executor.Executor):
                           args=(queue, self.timeout, func, args, kwargs))
         process.start()
         return LocalFuture(process, queue)
+
+
+def _pool_worker_loop(conn):
+    """The loop of a pool worker: receive jobs and send back results or exceptions"""
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        func, args, kwargs = job
+        try:
+            res = func(*args, **kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            res = exc
+        try:
+            conn.send(res)
+        except Exception as exc:  # pylint: disable=broad-except
+            conn.send(executor.ExecutionError("Cannot send back the result: %s" % exc))
+
+
+class _PoolWorker(object):
+    """A long-lived worker process of LocalPoolExecutor"""
+    def __init__(self):
+        self.conn, child_conn = Pipe()
+        self.process = Process(target=_pool_worker_loop, args=(child_conn,))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+        self.future = None
+        self.start_time = None
+        self.n_jobs = 0
+
+    def kill(self):
+        kill_child_processes(self.process.pid)
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class LocalPoolFuture(executor.Future):
+    """Future of a job submitted to LocalPoolExecutor
+
+    Parameters
+    ----------
+    pool: LocalPoolExecutor
+        The executor that runs this job
+    job: tuple
+        The function and its arguments
+    """
+    def __init__(self, pool, job):
+        self._pool = pool
+        self._job = job
+        self._delegate = None
+        self._done = False
+        self._result = None
+
+    def _set_result(self, result):
+        self._result = result
+        self._done = True
+        self._job = None
+
+    def done(self):
+        if not self._done:
+            if self._delegate is not None:
+                if self._delegate.done():
+                    self._set_result(self._delegate.get())
+            else:
+                self._pool._poll(0)
+        return self._done
+
+    def get(self, timeout=None):
+        if self._delegate is not None and not self._done:
+            self._set_result(self._delegate.get(timeout))
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._done:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                raise executor.TimeoutError()
+            self._pool._poll(remaining)
+        return self._result
+
+
+class LocalPoolExecutor(executor.Executor):
+    """Local executor that runs jobs on a pool of long-lived worker processes.
+
+    Compared with LocalExecutor, the cost of forking and tearing down a process
+    is paid once per worker instead of once per job.
+    A worker whose job times out or crashes is killed and replaced.
+
+    Parameters
+    ----------
+    n_parallel: int
+        The number of worker processes.
+    timeout: float, optional
+        timeout of a job. If time is out. A TimeoutError will be returned (not raised)
+    max_jobs_per_worker: int, optional
+        Recycle a worker after it has run this number of jobs.
+        This bounds the memory leaked by long-running workers.
+        None means workers are never recycled.
+
+    Note
+    ----
+    Workers are forked when jobs are submitted, so they see the functions and
+    tuning tasks registered in the parent at that time. Jobs that cannot be
+    pickled (e.g. local closures) fall back to a fresh process per job.
+    """
+    def __init__(self, n_parallel, timeout=None, max_jobs_per_worker=None):
+        if not psutil:
+            raise RuntimeError("Python package psutil is missing. "
+                               "please try `pip install psutil`")
+        self.n_parallel = n_parallel
+        self.timeout = timeout or executor.Executor.DEFAULT_TIMEOUT
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._fallback = LocalExecutor(timeout=self.timeout)
+        self._workers = []
+        self._pending = collections.deque()
+
+    def submit(self, func, *args, **kwargs):
+        future = LocalPoolFuture(self, (func, args, kwargs))
+        self._pending.append(future)
+        self._dispatch()
+        return future
+
+    def as_completed(self, futures):
+        """Yield the futures as they complete.
+
+        Parameters
+        ----------
+        futures: List of LocalPoolFuture
+            The futures returned by submit
+
+        Yields
+        ------
+        future: LocalPoolFuture
+            A future whose result is available
+        """
+        remaining = list(futures)
+        while True:
+            not_done = []
+            for future in remaining:
+                if future.done():
+                    yield future
+                else:
+                    not_done.append(future)
+            remaining = not_done
+            if not remaining:
+                break
+            if any(x._delegate is None for x in remaining):
+                # jobs running in fallback processes are checked every 0.1s
+                self._poll(0.1 if any(x._delegate is not None for x in remaining) else None)
+            else:
+                remaining[0].get()
+
+    def shutdown(self):
+        """Stop all workers. They are started again by the next submit."""
+        for worker in self._workers:
+            if worker.future is not None:
+                worker.future._set_result(executor.ExecutionError("Executor is shut down"))
+                worker.kill()
+            else:
+                worker.stop()
+        self._workers = []
+
+    def __del__(self):
+        try:
+            self.shutdown()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def _dispatch(self):
+        """Assign pending jobs to idle workers"""
+        while self._pending:
+            worker = next((w for w in self._workers if w.future is None), None)
+            if worker is None:
+                if len(self._workers) >= self.n_parallel:
+                    return
+                worker = _PoolWorker()
+                self._workers.append(worker)
+
+            future = self._pending.popleft()
+            try:
+                worker.conn.send(future._job)
+            except (AttributeError, TypeError, ValueError, pickle.PicklingError):
+                func, args, kwargs = future._job
+                future._delegate = self._fallback.submit(func, *args, **kwargs)
+                continue
+            except (IOError, OSError):
+                # the worker died while it was idle
+                self._pending.appendleft(future)
+                self._replace(worker)
+                continue
+            worker.future = future
+            worker.start_time = time.time()
+
+    def _replace(self, worker, kill=True):
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+        self._workers.remove(worker)
+
+    def _poll(self, timeout):
+        """Wait for results of running jobs up to timeout, then handle
+        finished, crashed and timed out workers"""
+        busy = [w for w in self._workers if w.future is not None]
+        if not busy:
+            self._dispatch()
+            return
+        now = time.time()
+        deadline = min(w.start_time for w in busy) + self.timeout
+        wait_time = max(deadline - now, 0)
+        if timeout is not None:
+            wait_time = min(wait_time, timeout)
+
+        objects = [w.conn for w in busy] + [w.process.sentinel for w in busy]
+        ready = set(wait(objects, timeout=wait_time))
+
+        now = time.time()
+        for worker in busy:
+            future = worker.future
+            if worker.conn in ready:
+                try:
+                    future._set_result(worker.conn.recv())
+                except (EOFError, IOError, OSError):
+                    future._set_result(executor.ExecutionError(
+                        "Worker crashed with exit code %s" % worker.process.exitcode))
+                    self._replace(worker)
+                    continue
+                worker.future = None
+                worker.n_jobs += 1
+                if self.max_jobs_per_worker and worker.n_jobs >= self.max_jobs_per_worker:
+                    self._replace(worker, kill=False)
+            elif worker.process.sentinel in ready:
+                future._set_result(executor.ExecutionError(
+                    "Worker crashed with exit code %s" % worker.process.exitcode))
+                self._replace(worker)
+            elif now - worker.start_time >= self.timeout:
+                future._set_result(executor.TimeoutError())
+                self._replace(worker)
+        self._dispatch()
@@ -150,6 +150,18 @@ class Runner(object):
         """
         raise NotImplementedError()
 
+    def get_num_free_devices(self):
+        """
+        Get the number of devices that are free to run measurements now.
+        This is used to throttle building ahead in pipelined tuning.
+
+        Returns
+        -------
+        num: int or None
+            The number of free devices, or None if it is unknown
+        """
+        return None
+
     def run(self, measure_inputs, build_results):
         """Run amd measure built programs
 
@@ -263,5 +275,7 @@ def create_measure_batch(task, option):
         return results
 
     measure_batch.n_parallel = builder.n_parallel
+    measure_batch.builder = builder
+    measure_batch.runner = runner
     measure_batch.attach_objects = attach_objects
     return measure_batch
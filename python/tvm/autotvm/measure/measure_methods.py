@@ -37,6 +37,7 @@ import tvm._ffi
 import tvm.ir.transform
 from tvm import nd, rpc as _rpc, target as _target
 from tvm.error import TVMError
+from tvm.runtime.timing import TimingStats
 from tvm.driver import build
 from tvm.contrib import nvcc, ndk, tar
 
@@ -45,7 +46,7 @@ from ..env import AutotvmGlobalScope
 from ..task.space import InstantiationError
 
 from .measure import MeasureResult, MeasureErrorNo, Builder, Runner
-from .local_executor import LocalExecutor
+from .local_executor import LocalExecutor, LocalPoolExecutor
 
 logger = logging.getLogger('autotvm')
 
@@ -78,8 +79,16 @@ class LocalBuilder(Builder):
         If is 'default', use default build function
         If is 'ndk', use function for android ndk
         If is callable, use it as custom build function, expect lib_format field.
+    use_worker_pool: bool, optional
+        If True, build on a pool of long-lived worker processes and collect results
+        as they complete, instead of forking a new process for every build and
+        waiting for slices of n_parallel builds.
+    max_jobs_per_worker: int, optional
+        Only used with use_worker_pool. Recycle a worker after it has built this
+        number of programs. None means workers are never recycled.
     """
-    def __init__(self, timeout=10, n_parallel=None, build_func='default'):
+    def __init__(self, timeout=10, n_parallel=None, build_func='default',
+                 use_worker_pool=False, max_jobs_per_worker=None):
         super(LocalBuilder, self).__init__(timeout, n_parallel)
 
         if isinstance(build_func, str):
@@ -90,15 +99,39 @@ class LocalBuilder(Builder):
             else:
                 raise ValueError("Invalid build_func" + build_func)
         self.build_func = _wrap_build_func(build_func)
-        self.executor = LocalExecutor(timeout=timeout)
+        if use_worker_pool:
+            self.executor = LocalPoolExecutor(self.n_parallel, timeout=timeout,
+                                              max_jobs_per_worker=max_jobs_per_worker)
+        else:
+            self.executor = LocalExecutor(timeout=timeout)
         self.tmp_dir = tempfile.mkdtemp()
+        self._prev_tmp_dir = None
 
-    def build(self, measure_inputs):
-        results = []
+    def set_task(self, task, build_kwargs=None):
+        super(LocalBuilder, self).set_task(task, build_kwargs)
+        if isinstance(self.executor, LocalPoolExecutor):
+            # restart workers so that they see the template of the new task
+            self.executor.shutdown()
 
-        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    def build(self, measure_inputs):
+        # keep the libraries of the previous batch, they may still be measured
+        # while this batch is built when tuning is pipelined
+        if self._prev_tmp_dir is not None:
+            shutil.rmtree(self._prev_tmp_dir, ignore_errors=True)
+        self._prev_tmp_dir = self.tmp_dir
         self.tmp_dir = tempfile.mkdtemp()
 
+        if isinstance(self.executor, LocalPoolExecutor):
+            futures = [self.executor.submit(self.build_func, inp, self.tmp_dir,
+                                            **self.build_kwargs)
+                       for inp in measure_inputs]
+            results = [None] * len(futures)
+            position = {id(future): i for i, future in enumerate(futures)}
+            for future in self.executor.as_completed(futures):
+                results[position[id(future)]] = self._process_result(future.get())
+            return results
+
+        results = []
         for i in range(0, len(measure_inputs), self.n_parallel):
             futures = []
             for inp in measure_inputs[i:i + self.n_parallel]:
@@ -109,38 +142,36 @@ class LocalBuilder(Builder):
                 futures.append(ret)
 
             for future in futures:
-                res = future.get()
-
-                if isinstance(res, Exception):
-                    # timeout or fleet error, return MeasureResult directly
-                    results.append(MeasureResult((res,), MeasureErrorNo.BUILD_TIMEOUT,
-                                                 self.timeout, time.time()))
-                elif res.error is not None:
-                    # instantiation error
-                    if isinstance(res.error, InstantiationError):
-                        results.append(MeasureResult((res.error,),
-                                                     MeasureErrorNo.INSTANTIATION_ERROR,
-                                                     res.time_cost, time.time()))
-                    else:
-                        if "InstantiationError" in str(res.error):
-                            msg = str(res.error)
-                            try:
-                                msg = msg.split('\n')[-2].split(": ")[1]
-                            except Exception:  # pylint: disable=broad-except
-                                pass
-                            results.append(MeasureResult((InstantiationError(msg),),
-                                                         MeasureErrorNo.INSTANTIATION_ERROR,
-                                                         res.time_cost, time.time()))
-                        else:  # tvm error
-                            results.append(MeasureResult((res.error,),
-                                                         MeasureErrorNo.COMPILE_HOST,
-                                                         res.time_cost, time.time()))
-                else:
-                    # return BuildResult
-                    results.append(res)
+                results.append(self._process_result(future.get()))
 
         return results
 
+    def _process_result(self, res):
+        """Convert the return value of the build function to BuildResult or MeasureResult"""
+        if isinstance(res, Exception):
+            # timeout or fleet error, return MeasureResult directly
+            return MeasureResult((res,), MeasureErrorNo.BUILD_TIMEOUT,
+                                 self.timeout, time.time())
+        if res.error is not None:
+            # instantiation error
+            if isinstance(res.error, InstantiationError):
+                return MeasureResult((res.error,), MeasureErrorNo.INSTANTIATION_ERROR,
+                                     res.time_cost, time.time())
+            if "InstantiationError" in str(res.error):
+                msg = str(res.error)
+                try:
+                    msg = msg.split('\n')[-2].split(": ")[1]
+                except Exception:  # pylint: disable=broad-except
+                    pass
+                return MeasureResult((InstantiationError(msg),),
+                                     MeasureErrorNo.INSTANTIATION_ERROR,
+                                     res.time_cost, time.time())
+            # tvm error
+            return MeasureResult((res.error,), MeasureErrorNo.COMPILE_HOST,
+                                 res.time_cost, time.time())
+        # return BuildResult
+        return res
+
 
 class RPCRunner(Runner):
     """Run generated code on remove devices.
@@ -180,12 +211,32 @@ class RPCRunner(Runner):
         Whether check correctness after measurement. This will use llvm cpu target to
         call your template and get the reference output.
         This can work for TOPI templates, but may not work for your custom template.
+    persistent_session: bool, optional
+        If True, every worker leases one remote session from the tracker for a whole batch
+        of measurements, uploads the modules of several measurements in one remote call and
+        reuses the argument arrays allocated on the device, instead of connecting to the
+        tracker, uploading and allocating for every single measurement.
+        Measurements run in threads of this process; a session whose measurement
+        exceeds the timeout is dropped and a new one is leased.
+    upload_batch_size: int, optional
+        The number of modules uploaded at once in persistent session mode.
+    adaptive: bool or dict, optional
+        Whether to measure in the adaptive mode of time_evaluator, which repeats
+        the measurement until the costs are precise enough. A dict sets the options
+        of the adaptive mode, e.g. {"target": 0.01, "criterion": "cv", "max_time_ms": 2000}.
+        The reported costs are the measured costs without the outliers, instead of
+        the `repeat` costs without the largest and smallest one.
+        max_time_ms must be well below the timeout.
+    free_devices_interval: float, optional
+        The number of seconds for which the number of free devices queried from the
+        tracker is reused, so pipelined tuning does not connect to it for every batch.
     """
     def __init__(self,
                  key, host, port, priority=1,
                  timeout=10, n_parallel=None,
                  number=4, repeat=3, min_repeat_ms=0, cooldown_interval=0.1,
-                 check_correctness=False):
+                 check_correctness=False, persistent_session=False, upload_batch_size=8,
+                 adaptive=False, free_devices_interval=5.0):
         super(RPCRunner, self).__init__(timeout, n_parallel)
 
         self.key = key
@@ -202,11 +253,17 @@ class RPCRunner(Runner):
         self.ref_output = None
         self.check_correctness = check_correctness
         self.cooldown_interval = cooldown_interval
+        self.persistent_session = persistent_session
+        self.upload_batch_size = upload_batch_size
+        self.adaptive = adaptive
+        self.free_devices_interval = free_devices_interval
+        self._free_devices = (None, -float("inf"))
 
         self.executor = LocalExecutor()
 
     def set_task(self, task):
         self.task = task
+        self._free_devices = (None, -float("inf"))
 
         if check_remote(task.target, self.key, self.host, self.port):
             logger.info("Get devices for measurement successfully!")
@@ -250,7 +307,25 @@ class RPCRunner(Runner):
 
         return kwargs
 
+    def get_num_free_devices(self):
+        num, tic = self._free_devices
+        if time.time() - tic < self.free_devices_interval:
+            return num
+        try:
+            tracker = _rpc.connect_tracker(self.host, self.port)
+            queue_info = tracker.summary()["queue_info"]
+            tracker.close()
+        except (RuntimeError, IOError, OSError, ValueError):
+            num = None
+        else:
+            num = queue_info[self.key]["free"] if self.key in queue_info else 0
+        self._free_devices = (num, time.time())
+        return num
+
     def run(self, measure_inputs, build_results):
+        if self.persistent_session:
+            return self._run_persistent(measure_inputs, build_results)
+
         results = []
         remote_args = (self.key, self.host, self.port, self.priority, self.timeout)
 
@@ -267,7 +342,8 @@ class RPCRunner(Runner):
                                            self.cooldown_interval,
                                            remote_args,
                                            self.ref_input,
-                                           self.ref_output)
+                                           self.ref_output,
+                                           self.adaptive)
                 futures.append(ret)
 
             for future in futures:
@@ -280,6 +356,80 @@ class RPCRunner(Runner):
 
         return results
 
+    def _run_persistent(self, measure_inputs, build_results):
+        """Run a batch of measurements with one leased session per worker thread"""
+        results = [res if isinstance(res, MeasureResult) else None for res in build_results]
+        todo = [i for i, res in enumerate(results) if res is None]
+        if not todo:
+            return results
+
+        n_session = min(self.n_parallel, len(todo))
+        # the lease must outlive the whole share of the batch of a worker
+        session_timeout = self.timeout * (len(todo) // n_session + 2)
+        threads = [threading.Thread(target=self._run_session,
+                                    args=(todo[k::n_session], measure_inputs, build_results,
+                                          results, session_timeout))
+                   for k in range(n_session)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def _run_session(self, indices, measure_inputs, build_results, results, session_timeout):
+        """Measure the inputs at indices on one leased session, leasing a new one
+        when a measurement times out"""
+        session = None
+        pos = 0
+        while pos < len(indices):
+            if session is None:
+                try:
+                    session = _RemoteSession(
+                        request_remote(self.key, self.host, self.port, self.priority,
+                                       session_timeout))
+                except (TVMError, RuntimeError, IOError, OSError) as exc:
+                    for i in indices[pos:]:
+                        results[i] = MeasureResult((str(exc),), MeasureErrorNo.RUN_TIMEOUT,
+                                                   self.timeout, time.time())
+                    return
+
+            batch = indices[pos:pos + self.upload_batch_size]
+            try:
+                session.upload([build_results[i] for i in batch])
+            except (TVMError, IOError, OSError) as exc:
+                for i in batch:
+                    results[i] = MeasureResult((RuntimeError(str(exc)[:1024]),),
+                                               MeasureErrorNo.RUNTIME_DEVICE,
+                                               build_results[i].time_cost, time.time())
+                session = None
+                pos += len(batch)
+                continue
+
+            for i in batch:
+                pos += 1
+                holder = []
+                worker = threading.Thread(
+                    target=lambda i=i, sess=session: holder.append(sess.run(
+                        measure_inputs[i], build_results[i], self.number, self.repeat,
+                        self.min_repeat_ms, self.cooldown_interval,
+                        self.ref_input, self.ref_output, self.adaptive)))
+                worker.daemon = True
+                worker.start()
+                worker.join(self.timeout)
+                if holder:
+                    results[i] = holder[0]
+                    continue
+                # the session is stuck in the kernel or broken, drop it and
+                # let the server reclaim it after its session timeout
+                results[i] = MeasureResult(("timeout",), MeasureErrorNo.RUN_TIMEOUT,
+                                           self.timeout, time.time())
+                session = None
+                break
+
+        if session is not None:
+            session.close()
+
+
 class LocalRunner(RPCRunner):
     """Run generated code on local devices.
 
@@ -309,6 +459,10 @@ class LocalRunner(RPCRunner):
         Whether check correctness after measurement. This will use llvm cpu target to
         call your template and get the reference output.
         This can work for TOPI templates, but may not work for your custom template.
+    persistent_session: bool, optional
+        Whether to keep one session for a whole batch of measurements, see RPCRunner.
+    adaptive: bool or dict, optional
+        Whether to measure in the adaptive mode of time_evaluator, see RPCRunner.
 
     Note
     ----
@@ -318,13 +472,15 @@ class LocalRunner(RPCRunner):
     def __init__(self,
                  timeout=10,
                  number=4, repeat=3, min_repeat_ms=0, cooldown_interval=0.1,
-                 check_correctness=False):
+                 check_correctness=False, persistent_session=False, adaptive=False):
         super(LocalRunner, self).__init__('', None, None, 0,
                                           timeout=timeout, n_parallel=1,
                                           number=number, repeat=repeat,
                                           min_repeat_ms=min_repeat_ms,
                                           cooldown_interval=cooldown_interval,
-                                          check_correctness=check_correctness)
+                                          check_correctness=check_correctness,
+                                          persistent_session=persistent_session,
+                                          adaptive=adaptive)
         self.tracker = None
         self.server = None
 
@@ -376,25 +532,23 @@ def _build_func_common(measure_input, check_gpu=None, cuda_arch=None, build_opti
     return func, tuple((get_const_tuple(x.shape), x.dtype) for x in args)
 
 
-def _wrap_build_func(build_func):
+class _WrappedBuildFunc(object):
     """
     Wrap build_func to a function that can be used in measure.
+    This is a class instead of a closure so that it can be pickled
+    and sent to the workers of LocalPoolExecutor.
 
     Parameters
     ----------
     build_func : The compilation function
         We expect fcompile to contain an attr "output_format"
-
-    Returns
-    -------
-    wrapped_build_func : function
-        The wrapped build function
     """
-    if not hasattr(build_func, "output_format"):
-        raise AttributeError("Expect build_func to have the attribute output_format.")
-    output_format = build_func.output_format
+    def __init__(self, build_func):
+        if not hasattr(build_func, "output_format"):
+            raise AttributeError("Expect build_func to have the attribute output_format.")
+        self.build_func = build_func
 
-    def _wrapped(measure_input, tmp_dir, **kwargs):
+    def __call__(self, measure_input, tmp_dir, **kwargs):
         """
         Wrapped build func.
 
@@ -409,19 +563,68 @@ def _wrap_build_func(build_func):
         tic = time.time()
         try:
             filename = os.path.join(tmp_dir, "tmp_func_%0x.%s" % (
-                getrandbits(64), output_format))
+                getrandbits(64), self.build_func.output_format))
             # TODO(tvm-team) consider linline _build_func_common
             func, arg_info = _build_func_common(measure_input, **kwargs)
-            func.export_library(filename, build_func)
+            func.export_library(filename, self.build_func)
         except Exception as e:  # pylint: disable=broad-except
             return BuildResult(None, None, e, time.time() - tic)
         return BuildResult(filename, arg_info, None, time.time() - tic)
-    return _wrapped
+
+
+def _wrap_build_func(build_func):
+    """
+    Wrap build_func to a function that can be used in measure.
+
+    Parameters
+    ----------
+    build_func : The compilation function
+        We expect fcompile to contain an attr "output_format"
+
+    Returns
+    -------
+    wrapped_build_func : function
+        The wrapped build function
+    """
+    return _WrappedBuildFunc(build_func)
+
+
+# relative change of the median cost over a measurement above which drift is reported
+DRIFT_THRESHOLD = 0.05
+
+
+def _adaptive_options(adaptive):
+    """Get the keyword arguments of time_evaluator for the adaptive option of a runner"""
+    if not adaptive:
+        return {}
+    options = dict(adaptive) if isinstance(adaptive, dict) else {}
+    options["adaptive"] = True
+    return options
+
+
+def _robust_costs(result, measure_input):
+    """Get the costs reported in a MeasureResult from the result of time_evaluator"""
+    if isinstance(result, TimingStats):
+        if abs(result.drift) > DRIFT_THRESHOLD:
+            logger.warning("Cost of %s drifted by %.1f%% during measurement, "
+                           "the device may be throttling", measure_input.config,
+                           result.drift * 100)
+        if not result.converged:
+            logger.debug("Measurement of %s did not converge: cv %.3f, relative ci %.3f",
+                         measure_input.config, result.cv, result.rel_ci)
+        return result.inliers
+
+    costs = result.results
+    if len(costs) > 2:  # remove largest and smallest value to reduce variance
+        costs = list(costs)
+        costs.sort()
+        costs = tuple(costs[1:-1])
+    return costs
 
 
 def run_through_rpc(measure_input, build_result,
                     number, repeat, min_repeat_ms, cooldown_interval,
-                    remote_args, ref_input=None, ref_output=None):
+                    remote_args, ref_input=None, ref_output=None, adaptive=False):
     """Run a generated library through rpc
 
     Parameters
@@ -454,6 +657,8 @@ def run_through_rpc(measure_input, build_result,
         The reference input used for checking correctness
     ref_output: List of np.ndarray
         The reference output used for checking correctness
+    adaptive: bool or dict, optional
+        Whether to measure in the adaptive mode of time_evaluator, and its options
     """
     if isinstance(build_result, MeasureResult):
         return build_result
@@ -474,7 +679,8 @@ def run_through_rpc(measure_input, build_result,
         func = remote.load_module(os.path.split(build_result.filename)[1])
         ctx = remote.context(str(measure_input.target), 0)
         time_f = func.time_evaluator(
-            func.entry_name, ctx, number=number, repeat=repeat, min_repeat_ms=min_repeat_ms)
+            func.entry_name, ctx, number=number, repeat=repeat, min_repeat_ms=min_repeat_ms,
+            **_adaptive_options(adaptive))
 
         # set input
         if ref_input:
@@ -486,18 +692,13 @@ def run_through_rpc(measure_input, build_result,
             args = [nd.array(x, ctx=ctx) for x in args]
             ctx.sync()
 
-        costs = time_f(*args).results
+        costs = _robust_costs(time_f(*args), measure_input)
 
         # clean up remote files
         remote.remove(build_result.filename)
         remote.remove(os.path.splitext(build_result.filename)[0] + '.so')
         remote.remove('')
 
-        if len(costs) > 2:  # remove largest and smallest value to reduce variance
-            costs = list(costs)
-            costs.sort()
-            costs = tuple(costs[1:-1])
-
         # check correctness of output
         if ref_output:
             for expected, real in zip(ref_output, args):
@@ -517,6 +718,103 @@ def run_through_rpc(measure_input, build_result,
     return MeasureResult(costs, errno, tstamp - tic + build_result.time_cost, tstamp)
 
 
+class _RemoteSession(object):
+    """A leased remote session that measures many modules.
+
+    Argument arrays are allocated once per (shape, dtype) signature
+    and reused by all the measurements in the session.
+
+    Parameters
+    ----------
+    remote: RPCSession
+        The leased session
+    """
+    def __init__(self, remote):
+        self.remote = remote
+        self.arg_cache = {}
+        self.uploaded = []
+
+    def upload(self, build_results):
+        """Upload the libraries of a list of build results in as few remote calls as possible"""
+        filenames = [build_result.filename for build_result in build_results]
+        self.uploaded.extend(filenames)
+        self.remote.upload_batch(filenames)
+
+    def _get_args(self, ctx, arg_info, ref_input):
+        key = (str(ctx), tuple((tuple(shape), dtype) for shape, dtype in arg_info))
+        args = self.arg_cache.get(key)
+        if args is None:
+            # create empty arrays on the remote device and copy them once.
+            # This can avoid some memory issues that make the measurement results unreliable.
+            args = [nd.empty(x[0], dtype=x[1], ctx=ctx) for x in arg_info]
+            args = [nd.array(x, ctx=ctx) for x in args]
+            self.arg_cache[key] = args
+        if ref_input:
+            # the previous measurement overwrote the outputs
+            for arr, x in zip(args, ref_input):
+                arr.copyfrom(x)
+        ctx.sync()
+        return args
+
+    def run(self, measure_input, build_result,
+            number, repeat, min_repeat_ms, cooldown_interval,
+            ref_input=None, ref_output=None, adaptive=False):
+        """Measure an uploaded library, see run_through_rpc"""
+        tic = time.time()
+        errno = MeasureErrorNo.NO_ERROR
+        remote = self.remote
+        try:
+            # Program the FPGA every single time when targeting VTA
+            if hasattr(measure_input.target, 'device_name') and \
+                measure_input.target.device_name == 'vta':
+                # pylint: disable=import-outside-toplevel
+                from vta import program_fpga, reconfig_runtime
+                program_fpga(remote, None)
+                reconfig_runtime(remote)
+            func = remote.load_module(os.path.split(build_result.filename)[1])
+            ctx = remote.context(str(measure_input.target), 0)
+            time_f = func.time_evaluator(
+                func.entry_name, ctx, number=number, repeat=repeat, min_repeat_ms=min_repeat_ms,
+                **_adaptive_options(adaptive))
+            args = self._get_args(ctx, build_result.arg_info, ref_input)
+
+            costs = _robust_costs(time_f(*args), measure_input)
+
+            remote.remove(build_result.filename)
+            remote.remove(os.path.splitext(build_result.filename)[0] + '.so')
+            self.uploaded.remove(build_result.filename)
+
+            # check correctness of output
+            if ref_output:
+                for expected, real in zip(ref_output, args):
+                    if not np.allclose(expected, real.asnumpy(), rtol=1e-4):
+                        logger.warning("Wrong Answer!")
+                        errno = MeasureErrorNo.WRONG_ANSWER
+        except TVMError as exc:
+            msg = str(exc)
+            if "Stack trace returned" in msg:
+                msg = msg[:msg.index("Stack trace returned")]
+            if "CUDA Source" in msg:
+                msg = msg[:msg.index("CUDA Source")]
+            costs = (RuntimeError(msg[:1024]),)
+            errno = MeasureErrorNo.RUNTIME_DEVICE
+        tstamp = time.time()
+        time.sleep(cooldown_interval)
+        return MeasureResult(costs, errno, tstamp - tic + build_result.time_cost, tstamp)
+
+    def close(self):
+        """Remove the libraries left on the remote and release the session"""
+        try:
+            for filename in self.uploaded:
+                self.remote.remove(filename)
+            self.remote.remove('')
+        except TVMError:
+            pass
+        self.uploaded = []
+        self.arg_cache = {}
+        self.remote = None
+
+
 def request_remote(device_key, host=None, port=None, priority=1, timeout=60):
     """Request a remote session
 
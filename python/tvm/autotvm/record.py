@@ -51,6 +51,19 @@ except NameError:
     _long = int
 
 
+def clean_json_to_python(x):
+    """1. Convert all list in x to tuple (hashable)
+       2. Convert unicode to str for python2
+    """
+    if isinstance(x, list):
+        return tuple([clean_json_to_python(a) for a in x])
+    if isinstance(x, _unicode):
+        return str(x)
+    if isinstance(x, (_long, int)):
+        return int(x)
+    return x
+
+
 def measure_str_key(inp, include_config=True):
     """ get unique str key for MeasureInput
 
@@ -149,18 +162,6 @@ def decode(row, protocol='json'):
         tgt, task_name, task_args, task_kwargs = row["input"]
         tgt = _target.create(str(tgt))
 
-        def clean_json_to_python(x):
-            """1. Convert all list in x to tuple (hashable)
-               2. Convert unicode to str for python2
-            """
-            if isinstance(x, list):
-                return tuple([clean_json_to_python(a) for a in x])
-            if isinstance(x, _unicode):
-                return str(x)
-            if isinstance(x, (_long, int)):
-                return int(x)
-            return x
-
         tsk = task.Task(clean_json_to_python(task_name), clean_json_to_python(task_args))
         config = ConfigEntity.from_json_dict(row["config"])
         inp = MeasureInput(tgt, tsk, config)
@@ -199,7 +200,23 @@ def load_from_file(filename):
     ------
     input: autotvm.tuner.MeasureInput
     result: autotvm.tuner.MeasureResult
+
+    Note
+    ----
+    Files written by :any:`autotvm.binary_record.BinaryRecordStore` are
+    detected automatically and loaded from the binary store.
     """
+    # pylint: disable=import-outside-toplevel
+    from .binary_record import is_binary_record_file, BinaryRecordStore
+    if is_binary_record_file(filename):
+        store = BinaryRecordStore(filename)
+        try:
+            for inp, res in store:
+                yield (inp, res)
+        finally:
+            store.close()
+        return
+
     for row in open(filename):
         if row and not row.startswith('#'):
             ret = decode(row)
@@ -0,0 +1,312 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# pylint: disable=invalid-name
+"""Streaming merge of tuning logs.
+
+Picks the k best records of every workload from logs of any size with bounded
+memory. Records are grouped as ApplyHistoryBest looks them up: by workload and
+target key, e.g. cpu or cuda, and by workload and device model if the target
+has a -model. A record is in one group per key of its target. The logs are cut
+into byte ranges scanned by a pool of processes. A scan parses the rows as
+plain json, keeps the best result of at most ``max_records`` distinct (group,
+config) pairs and spills them to a run file sorted by (group, cost) whenever
+it is full. The runs are then merged k-way, and the first k distinct configs
+of every group are written out, each record once.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from .. import target as _target
+from .binary_record import is_binary_record_file, iter_json_rows
+
+logger = logging.getLogger('autotvm')
+
+# the memory all workers hold records in before spilling, and the size of a record in it
+MEMORY_BUDGET = 1 << 30
+_RECORD_BYTES = 2048
+
+# target string -> the keys and the model of the target, filled per process
+_TARGET_GROUPS = {}
+
+
+def _target_groups(target_str):
+    """Get the group prefixes of a target, as ApplyHistoryBest keys its best records"""
+    if target_str not in _TARGET_GROUPS:
+        tgt = _target.create(target_str)
+        groups = [["key", k] for k in tgt.keys]
+        if tgt.model != 'unknown':
+            groups.append(["model", tgt.model])
+        _TARGET_GROUPS[target_str] = groups
+    return _TARGET_GROUPS[target_str]
+
+
+def _parse_row(row):
+    """Get (groups, cost, config, task) of a json log row, None if it is not loaded
+    by load_from_file. The cost of a failed measurement is inf."""
+    rec = json.loads(row)
+    if 'v' in rec and rec['v'] == 0.1:
+        return None
+    if not rec["config"].get("entity"):
+        return None
+    costs, error_no = rec["result"][0], rec["result"][1]
+    cost = sum(costs) / len(costs) if error_no == 0 and costs else float("inf")
+    inp = rec["input"]
+    groups = [json.dumps(prefix + inp[1:]) for prefix in _target_groups(str(inp[0]))]
+    return (groups, cost, json.dumps(rec["config"], sort_keys=True),
+            "%s %s" % (inp[0], inp[1]))
+
+
+def _iter_rows(path, start, end):
+    """Generator: the rows of a log starting in the byte range [start, end)"""
+    if end is None:
+        for row in iter_json_rows(path):
+            yield row
+        return
+    with open(path, "rb") as f:
+        pos = start
+        if start > 0:
+            # skip the row started in the previous range
+            f.seek(start - 1)
+            pos += len(f.readline()) - 1
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            line = line.decode("utf-8").strip()
+            if line and not line.startswith('#'):
+                yield line
+
+
+def _write_run(entries, top_k, tmp_dir):
+    """Write the top_k entries of every workload to a sorted run file"""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "w") as fout:
+        last, count = None, 0
+        for (wkl, cfg), (cost, row) in sorted(entries.items(),
+                                              key=lambda x: (x[0][0], x[1][0], x[0][1])):
+            if wkl != last:
+                last, count = wkl, 0
+            if count < top_k:
+                fout.write("%s\t%r\t%s\t%s\n" % (wkl, cost, cfg, row))
+                count += 1
+    return path
+
+
+def _read_run(path):
+    with open(path) as f:
+        for line in f:
+            wkl, cost, cfg, row = line.rstrip("\n").split("\t", 3)
+            yield wkl, float(cost), cfg, row
+
+
+def _scan(args):
+    """Scan a byte range of a log into sorted runs, return the runs and the task stats"""
+    path, start, end, top_k, max_records, tmp_dir = args
+    stats = {}
+    entries = {}
+    runs = []
+    invalid = 0
+    for row in _iter_rows(path, start, end):
+        try:
+            parsed = _parse_row(row)
+        except (ValueError, KeyError, IndexError, TypeError):
+            invalid += 1
+            continue
+        if parsed is None:
+            continue
+        groups, cost, cfg, task_key = parsed
+        task_stats = stats.setdefault(task_key, {"records": 0, "errors": 0,
+                                                 "best_cost": float("inf")})
+        task_stats["records"] += 1
+        if cost == float("inf"):
+            task_stats["errors"] += 1
+            continue
+        task_stats["best_cost"] = min(task_stats["best_cost"], cost)
+        for group in groups:
+            key = (group, cfg)
+            if key not in entries or cost < entries[key][0]:
+                entries[key] = (cost, row)
+        if len(entries) >= max_records:
+            runs.append(_write_run(entries, top_k, tmp_dir))
+            entries = {}
+    if entries:
+        runs.append(_write_run(entries, top_k, tmp_dir))
+    if invalid:
+        logger.warning("Ignore %d invalid rows in %s", invalid, path)
+    return runs, stats
+
+
+def _merge_runs(runs, fout, top_k, stats=None):
+    """Merge sorted runs and write the first top_k distinct configs of every group,
+    as rows of a run, or once as log rows with the stats of the tasks if stats is given"""
+    last, seen = None, set()
+    # the digests of the written rows and the workloads of the tasks, as large as the output
+    written, workloads = set(), set()
+    for group, cost, cfg, row in heapq.merge(*[_read_run(run) for run in runs]):
+        if group != last:
+            last, seen = group, set()
+        if len(seen) >= top_k or cfg in seen:
+            continue
+        seen.add(cfg)
+        if stats is None:
+            fout.write("%s\t%r\t%s\t%s\n" % (group, cost, cfg, row))
+            continue
+        digest = hashlib.sha1(row.encode("utf-8")).digest()
+        if digest in written:
+            continue
+        written.add(digest)
+        inp = json.loads(row)["input"]
+        task_key = "%s %s" % (inp[0], inp[1])
+        stats[task_key]["output"] += 1
+        workload = json.dumps([task_key] + inp[1:])
+        if workload not in workloads:
+            workloads.add(workload)
+            stats[task_key]["workloads"] += 1
+        fout.write(row + "\n")
+
+
+def merge_records(in_files, out_file, top_k=1, num_workers=None, tmp_dir=None,
+                  max_records=None, split_size=256 << 20, max_open_runs=256):
+    """Write the top_k records of every workload in a set of logs to a log file.
+
+    As ApplyHistoryBest, the top_k records are picked for every workload and
+    target key, and for every workload and device model. A record picked for
+    several of them is written once. Records with the same config are written
+    once, with their best result. Failed measurements are dropped. Memory usage
+    is bounded by max_records per worker, whatever the size of the logs.
+
+    Parameters
+    ----------
+    in_files: str or list of str
+        The json or binary record files, or a directory whose .log files are read
+    out_file: str
+        The output json log file. It may also be an input.
+    top_k: int, optional
+        The number of records kept for every workload
+    num_workers: int, optional
+        The number of processes scanning the logs, the number of cpus by default
+    tmp_dir: str, optional
+        The directory of the temporary run files, next to out_file by default
+    max_records: int, optional
+        The maximum number of records a worker holds before spilling a run.
+        By default, the workers hold about MEMORY_BUDGET bytes of records in total.
+    split_size: int, optional
+        The size in bytes of the ranges json logs are split into
+    max_open_runs: int, optional
+        The maximum number of runs merged at once
+
+    Returns
+    -------
+    stats: dict of str to dict
+        The statistics of every task, keyed by target and task name:
+        the number of records, errors, workloads and output records,
+        and the best cost.
+    """
+    if isinstance(in_files, str):
+        if os.path.isdir(in_files):
+            in_files = sorted(os.path.join(in_files, x) for x in os.listdir(in_files)
+                              if x.endswith(".log"))
+        else:
+            in_files = [in_files]
+
+    ranges = []
+    for path in in_files:
+        if is_binary_record_file(path):
+            ranges.append((path, 0, None))
+        else:
+            size = os.path.getsize(path)
+            ranges.extend((path, start, min(start + split_size, size))
+                          for start in range(0, size, split_size))
+
+    tmp_dir = tempfile.mkdtemp(prefix=".merge-",
+                               dir=tmp_dir or os.path.dirname(os.path.abspath(out_file)))
+    try:
+        num_workers = min(num_workers or multiprocessing.cpu_count(), max(len(ranges), 1))
+        if max_records is None:
+            max_records = max(MEMORY_BUDGET // (_RECORD_BYTES * num_workers), 1024)
+        tasks = [(path, start, end, top_k, max_records, tmp_dir) for path, start, end in ranges]
+        if num_workers > 1:
+            pool = multiprocessing.Pool(num_workers)
+            results = pool.imap_unordered(_scan, tasks)
+        else:
+            pool = None
+            results = map(_scan, tasks)
+
+        runs = []
+        stats = {}
+        for task_runs, task_stats in results:
+            runs.extend(task_runs)
+            for key, value in task_stats.items():
+                total = stats.setdefault(key, {"records": 0, "errors": 0, "workloads": 0,
+                                               "output": 0, "best_cost": float("inf")})
+                total["records"] += value["records"]
+                total["errors"] += value["errors"]
+                total["best_cost"] = min(total["best_cost"], value["best_cost"])
+        if pool is not None:
+            pool.close()
+            pool.join()
+        logger.info("Scanned %d records of %d tasks into %d runs",
+                    sum(x["records"] for x in stats.values()), len(stats), len(runs))
+
+        while len(runs) > max_open_runs:
+            merged = []
+            for i in range(0, len(runs), max_open_runs):
+                fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+                with os.fdopen(fd, "w") as fout:
+                    _merge_runs(runs[i:i + max_open_runs], fout, top_k)
+                merged.append(path)
+            runs = merged
+
+        tmp_out = out_file + ".tmp"
+        with open(tmp_out, "w") as fout:
+            _merge_runs(runs, fout, top_k, stats)
+        os.replace(tmp_out, out_file)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return stats
+
+
+def format_stats(stats):
+    """Format the statistics returned by merge_records as a table.
+
+    Parameters
+    ----------
+    stats: dict of str to dict
+        The statistics of every task
+
+    Returns
+    -------
+    table: str
+        One row per task
+    """
+    rows = ["%-60s %10s %8s %9s %8s %12s" % ("task", "records", "errors", "workloads",
+                                             "output", "best (ms)")]
+    for key in sorted(stats):
+        value = stats[key]
+        best = value["best_cost"] * 1000 if value["best_cost"] != float("inf") else float("nan")
+        rows.append("%-60s %10d %8d %9d %8d %12.4f" % (key, value["records"], value["errors"],
+                                                       value["workloads"], value["output"],
+                                                       best))
+    return "\n".join(rows)
@@ -30,7 +30,9 @@ of the DispatchContext base class.
 
 from __future__ import absolute_import as _abs
 
+import hashlib
 import logging
+import os
 
 import numpy as np
 
@@ -53,6 +55,8 @@ class DispatchContext(object):
 
     def __init__(self):
         self._old_ctx = DispatchContext.current
+        # bumped whenever the configs in this context change
+        self.version = 0
 
     def query(self, target, workload):
         """
@@ -143,6 +147,32 @@ class DispatchContext(object):
         """
         raise NotImplementedError()
 
+    def fingerprint(self):
+        """
+        Get a digest of the configs this context and its upper contexts dispatch to.
+        Two contexts with the same fingerprint return the same configs for all queries.
+
+        Returns
+        -------
+        fingerprint : str or None
+            The hex digest, or None if the context cannot be fingerprinted.
+        """
+        own = self._fingerprint_inside()
+        if own is None:
+            return None
+        upper = self._old_ctx.fingerprint() if self._old_ctx is not None else ""
+        if upper is None:
+            return None
+        key = "%s:%s:%s" % (type(self).__name__, own, upper)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _fingerprint_inside(self):
+        """
+        Get a string that identifies the configs inside this context,
+        None if they cannot be identified.
+        """
+        return None
+
     def __enter__(self):
         self._old_ctx = DispatchContext.current
         DispatchContext.current = self
@@ -175,6 +205,9 @@ class ApplyConfig(DispatchContext):
         self.workload = workload
         self._config = cfg
 
+    def _fingerprint_inside(self):
+        return str(self._config)
+
 
 class ApplyHistoryBest(DispatchContext):
     """
@@ -186,6 +219,8 @@ class ApplyHistoryBest(DispatchContext):
         Collection of tuning records.
         If is str, then it should be the filename of a records log file.
         Each row of this file is an encoded record pair. Otherwise, it is an iterator.
+        Binary record files (see :any:`autotvm.binary_record`) are not loaded
+        eagerly, the best record of a workload is only read when it is queried.
     """
     def __init__(self, records):
         super(ApplyHistoryBest, self).__init__()
@@ -193,6 +228,8 @@ class ApplyHistoryBest(DispatchContext):
         self.best_by_targetkey = {}
         self.best_by_model = {}
         self._best_user_defined = {}
+        self._binary_stores = []
+        self._binary_queried = set()
 
         if records:
             self.load(records)
@@ -210,45 +247,69 @@ class ApplyHistoryBest(DispatchContext):
         # pylint: disable=import-outside-toplevel
         from pathlib import Path
         from ..record import load_from_file
+        from ..binary_record import is_binary_record_file, BinaryRecordStore
 
         if isinstance(records, Path):
             records = str(records)
 
         if isinstance(records, str):
+            if is_binary_record_file(records):
+                self._binary_stores.append(BinaryRecordStore(records))
+                self._binary_queried.clear()
+                self.version += 1
+                logger.debug("Add binary record store %s", records)
+                return
             records = load_from_file(records)
         if not records:
             return
 
-        best_by_targetkey = self.best_by_targetkey
-        best_by_model = self.best_by_model
-
         counter = 0
         for inp, res in records:
             counter += 1
-            if res.error_no != 0:
-                continue
+            self._update_best(inp, res)
+        self.version += 1
 
-            # use target keys in tvm target system as key to build best map
-            for k in inp.target.keys:
-                key = (k, inp.task.workload)
-                if key not in best_by_targetkey:
-                    best_by_targetkey[key] = (inp, res)
-                else:
-                    _, other_res = best_by_targetkey[key]
-                    if np.mean(other_res.costs) > np.mean(res.costs):
-                        best_by_targetkey[key] = (inp, res)
-
-            # use model as key to build best map
-            key = (inp.target.model, inp.task.workload)
-            if key not in best_by_model:
-                if inp.target.model != 'unknown':
-                    best_by_model[key] = (inp, res)
+        logger.debug("Finish loading %d records", counter)
+
+    def _update_best(self, inp, res):
+        """Update the best maps with a record pair"""
+        if res.error_no != 0:
+            return
+
+        best_by_targetkey = self.best_by_targetkey
+        best_by_model = self.best_by_model
+
+        # use target keys in tvm target system as key to build best map
+        for k in inp.target.keys:
+            key = (k, inp.task.workload)
+            if key not in best_by_targetkey:
+                best_by_targetkey[key] = (inp, res)
             else:
-                _, other_res = best_by_model[key]
+                _, other_res = best_by_targetkey[key]
                 if np.mean(other_res.costs) > np.mean(res.costs):
-                    best_by_model[key] = (inp, res)
+                    best_by_targetkey[key] = (inp, res)
 
-        logger.debug("Finish loading %d records", counter)
+        # use model as key to build best map
+        key = (inp.target.model, inp.task.workload)
+        if key not in best_by_model:
+            if inp.target.model != 'unknown':
+                best_by_model[key] = (inp, res)
+        else:
+            _, other_res = best_by_model[key]
+            if np.mean(other_res.costs) > np.mean(res.costs):
+                best_by_model[key] = (inp, res)
+
+    def _load_from_binary_stores(self, target, workload):
+        """Read the best records of a workload from the binary stores"""
+        if (str(target), workload) in self._binary_queried:
+            return
+        self._binary_queried.add((str(target), workload))
+        for store in self._binary_stores:
+            records = [store.best_by_model(target.model, workload)]
+            records += [store.best_by_targetkey(k, workload) for k in target.keys]
+            for rec in records:
+                if rec is not None:
+                    self._update_best(*rec)
 
     def _query_inside(self, target, workload):
         if target is None:
@@ -256,6 +317,9 @@ class ApplyHistoryBest(DispatchContext):
                                "Hint: If your target is llvm, use `with tvm.target.create('llvm'):`"
                                " above the dispatcher call. So does other target. ")
 
+        if self._binary_stores:
+            self._load_from_binary_stores(target, workload)
+
         # first try matching by model
         key = (target.model, workload)
         if key in self._best_user_defined:
@@ -285,6 +349,17 @@ class ApplyHistoryBest(DispatchContext):
         for k in target.keys:
             key = (k, workload)
             self._best_user_defined[key] = cfg
+        self.version += 1
+
+    def _fingerprint_inside(self):
+        items = [(str(k), str(inp.config)) for k, (inp, _) in self.best_by_targetkey.items()]
+        items += [(str(k), str(inp.config)) for k, (inp, _) in self.best_by_model.items()]
+        items += [(str(k), str(cfg)) for k, cfg in self._best_user_defined.items()]
+        # binary stores are read lazily, identify them by their files
+        for store in self._binary_stores:
+            stat = os.stat(store.filename)
+            items.append((store.filename, "%d:%d" % (stat.st_size, stat.st_mtime_ns)))
+        return str(sorted(items))
 
 
 class FallbackContext(DispatchContext):
@@ -330,10 +405,17 @@ class FallbackContext(DispatchContext):
         key = (str(target), workload)
         if key in self.memory:
             del self.memory[key]
+            self.version += 1
 
     def update(self, target, workload, cfg):
         key = (str(target), workload)
         self.memory[key] = cfg
+        self.version += 1
+
+    def _fingerprint_inside(self):
+        # fallback configs are derived from the workload only
+        return str(sorted((str(k), str(cfg)) for k, cfg in self.memory.items()
+                          if not isinstance(cfg, FallbackConfigEntity)))
 
 
 DispatchContext.current = FallbackContext()
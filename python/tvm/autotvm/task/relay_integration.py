@@ -20,8 +20,12 @@ Decorator and utilities for the integration with TOPI and Relay
 99.9% copy-paste of implementation by @MerryMercy
 
 """
-import threading
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
+import threading
 
 import tvm
 from .task import create
@@ -65,7 +69,8 @@ def _lower(mod,
         compiler.lower(mod, target=target)
 
 
-def extract_from_program(mod, params, target, target_host=None, ops=None):
+def extract_from_program(mod, params, target, target_host=None, ops=None,
+                         cache_dir=None):
     """ Extract tuning tasks from a relay program.
 
     This function is the single program version of extract_from_multiple_program.
@@ -82,16 +87,94 @@ def extract_from_program(mod, params, target, target_host=None, ops=None):
         The host compilation target
     ops: List[tvm.ir.Op] or None
         List of relay ops to be tuned. If not specified, all tunable ops will be extracted.
+    cache_dir: str, optional
+        The directory of the task cache, see extract_from_multiple_program.
 
     Returns
     -------
     task: Array of autotvm.task.Task
         collected tasks
     """
-    return extract_from_multiple_program([mod], [params], target, target_host, ops)
+    return extract_from_multiple_program([mod], [params], target, target_host, ops,
+                                         cache_dir=cache_dir)
+
+
+def _program_key(mod, params, target, target_host, ops):
+    """The key of the extracted tasks of a program in the task cache.
+    Tasks only depend on the shapes and dtypes of the parameters, not their values."""
+    # pylint: disable=import-outside-toplevel
+    from tvm import __version__
+
+    param_info = sorted((str(k), [int(x) for x in v.shape], str(v.dtype))
+                        for k, v in (params or {}).items())
+    key = json.dumps([__version__, str(tvm.ir.structural_hash(mod)), param_info,
+                      str(target), str(target_host),
+                      sorted(str(op.name) for op in ops) if ops else None])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _load_cached_tasks(cache_dir, key):
+    # pylint: disable=import-outside-toplevel
+    from ..record import clean_json_to_python
 
+    path = os.path.join(cache_dir, key + ".json")
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path) as f:
+            return [(str(name), clean_json_to_python(args)) for name, args in json.load(f)]
+    except ValueError:
+        logger.warning("Ignore broken task cache file %s", path)
+        return None
+
+
+def _save_cached_tasks(cache_dir, key, tasks):
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key + ".json")
+    # write to a temporary file first so that readers never see a partial file
+    try:
+        data = json.dumps(tasks)
+    except TypeError:
+        # symbolic arguments such as tvm.tir.Var cannot be cached
+        logger.debug("Skip caching tasks with non-serializable arguments")
+        return
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp_path, "w") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _trace_program(mod, target, param):
+    """Lower a program under the tracing environment and return the collected
+    (task_name, args) pairs"""
+    # pylint: disable=import-outside-toplevel
+    from tvm import relay
 
-def extract_from_multiple_program(mods, params, target, target_host=None, ops=None):
+    env = TaskExtractEnv.get()
+    with env:
+        relay.backend.compile_engine.get().clear()
+        # wrap build call in thread to avoid multiprocessing problems
+        build_thread = threading.Thread(target=_lower,
+                                        args=(mod, target, param))
+        build_thread.start()
+        build_thread.join()
+        relay.backend.compile_engine.get().clear()
+    return list(env.get_tasks())
+
+
+# programs to trace in the forked workers of parallel extraction
+_extract_programs = None
+_extract_target = None
+
+def _trace_program_worker(index):
+    mod, param = _extract_programs[index]
+    logger.disabled = True
+    return _trace_program(mod, _extract_target, param)
+
+
+def extract_from_multiple_program(mods, params, target, target_host=None, ops=None,
+                                  n_parallel=1, cache_dir=None):
     """ Extract tuning tasks from multiple relay programs.
 
     This function collects tuning tasks by building a list of programs
@@ -109,6 +192,13 @@ def extract_from_multiple_program(mods, params, target, target_host=None, ops=No
         The host compilation target
     ops: List[tvm.ir.Op] or None
         List of relay ops to be tuned.  If not specified, all tunable ops will be extracted.
+    n_parallel: int, optional
+        The number of processes that lower programs concurrently.
+        The tasks of all programs are merged and deduplicated.
+    cache_dir: str, optional
+        If set, the tasks extracted from each program are cached in this directory,
+        keyed by the structural hash of the program, the shapes of its parameters,
+        the targets and the ops. Programs with cached tasks are not lowered again.
 
     Returns
     -------
@@ -119,33 +209,61 @@ def extract_from_multiple_program(mods, params, target, target_host=None, ops=No
     from tvm import relay
     import topi
 
-    env = TaskExtractEnv.get()
+    global _extract_programs, _extract_target
+
+    programs = []
+    for mod, param in zip(mods, params):
+        if isinstance(mod, relay.function.Function):
+            mod = tvm.IRModule.from_expr(mod)
+        assert isinstance(mod, tvm.IRModule), \
+            "only support relay Module or Function to be tuned"
+        programs.append((mod, param))
+
+    keys = [_program_key(mod, param, target, target_host, ops) if cache_dir else None
+            for mod, param in programs]
+    traced = [_load_cached_tasks(cache_dir, key) if key else None for key in keys]
+    missing = [i for i, x in enumerate(traced) if x is None]
+    logger.debug("Extract tasks from %d programs, %d found in cache",
+                 len(programs), len(programs) - len(missing))
 
     # run compiler to collect all TOPI calls during compilation
+    env = TaskExtractEnv.get()
     env.reset(ops)
-    with env:
-        # disable logger temporarily
-        old_state = logger.disabled
-        logger.disabled = True
-
-        for mod, param in zip(mods, params):
-            if isinstance(mod, relay.function.Function):
-                mod = tvm.IRModule.from_expr(mod)
-            assert isinstance(mod, tvm.IRModule), \
-                "only support relay Module or Function to be tuned"
-            relay.backend.compile_engine.get().clear()
-            # wrap build call in thread to avoid multiprocessing problems
-            build_thread = threading.Thread(target=_lower,
-                                            args=(mod, target, param))
-            build_thread.start()
-            build_thread.join()
-            relay.backend.compile_engine.get().clear()
-
+    # disable logger temporarily
+    old_state = logger.disabled
+    logger.disabled = True
+    try:
+        if n_parallel > 1 and len(missing) > 1:
+            # use global variables to pass the programs to the forked workers
+            _extract_programs, _extract_target = programs, target
+            pool = multiprocessing.Pool(min(n_parallel, len(missing)))
+            try:
+                for i, tasks in zip(missing, pool.map(_trace_program_worker, missing)):
+                    traced[i] = tasks
+            finally:
+                pool.terminate()
+                pool.join()
+                _extract_programs, _extract_target = None, None
+        else:
+            for i in missing:
+                traced[i] = _trace_program(programs[i][0], target, programs[i][1])
+    finally:
         logger.disabled = old_state
 
+    if cache_dir:
+        for i in missing:
+            _save_cached_tasks(cache_dir, keys[i], traced[i])
+
+    # merge and deduplicate the tasks of all programs
+    task_keys = []
+    for tasks in traced:
+        for task_name, args in tasks:
+            if env.allow_duplicate or (task_name, args) not in task_keys:
+                task_keys.append((task_name, args))
+
     # create tasks for target
     tasks = []
-    for task_name, args in env.get_tasks():
+    for task_name, args in task_keys:
         try:
             tsk = create(task_name, args,
                          target=target, target_host=target_host)
@@ -62,6 +62,34 @@ def log_to_file(file_out, protocol='json'):
     return _callback
 
 
+def log_to_binary_file(filename):
+    """Log the tuning records into a binary record file.
+    See :any:`autotvm.binary_record` for the format.
+
+    Parameters
+    ----------
+    filename : str
+        The binary record file to append to.
+
+    Returns
+    -------
+    callback : callable
+        Callback function to do the logging.
+    """
+    # pylint: disable=import-outside-toplevel
+    from ..binary_record import BinaryRecordStore
+
+    store = BinaryRecordStore(str(filename))
+
+    def _callback(_, inputs, results):
+        """Callback implementation"""
+        for inp, result in zip(inputs, results):
+            store.append(inp, result)
+        store.flush()
+
+    return _callback
+
+
 def log_to_database(db):
     """Save the tuning records to a database object.
 
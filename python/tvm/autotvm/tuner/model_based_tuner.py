@@ -20,16 +20,187 @@ This type of tuner will fit a cost model and use some optimization methods to
 find optimums points of cost model in space.
 """
 import gc
+import multiprocessing
 
 import numpy as np
 
 from .tuner import Tuner
 from ..env import GLOBAL_SCOPE
 
+class FeatureStore(object):
+    """A bounded feature cache backed by one contiguous float32 array.
+
+    Each cached config index owns a row of the array. When the store is full,
+    rows are evicted with the clock (second chance) algorithm.
+    If shared is True, the array lives in shared memory, so worker processes
+    forked after the store is created can write extracted features directly
+    into their rows.
+
+    Parameters
+    ----------
+    feature_len: int
+        The length of a feature vector
+    capacity: int, optional
+        The maximum number of cached feature vectors
+    shared: bool, optional
+        Whether to allocate the array in shared memory
+    """
+    def __init__(self, feature_len, capacity=100000, shared=True):
+        self.feature_len = feature_len
+        self.capacity = capacity
+        if shared:
+            buf = multiprocessing.RawArray('f', max(capacity * feature_len, 1))
+            self.data = np.frombuffer(buf, dtype=np.float32,
+                                      count=capacity * feature_len)
+            self.data = self.data.reshape((capacity, feature_len))
+        else:
+            self.data = np.zeros((capacity, feature_len), dtype=np.float32)
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.referenced = np.zeros(capacity, dtype=bool)
+        self.keys = np.full(capacity, -1, dtype=np.int64)
+        self.row_of = {}
+        self.hand = 0
+        self.n_used = 0
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def lookup(self, indexes):
+        """Get the rows of indexes and mark them as recently used
+
+        Parameters
+        ----------
+        indexes: Array of int
+            The config indexes
+
+        Returns
+        -------
+        rows: np.ndarray
+            The row of each index, -1 if the index is not cached
+        """
+        rows = np.fromiter((self.row_of.get(int(x), -1) for x in indexes),
+                           dtype=np.int64, count=len(indexes))
+        self.referenced[rows[rows >= 0]] = True
+        return rows
+
+    def allocate(self, indexes, pinned=()):
+        """Assign rows to new indexes, evicting old rows if the store is full.
+        The features of the new rows are invalid until :any:`commit` is called.
+
+        Parameters
+        ----------
+        indexes: Array of int
+            The config indexes, which must not be cached yet
+        pinned: Array of int
+            Rows that must not be evicted
+
+        Returns
+        -------
+        rows: np.ndarray
+            The rows assigned to indexes
+        """
+        is_pinned = np.zeros(self.capacity, dtype=bool)
+        is_pinned[np.asarray(pinned, dtype=np.int64)] = True
+        if len(indexes) + int(is_pinned.sum()) > self.capacity:
+            raise ValueError("Cannot cache %d features in a store of capacity %d" %
+                             (len(indexes) + int(is_pinned.sum()), self.capacity))
+
+        rows = np.empty(len(indexes), dtype=np.int64)
+        for i, index in enumerate(indexes):
+            if self.n_used < self.capacity:
+                row = self.n_used
+                self.n_used += 1
+            else:
+                while True:
+                    row = self.hand
+                    self.hand = (self.hand + 1) % self.capacity
+                    if is_pinned[row]:
+                        continue
+                    if self.referenced[row]:
+                        self.referenced[row] = False
+                        continue
+                    break
+                del self.row_of[int(self.keys[row])]
+            self.keys[row] = index
+            self.row_of[int(index)] = row
+            self.valid[row] = False
+            self.referenced[row] = True
+            is_pinned[row] = True
+            rows[i] = row
+        return rows
+
+    def commit(self, rows, valid):
+        """Mark whether the features written to rows are valid
+
+        Parameters
+        ----------
+        rows: Array of int
+            Rows returned by :any:`allocate`
+        valid: Array of bool
+            Whether the feature extraction of each row succeeded
+        """
+        self.valid[np.asarray(rows, dtype=np.int64)] = valid
+
+    def gather(self, rows):
+        """Copy the features of rows into a new array, invalid features are zero
+
+        Parameters
+        ----------
+        rows: Array of int
+            Rows of cached indexes
+
+        Returns
+        -------
+        feas: np.ndarray
+            float32 array of shape (len(rows), feature_len)
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        ret = self.data[rows]
+        ret[~self.valid[rows]] = 0
+        return ret
+
+    def clear(self):
+        """Drop all cached features"""
+        self.row_of = {}
+        self.valid[:] = False
+        self.referenced[:] = False
+        self.keys[:] = -1
+        self.hand = 0
+        self.n_used = 0
+
+
 class FeatureCache(object):
     """Feature cache manager for cache sharing between different cost models"""
     def __init__(self):
         self.feature_cache = {}
+        self.feature_stores = {}
+
+    def get_store(self, key):
+        """ Get the feature store for a key
+
+        Parameters
+        ----------
+        key: str
+            The key of a feature type
+
+        Returns
+        -------
+        store: FeatureStore or None
+            The store, None if it is not created yet
+        """
+        return self.feature_stores.get(key)
+
+    def set_store(self, key, store):
+        """ Set the feature store for a key
+
+        Parameters
+        ----------
+        key: str
+            The key of a feature type
+        store: FeatureStore
+            The store
+        """
+        self.feature_stores[key] = store
 
     def get(self, key):
         """ Get feature cache dictionary for a key
@@ -61,6 +232,8 @@ class FeatureCache(object):
         -------
         n: int
         """
+        if key in self.feature_stores:
+            return len(self.feature_stores[key])
         return len(self.feature_cache.get(key, tuple()))
 
     def clear(self, key):
@@ -71,7 +244,9 @@ class FeatureCache(object):
         key: str
             The key of a feature type
         """
-        del self.feature_cache[key]
+        if key in self.feature_stores:
+            self.feature_stores[key].clear()
+        self.feature_cache.pop(key, None)
         self.feature_cache[key] = {}
         gc.collect()
 
@@ -268,7 +443,7 @@ class ModelBasedTuner(Tuner):
                 candidate = self.model_optimizer.find_maximums(
                     self.cost_model, self.plan_size * self.diversity_filter_ratio, self.visited)
                 scores = self.cost_model.predict(candidate)
-                knobs = [point2knob(x, self.dims) for x in candidate]
+                knobs = points2knobs(candidate, self.dims)
                 pick_index = submodular_pick(0 * scores, knobs, self.plan_size, knob_weight=1)
                 maximums = np.array(candidate)[pick_index]
             else:
@@ -322,6 +497,48 @@ def knob2point(knob, dims):
     return p
 
 
+def points2knobs(points, dims):
+    """convert an array of points to knob form in bulk with mixed-radix arithmetic
+
+    Parameters
+    ----------
+    points: Array of int
+        indexes of ConfigEntity
+    dims: Array of int
+        sizes of each dimension
+
+    Returns
+    -------
+    knobs: np.ndarray
+        int64 array of shape (len(points), len(dims))
+    """
+    points = np.asarray(points, dtype=np.int64)
+    dims = np.asarray(dims, dtype=np.int64)
+    strides = np.concatenate([[1], np.cumprod(dims[:-1])]).astype(np.int64)
+    return (points[:, None] // strides[None, :]) % dims[None, :]
+
+
+def knobs2points(knobs, dims):
+    """convert an array of knob vectors to point form in bulk, the inverse of points2knobs
+
+    Parameters
+    ----------
+    knobs: Array of Array of int
+        knob vectors of shape (n, len(dims))
+    dims: Array of int
+        sizes of each dimension
+
+    Returns
+    -------
+    points: np.ndarray
+        int64 array of indexes
+    """
+    knobs = np.asarray(knobs, dtype=np.int64)
+    dims = np.asarray(dims, dtype=np.int64)
+    strides = np.concatenate([[1], np.cumprod(dims[:-1])]).astype(np.int64)
+    return knobs.dot(strides)
+
+
 def submodular_pick(scores, knobs, n_pick, knob_weight=1.0):
     """Run greedy optimization to pick points with regard to both score and diversity.
     DiversityScore = knob_weight * number of unique knobs in the selected set
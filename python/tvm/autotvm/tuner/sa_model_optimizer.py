@@ -19,14 +19,14 @@
 Cost model optimizer based on simulated annealing
 """
 
-import heapq
 import logging
 import time
 
 import numpy as np
 
 from ..util import sample_ints
-from .model_based_tuner import ModelOptimizer, knob2point, point2knob
+from .model_based_tuner import ModelOptimizer, knob2point, point2knob, \
+    knobs2points, points2knobs
 
 logger = logging.getLogger('autotvm')
 
@@ -74,17 +74,13 @@ class SimulatedAnnealingOptimizer(ModelOptimizer):
 
         scores = model.predict(points)
 
-        # build heap and insert initial points
-        heap_items = [(float('-inf'), - 1 - i) for i in range(num)]
-        heapq.heapify(heap_items)
-        in_heap = set(exclusive)
-        in_heap.update([x[1] for x in heap_items])
+        # the top-k set is kept as two arrays, placeholders are negative points
+        heap_scores = np.full(num, float('-inf'))
+        heap_points = -1 - np.arange(num, dtype=np.int64)
+        exclusive = np.fromiter(exclusive, dtype=np.int64, count=len(exclusive))
 
-        for s, p in zip(scores, points):
-            if s > heap_items[0][0] and p not in in_heap:
-                pop = heapq.heapreplace(heap_items, (s, p))
-                in_heap.remove(pop[1])
-                in_heap.add(p)
+        heap_scores, heap_points, _ = _update_top_k(heap_scores, heap_points,
+                                                    scores, points, exclusive)
 
         k = 0
         k_last_modify = 0
@@ -97,9 +93,7 @@ class SimulatedAnnealingOptimizer(ModelOptimizer):
             cool = 0
 
         while k < n_iter and k < k_last_modify + early_stop:
-            new_points = np.empty_like(points)
-            for i, p in enumerate(points):
-                new_points[i] = random_walk(p, self.dims)
+            new_points = random_walk_batch(points, self.dims)
 
             new_scores = model.predict(new_points)
 
@@ -109,12 +103,10 @@ class SimulatedAnnealingOptimizer(ModelOptimizer):
             points[ac_index] = new_points[ac_index]
             scores[ac_index] = new_scores[ac_index]
 
-            for s, p in zip(new_scores, new_points):
-                if s > heap_items[0][0] and p not in in_heap:
-                    pop = heapq.heapreplace(heap_items, (s, p))
-                    in_heap.remove(pop[1])
-                    in_heap.add(p)
-                    k_last_modify = k
+            heap_scores, heap_points, modified = _update_top_k(
+                heap_scores, heap_points, new_scores, new_points, exclusive)
+            if modified:
+                k_last_modify = k
 
             k += 1
             t -= cool
@@ -123,20 +115,50 @@ class SimulatedAnnealingOptimizer(ModelOptimizer):
                 t_str = "%.2f" % t
                 logger.debug("SA iter: %d\tlast_update: %d\tmax-0: %.2f\tmax-1: %.2f\ttemp: %s\t"
                              "elapsed: %.2f",
-                             k, k_last_modify, heap_items[0][0],
-                             np.max([v for v, _ in heap_items]), t_str,
+                             k, k_last_modify, np.min(heap_scores),
+                             np.max(heap_scores), t_str,
                              time.time() - tic)
 
-        heap_items.sort(key=lambda item: -item[0])
-        heap_items = [x for x in heap_items if x[0] >= 0]
+        order = np.argsort(-heap_scores, kind='stable')
+        order = order[heap_scores[order] >= 0]
         logger.debug("SA iter: %d\tlast_update: %d\telapsed: %.2f",
                      k, k_last_modify, time.time() - tic)
-        logger.debug("SA Maximums: %s", heap_items)
+        logger.debug("SA Maximums: %s", list(zip(heap_scores[order], heap_points[order])))
 
         if self.persistent:
             self.points = points
 
-        return [x[1] for x in heap_items]
+        return list(heap_points[order])
+
+
+def _update_top_k(heap_scores, heap_points, scores, points, exclusive):
+    """Merge scored points into the top-k set.
+    Points in exclusive or already in the set are ignored. A point only replaces
+    a member of the set if its score is strictly larger than the minimum of the set.
+
+    Returns
+    -------
+    heap_scores: np.ndarray
+    heap_points: np.ndarray
+        The new top-k set
+    modified: bool
+        Whether any new point entered the set
+    """
+    mask = scores > np.min(heap_scores)
+    if not mask.any():
+        return heap_scores, heap_points, False
+    points, index = np.unique(points[mask], return_index=True)
+    scores = scores[mask][index]
+    keep = ~(np.isin(points, heap_points) | np.isin(points, exclusive))
+    if not keep.any():
+        return heap_scores, heap_points, False
+
+    # members of the set come first so that they win ties
+    all_scores = np.concatenate([heap_scores, scores[keep]])
+    all_points = np.concatenate([heap_points, points[keep]])
+    top = np.argsort(-all_scores, kind='stable')[:len(heap_scores)]
+    return all_scores[top], all_points[top], bool((top >= len(heap_scores)).any())
+
 
 def random_walk(p, dims):
     """random walk as local transition
@@ -165,3 +187,34 @@ def random_walk(p, dims):
 
     # transform to index form
     return knob2point(new, dims)
+
+
+def random_walk_batch(points, dims):
+    """vectorized random walk, each point moves to a random neighbor
+    which differs in exactly one knob. This samples the same distribution
+    as calling random_walk on every point.
+
+    Parameters
+    ----------
+    points: Array of int
+        indexes of ConfigEntity
+    dims: Array of int
+        sizes of each dimension
+
+    Returns
+    -------
+    new_points: np.ndarray
+        new neighborhood indexes
+    """
+    dims = np.asarray(dims, dtype=np.int64)
+    # random_walk rejects unchanged knobs, so knob i is mutated with
+    # probability proportional to (dims[i] - 1) / dims[i]
+    weight = (dims - 1) / dims.astype(np.float64)
+    if not weight.sum():
+        return np.array(points, dtype=np.int64)
+    knobs = points2knobs(points, dims)
+    rows = np.arange(len(knobs))
+    from_i = np.random.choice(len(dims), size=len(knobs), p=weight / weight.sum())
+    shift = np.floor(np.random.random(len(knobs)) * (dims[from_i] - 1)).astype(np.int64) + 1
+    knobs[rows, from_i] = (knobs[rows, from_i] + shift) % dims[from_i]
+    return knobs2points(knobs, dims)
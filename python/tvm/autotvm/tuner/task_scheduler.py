@@ -0,0 +1,169 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# pylint: disable=invalid-name
+"""Scheduler that tunes multiple tasks and allocates trials by expected end-to-end gain"""
+import logging
+
+import numpy as np
+
+from .index_based_tuner import GridSearchTuner, RandomTuner
+from .ga_tuner import GATuner
+from .xgboost_tuner import XGBTuner
+
+logger = logging.getLogger('autotvm')
+
+
+def _create_tuner(tuner, task):
+    if callable(tuner):
+        return tuner(task)
+    if tuner == 'xgb':
+        return XGBTuner(task, loss_type='rank')
+    if tuner == 'ga':
+        return GATuner(task, pop_size=50)
+    if tuner == 'random':
+        return RandomTuner(task)
+    if tuner == 'gridsearch':
+        return GridSearchTuner(task)
+    raise ValueError("Invalid tuner: " + str(tuner))
+
+
+class TaskScheduler(object):
+    """Tune a list of tasks in rounds. Every task gets one round first, then each
+    round goes to the task with the largest expected reduction of the end-to-end
+    latency, i.e. the weighted sum of the best latencies of all tasks.
+
+    The expected gain of a task mixes the improvement of its best latency in its
+    last round (backward gradient) with an optimistic estimate that assumes the
+    latency keeps decreasing as 1 / trials (forward gradient).
+
+    Parameters
+    ----------
+    tasks: List of autotvm.task.Task
+        The tasks to tune
+    task_weights: List of float, optional
+        The weight of each task in the end-to-end latency,
+        usually the number of times the workload occurs in the model.
+        By default every task has weight 1.
+    tuner: str or callable, optional
+        The tuner of every task. One of 'xgb', 'ga', 'random' and 'gridsearch',
+        or a callable that creates a Tuner from a task.
+    trials_per_round: int, optional
+        The number of trials measured in one round
+    alpha: float, optional
+        The weight of the backward gradient in the expected gain
+    """
+    def __init__(self, tasks, task_weights=None, tuner='xgb', trials_per_round=64, alpha=0.2):
+        self.tasks = tasks
+        self.task_weights = np.array(task_weights if task_weights is not None
+                                     else [1] * len(tasks), dtype=np.float64)
+        if len(self.task_weights) != len(tasks):
+            raise ValueError("The number of weights does not match the number of tasks")
+        self.tuners = [_create_tuner(tuner, task) for task in tasks]
+        self.trials_per_round = trials_per_round
+        self.alpha = alpha
+
+        self.task_trials = [0] * len(tasks)
+        # the best latency of each task before and after its last round
+        self.best_latency = np.full(len(tasks), np.inf)
+        self.prev_latency = np.full(len(tasks), np.inf)
+        self.last_improve = [0] * len(tasks)
+        # (total trials, estimated end-to-end latency) after every round
+        self.history = []
+
+    def estimated_latency(self):
+        """Get the estimated end-to-end latency in seconds.
+
+        Returns
+        -------
+        latency: float
+            Weighted sum of the best latencies of all tasks,
+            inf if a task has no valid measurement yet.
+        """
+        return float(np.dot(self.task_weights, self.best_latency))
+
+    def _expected_gain(self, i):
+        lat, prev = self.best_latency[i], self.prev_latency[i]
+        if not np.isfinite(lat):
+            # no valid config yet, tuning this task is always worth it
+            return np.inf
+        backward = (prev - lat) / self.trials_per_round if np.isfinite(prev) else lat
+        forward = lat / max(self.task_trials[i], 1)
+        return self.task_weights[i] * (self.alpha * backward + (1 - self.alpha) * forward)
+
+    def _is_finished(self, i, early_stopping):
+        return not self.tuners[i].has_next() or \
+            self.task_trials[i] - self.last_improve[i] >= early_stopping
+
+    def tune(self, n_trial, measure_option, early_stopping=None, callbacks=()):
+        """Tune all tasks
+
+        Parameters
+        ----------
+        n_trial: int
+            The total number of trials of all tasks
+        measure_option: dict
+            The options for how to measure generated code.
+            You should use the return value of autotvm.measure_option for this argument.
+        early_stopping: int, optional
+            Stop tuning a task when its best latency has not improved in this number of trials
+        callbacks: List of callable
+            Callback functions passed to the tuner of every round,
+            see :any:`Tuner.tune`
+        """
+        early_stopping = early_stopping or 1e9
+        total = 0
+        round_ct = 0
+        while total < n_trial:
+            candidates = [i for i in range(len(self.tasks))
+                          if not self._is_finished(i, early_stopping)]
+            if not candidates:
+                break
+
+            # every task gets a first round before gradients are used
+            untouched = [i for i in candidates if self.task_trials[i] == 0]
+            if untouched:
+                idx = untouched[0]
+            else:
+                idx = max(candidates, key=self._expected_gain)
+
+            n = min(self.trials_per_round, n_trial - total)
+            tuner = self.tuners[idx]
+            counter = [0]
+            def _count(_, inputs, __):
+                counter[0] += len(inputs)
+            tuner.tune(n_trial=n, measure_option=measure_option,
+                       callbacks=list(callbacks) + [_count])
+
+            # a tuner can run out of configs before n trials
+            measured = counter[0]
+            if not measured:
+                self.last_improve[idx] = -early_stopping
+                continue
+            total += measured
+            self.task_trials[idx] += measured
+            round_ct += 1
+
+            self.prev_latency[idx] = self.best_latency[idx]
+            if tuner.best_flops > 0:
+                latency = self.tasks[idx].flop / tuner.best_flops
+                if latency < self.best_latency[idx]:
+                    self.best_latency[idx] = latency
+                    self.last_improve[idx] = self.task_trials[idx]
+
+            self.history.append((total, self.estimated_latency()))
+            logger.info("Round %d\ttask: %d\ttrials: %d/%d\testimated latency: %.4f ms",
+                        round_ct, idx, total, n_trial, 1000 * self.estimated_latency())
@@ -17,9 +17,12 @@
 # pylint: disable=unused-argument, no-self-use, invalid-name
 """Base class of tuner"""
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
+from ..database import filter_inputs
 from ..measure import MeasureInput, create_measure_batch
 from ..util import format_si_prefix
 
@@ -52,6 +55,10 @@ class Tuner(object):
         self.ttl = None
         self.n_trial = None
         self.early_stopping = None
+        self._error_ct = 0
+
+        # time spent in building and running when tuning is pipelined
+        self.pipeline_stats = None
 
     def has_next(self):
         """Whether has next untried config in the space
@@ -88,7 +95,8 @@ class Tuner(object):
         """
 
 
-    def tune(self, n_trial, measure_option, early_stopping=None, callbacks=(), si_prefix='G'):
+    def tune(self, n_trial, measure_option, early_stopping=None, callbacks=(), si_prefix='G',
+             pipeline=False, database=None):
         """Begin tuning
 
         Parameters
@@ -107,6 +115,15 @@ class Tuner(object):
             every measurement pair. See autotvm/tuner/callback.py for some examples.
         si_prefix: str
             One of tvm.autotvm.util.SI_PREFIXES. The SI prefix to use when reporting FLOPS.
+        pipeline: bool, optional
+            If True, build the next batch of configs while the current batch is measured.
+            The next batch is picked before the tuner is updated with the results of the
+            current batch. Building ahead is paused while the runner reports no free
+            devices. The time spent in each stage is stored in `self.pipeline_stats`.
+        database: autotvm.database.Database, optional
+            If set, the configs with a result in the database are not measured again,
+            their saved results are used instead, and new results are saved to it.
+            Saved results count as trials.
         """
         measure_batch = create_measure_batch(self.task, measure_option)
         n_parallel = getattr(measure_batch, 'n_parallel', 1)
@@ -120,57 +137,142 @@ class Tuner(object):
         old_level = logger.level
 
         GLOBAL_SCOPE.in_tuning = True
-        i = error_ct = 0
-        while i < n_trial:
-            if not self.has_next():
-                break
-
-            configs = self.next_batch(min(n_parallel, n_trial - i))
-
-            inputs = [MeasureInput(self.task.target, self.task, config) for config in configs]
-            results = measure_batch(inputs)
-
-            # keep best config
-            for k, (inp, res) in enumerate(zip(inputs, results)):
-                config = inp.config
-                if res.error_no == 0:
-                    flops = inp.task.flop / np.mean(res.costs)
-                    error_ct = 0
-                else:
-                    flops = 0
-                    error_ct += 1
-
-                if flops > self.best_flops:
-                    self.best_flops = flops
-                    self.best_config = config
-                    self.best_measure_pair = (inp, res)
-                    self.best_iter = i + k
-
-                logger.debug("No: %d\t%sFLOPS: %.2f/%.2f\tresult: %s\t%s",
-                             i + k + 1, si_prefix, format_si_prefix(flops, si_prefix),
-                             format_si_prefix(self.best_flops, si_prefix), res, config)
-
-            i += len(results)
-            self.ttl = min(early_stopping + self.best_iter, n_trial) - i
-
-            self.update(inputs, results)
-            for callback in callbacks:
-                callback(self, inputs, results)
-
-            if i >= self.best_iter + early_stopping:
-                logger.debug("Early stopped. Best iter: %d.", self.best_iter)
-                break
-
-            if error_ct > 150:
-                logging.basicConfig()
-                logger.warning("Too many errors happen in the tuning. Now is in debug mode")
-                logger.setLevel(logging.DEBUG)
+        self._error_ct = 0
+        try:
+            if pipeline:
+                self._tune_pipelined(measure_batch, n_parallel, n_trial, early_stopping,
+                                     callbacks, si_prefix, old_level, database)
             else:
-                logger.setLevel(old_level)
-
-        GLOBAL_SCOPE.in_tuning = False
+                i = 0
+                while i < n_trial:
+                    if not self.has_next():
+                        break
+
+                    configs = self.next_batch(min(n_parallel, n_trial - i))
+
+                    inputs = [MeasureInput(self.task.target, self.task, config)
+                              for config in configs]
+                    if database is None:
+                        results = measure_batch(inputs)
+                    else:
+                        saved_results, unsaved = filter_inputs(database, inputs)
+                        results = _merge_results(database, saved_results, unsaved,
+                                                 measure_batch(unsaved) if unsaved else [])
+
+                    i += len(results)
+                    if self._process_results(i, inputs, results, n_trial, early_stopping,
+                                             callbacks, si_prefix, old_level):
+                        break
+        finally:
+            GLOBAL_SCOPE.in_tuning = False
         del measure_batch
 
+    def _process_results(self, i, inputs, results, n_trial, early_stopping,
+                         callbacks, si_prefix, old_level):
+        """Keep the best config, update the tuner and call callbacks with
+        a measured batch. i is the number of trials including this batch.
+        Return True if tuning should stop early."""
+        i -= len(results)
+        # keep best config
+        for k, (inp, res) in enumerate(zip(inputs, results)):
+            config = inp.config
+            if res.error_no == 0:
+                flops = inp.task.flop / np.mean(res.costs)
+                self._error_ct = 0
+            else:
+                flops = 0
+                self._error_ct += 1
+
+            if flops > self.best_flops:
+                self.best_flops = flops
+                self.best_config = config
+                self.best_measure_pair = (inp, res)
+                self.best_iter = i + k
+
+            logger.debug("No: %d\t%sFLOPS: %.2f/%.2f\tresult: %s\t%s",
+                         i + k + 1, si_prefix, format_si_prefix(flops, si_prefix),
+                         format_si_prefix(self.best_flops, si_prefix), res, config)
+
+        i += len(results)
+        self.ttl = min(early_stopping + self.best_iter, n_trial) - i
+
+        self.update(inputs, results)
+        for callback in callbacks:
+            callback(self, inputs, results)
+
+        if i >= self.best_iter + early_stopping:
+            logger.debug("Early stopped. Best iter: %d.", self.best_iter)
+            return True
+
+        if self._error_ct > 150:
+            logging.basicConfig()
+            logger.warning("Too many errors happen in the tuning. Now is in debug mode")
+            logger.setLevel(logging.DEBUG)
+        else:
+            logger.setLevel(old_level)
+        return False
+
+    def _tune_pipelined(self, measure_batch, n_parallel, n_trial, early_stopping,
+                        callbacks, si_prefix, old_level, database=None):
+        """Tuning loop that builds batch N+1 in a thread while batch N is measured"""
+        builder, runner = measure_batch.builder, measure_batch.runner
+        stats = {"build_time": 0.0, "run_time": 0.0, "wall_time": 0.0}
+        state = {"submitted": 0}
+
+        def _build(inputs):
+            if not inputs:
+                return []
+            tic = time.time()
+            build_results = builder.build(inputs)
+            stats["build_time"] += time.time() - tic
+            return build_results
+
+        def _submit():
+            if state["submitted"] >= n_trial or not self.has_next():
+                return None
+            configs = self.next_batch(min(n_parallel, n_trial - state["submitted"]))
+            inputs = [MeasureInput(self.task.target, self.task, config) for config in configs]
+            state["submitted"] += len(inputs)
+            if database is None:
+                return inputs, None, inputs, pool.submit(_build, inputs)
+            saved_results, unsaved = filter_inputs(database, inputs)
+            return inputs, saved_results, unsaved, pool.submit(_build, unsaved)
+
+        tic = time.time()
+        i = 0
+        # the pool is shut down, waiting for a build ahead, also if tuning fails
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = _submit()
+            while pending is not None:
+                inputs, saved_results, unsaved, future = pending
+                build_results = future.result()
+
+                # backpressure: do not build ahead if no device can take the next batch
+                free = runner.get_num_free_devices()
+                pending = _submit() if free is None or free > 0 else None
+
+                run_tic = time.time()
+                results = runner.run(unsaved, build_results) if unsaved else []
+                stats["run_time"] += time.time() - run_tic
+                if saved_results is not None:
+                    results = _merge_results(database, saved_results, unsaved, results)
+
+                if pending is None:
+                    pending = _submit()
+
+                i += len(results)
+                if self._process_results(i, inputs, results, n_trial, early_stopping,
+                                         callbacks, si_prefix, old_level):
+                    break
+
+        stats["wall_time"] = time.time() - tic
+        stats["build_utilization"] = stats["build_time"] / max(stats["wall_time"], 1e-9)
+        stats["run_utilization"] = stats["run_time"] / max(stats["wall_time"], 1e-9)
+        self.pipeline_stats = stats
+        logger.info("Pipelined tuning: %.2fs wall, builder busy %.1f%%, runner busy %.1f%%",
+                    stats["wall_time"], 100 * stats["build_utilization"],
+                    100 * stats["run_utilization"])
+
     def reset(self):
         """reset the status of tuner"""
         self.best_config = None
@@ -186,3 +288,12 @@ class Tuner(object):
             Previous tuning records
         """
         raise NotImplementedError()
+
+
+def _merge_results(database, saved_results, unsaved, results):
+    """Save the results of the unsaved inputs to the database and fill them in
+    the gaps of the saved results"""
+    if unsaved:
+        database.save_batch(list(zip(unsaved, results)))
+    results = iter(results)
+    return [res if res is not None else next(results) for res in saved_results]
@@ -30,7 +30,7 @@ except ImportError:
 from .. import feature
 from ..util import get_rank
 from .metric import max_curve, recall_curve, cover_curve
-from .model_based_tuner import CostModel, FeatureCache
+from .model_based_tuner import CostModel, FeatureCache, FeatureStore
 
 logger = logging.getLogger('autotvm')
 
@@ -57,6 +57,12 @@ class XGBoostCostModel(CostModel):
                                'itervar' and 'curve' has better transferability,
                                'knob' is faster.
         For cross-device or cross-operator tuning, you can use 'curve' only.
+
+        If is 'global', use fixed-length curve features plus a descriptor of the
+        workload, so that one model can be trained on the records of many tasks.
+        Such a model is trained offline with `fit_log`, saved with `save`, and
+        loaded by :any:`XGBTuner.load_global_model` as a warm start.
+        task can be None for a 'global' model that is only trained offline.
     loss_type: str
         If is 'reg', use regression loss to train cost model.
                      The cost model predicts the normalized flops.
@@ -78,9 +84,11 @@ class XGBoostCostModel(CostModel):
                                "Please install its python package first. "
                                "Help: (https://xgboost.readthedocs.io/en/latest/) ")
 
+        if task is None and feature_type != 'global':
+            raise RuntimeError("A task is required for feature type " + feature_type)
         self.task = task
-        self.target = task.target
-        self.space = task.config_space
+        self.target = task.target if task else None
+        self.space = task.config_space if task else None
 
         self.fea_type = feature_type
         self.loss_type = loss_type
@@ -129,6 +137,8 @@ class XGBoostCostModel(CostModel):
             self.feature_extract_func = _extract_knob_feature_index
         elif feature_type == 'curve':
             self.feature_extract_func = _extract_curve_feature_index
+        elif feature_type == 'global':
+            self.feature_extract_func = _extract_global_feature_index
         else:
             raise RuntimeError("Invalid feature type " + feature_type)
 
@@ -137,6 +147,7 @@ class XGBoostCostModel(CostModel):
         else:
             self.feature_cache = FeatureCache()
         self.upper_model = upper_model
+        self.feature_cache_size = 100000
         self.feature_extra_ct = 0
         self.pool = None
         self.base_model = None
@@ -154,10 +165,12 @@ class XGBoostCostModel(CostModel):
         self._close_pool()
 
         # use global variable to pass common arguments
-        global _extract_space, _extract_target, _extract_task
+        global _extract_space, _extract_target, _extract_task, _extract_stores
         _extract_space = space
         _extract_target = target
         _extract_task = task
+        # workers inherit the shared memory of the store and write features into it
+        _extract_stores = dict(self.feature_cache.feature_stores)
         self.pool = multiprocessing.Pool(self.num_threads)
 
     def _close_pool(self):
@@ -214,6 +227,9 @@ class XGBoostCostModel(CostModel):
                      self.feature_cache.size(self.fea_type))
 
     def fit_log(self, records, plan_size):
+        if self.fea_type == 'global':
+            return self._fit_log_global(records, plan_size)
+
         tic = time.time()
 
         # filter data, only pick the data with a same task
@@ -275,6 +291,83 @@ class XGBoostCostModel(CostModel):
 
         return True
 
+    def _fit_log_global(self, records, plan_size):
+        """Train on the records of all tasks. Throughputs are normalized by the best
+        throughput of their workload, and with rank loss every workload is a query group."""
+        tic = time.time()
+        data = list(records)
+        logger.debug("XGB load %d entries from history log file", len(data))
+
+        self._reset_pool(self.space, self.target, self.task)
+        res = self._get_pool().map(_extract_global_feature_log, data)
+
+        groups = {}
+        for item in res:
+            if item is not None:
+                x, y, key = item
+                groups.setdefault(key, []).append((x, y))
+
+        xs, ys, group_sizes = [], [], []
+        for items in groups.values():
+            y_max = max(y for _, y in items)
+            if y_max <= 1e-8:  # no valid measurement of this workload
+                continue
+            for x, y in items:
+                xs.append(x)
+                ys.append(y / y_max)
+            group_sizes.append(len(items))
+
+        if len(xs) < 500:  # no enough samples
+            return False
+
+        dtrain = xgb.DMatrix(np.array(xs), np.array(ys))
+        if self.loss_type == 'rank':
+            dtrain.set_group(group_sizes)
+
+        plan_size *= 2
+        self.bst = xgb.train(self.xgb_params, dtrain,
+                             num_boost_round=400,
+                             callbacks=[custom_callback(
+                                 stopping_rounds=100,
+                                 metric='tr-a-recall@%d' % plan_size,
+                                 evals=[(dtrain, 'tr')],
+                                 maximize=True,
+                                 fevals=[
+                                     xgb_average_recalln_curve_score(plan_size),
+                                 ],
+                                 verbose_eval=self.log_interval)])
+
+        logger.debug("XGB global train: %.2f\tobs: %d\tworkloads: %d",
+                     time.time() - tic, len(xs), len(group_sizes))
+        return True
+
+    def save(self, filename):
+        """Save the trained booster to a file
+
+        Parameters
+        ----------
+        filename: str
+            The file to save to
+        """
+        self.bst.set_attr(feature_type=self.fea_type, loss_type=self.loss_type)
+        self.bst.save_model(filename)
+
+    def load(self, filename):
+        """Load a booster saved by :any:`save`
+
+        Parameters
+        ----------
+        filename: str
+            The file to load from
+        """
+        bst = xgb.Booster(self.xgb_params)
+        bst.load_model(filename)
+        fea_type = bst.attr("feature_type")
+        if fea_type is not None and fea_type != self.fea_type:
+            raise RuntimeError("The model in %s uses feature type %s, but %s is expected" %
+                               (filename, fea_type, self.fea_type))
+        self.bst = bst
+
     def predict(self, xs, output_margin=False):
         feas = self._get_feature(xs)
         dtest = xgb.DMatrix(feas)
@@ -296,32 +389,49 @@ class XGBoostCostModel(CostModel):
 
     def _get_feature(self, indexes):
         """get features for indexes, run extraction if we do not have cache for them"""
-        # free feature cache
-        if self.feature_cache.size(self.fea_type) >= 100000:
-            self.feature_cache.clear(self.fea_type)
-
-        fea_cache = self.feature_cache.get(self.fea_type)
-
         indexes = np.array(indexes)
-        need_extract = [x for x in indexes if x not in fea_cache]
-
-        if need_extract:
+        store = self.feature_cache.get_store(self.fea_type)
+        if store is None:
+            store = self._create_feature_store(indexes)
+            if store is None:  # feature extraction failed for all indexes
+                return np.zeros((len(indexes), 0), dtype=np.float32)
+
+        # keep every chunk small enough to stay in the store while it is assembled
+        chunk = max(store.capacity // 2, 1)
+        if len(indexes) > chunk:
+            return np.concatenate([self._get_feature(indexes[i:i + chunk])
+                                   for i in range(0, len(indexes), chunk)])
+
+        rows = store.lookup(indexes)
+        need_extract = np.unique(indexes[rows < 0])
+        if len(need_extract):
+            new_rows = store.allocate(need_extract, pinned=rows[rows >= 0])
             pool = self._get_pool()
-            feas = pool.map(self.feature_extract_func, need_extract)
-            for i, fea in zip(need_extract, feas):
-                fea_cache[i] = fea
-
-        feature_len = None
-        for idx in indexes:
-            if fea_cache[idx] is not None:
-                feature_len = fea_cache[idx].shape[-1]
+            valid = pool.map(_extract_feature_to_store,
+                             [(self.feature_extract_func, self.fea_type, int(index), int(row))
+                              for index, row in zip(need_extract, new_rows)])
+            store.commit(new_rows, valid)
+            rows = store.lookup(indexes)
+
+        return store.gather(rows)
+
+    def _create_feature_store(self, indexes):
+        """Create the feature store once the feature length is known.
+        The pool is restarted so that its workers can write into the store."""
+        for index in indexes:
+            fea = self.feature_extract_func(index)
+            if fea is not None:
                 break
+        else:
+            return None
 
-        ret = np.empty((len(indexes), feature_len), dtype=np.float32)
-        for i, ii in enumerate(indexes):
-            t = fea_cache[ii]
-            ret[i, :] = t if t is not None else 0
-        return ret
+        store = FeatureStore(len(fea), capacity=self.feature_cache_size)
+        row = store.allocate([index])
+        store.data[row[0]] = fea
+        store.commit(row, [True])
+        self.feature_cache.set_store(self.fea_type, store)
+        self._reset_pool(self.space, self.target, self.task)
+        return store
 
     def __del__(self):
         self._close_pool()
@@ -330,6 +440,17 @@ class XGBoostCostModel(CostModel):
 _extract_space = None
 _extract_target = None
 _extract_task = None
+_extract_stores = {}
+
+def _extract_feature_to_store(arg):
+    """extract the feature of an index and write it to a row of the shared feature store"""
+    func, fea_type, index, row = arg
+    store = _extract_stores[fea_type]
+    fea = func(index)
+    if fea is None or len(fea) != store.feature_len:
+        return False
+    store.data[row] = fea
+    return True
 
 def _extract_itervar_feature_index(index):
     """extract iteration var feature for an index in extract_space"""
@@ -416,6 +537,66 @@ def _extract_curve_feature_log(arg):
     except Exception:  # pylint: disable=broad-except
         return None
 
+# fixed lengths of the components of 'global' features, longer ones are truncated
+_GLOBAL_CURVE_LEN = 1200
+_GLOBAL_OPTION_LEN = 8
+_GLOBAL_WORKLOAD_LEN = 16
+
+def _fit_length(fea, length):
+    """pad with zeros or truncate a feature vector to a fixed length"""
+    ret = np.zeros(length, dtype=np.float32)
+    fea = np.asarray(fea, dtype=np.float32)[:length]
+    ret[:len(fea)] = fea
+    return ret
+
+def _workload_feature(task):
+    """a fixed-length descriptor of a workload: the log of its flop count and of
+    the first integers (shapes, strides, ...) in its arguments"""
+    ints = []
+    def _flatten(x):
+        if isinstance(x, (tuple, list)):
+            for v in x:
+                _flatten(v)
+        elif isinstance(x, int) and not isinstance(x, bool):
+            ints.append(x)
+    _flatten(task.args)
+    fea = [np.log2(1 + (task.flop or 0))] + [np.log2(1 + abs(x)) for x in ints]
+    return _fit_length(fea, _GLOBAL_WORKLOAD_LEN + 1)
+
+def _global_feature(sch, args, config, task):
+    curve = feature.get_buffer_curve_sample_flatten(sch, args, sample_n=20)
+    return np.concatenate((_fit_length(curve, _GLOBAL_CURVE_LEN),
+                           _fit_length(list(config.get_other_option().values()),
+                                       _GLOBAL_OPTION_LEN),
+                           _workload_feature(task)))
+
+def _extract_global_feature_index(index):
+    """extract task-agnostic feature for an index in extract_space"""
+    try:
+        config = _extract_space.get(index)
+        with _extract_target:
+            sch, args = _extract_task.instantiate(config)
+        return _global_feature(sch, args, config, _extract_task)
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+def _extract_global_feature_log(arg):
+    """extract task-agnostic feature for log items, also return the workload key"""
+    try:
+        inp, res = arg
+        config = inp.config
+        with inp.target:
+            sch, args = inp.task.instantiate(config)
+        x = _global_feature(sch, args, config, inp.task)
+
+        if res.error_no == 0:
+            y = inp.task.flop / np.mean(res.costs)
+        else:
+            y = 0.0
+        return x, y, (str(inp.target), inp.task.workload)
+    except Exception:  # pylint: disable=broad-except
+        return None
+
 def custom_callback(stopping_rounds, metric, fevals, evals=(), log_file=None,
                     maximize=False, verbose_eval=True):
     """callback function for xgboost to support multiple custom evaluation functions"""
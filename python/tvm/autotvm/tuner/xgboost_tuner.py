@@ -16,6 +16,7 @@
 # under the License.
 """Tuner that uses xgboost as cost model"""
 
+from ..env import GLOBAL_SCOPE
 from .model_based_tuner import ModelBasedTuner, ModelOptimizer
 from .xgboost_cost_model import XGBoostCostModel
 from .sa_model_optimizer import SimulatedAnnealingOptimizer
@@ -86,6 +87,31 @@ class XGBTuner(ModelBasedTuner):
         super(XGBTuner, self).__init__(task, cost_model, optimizer,
                                        plan_size, diversity_filter_ratio)
 
+    def load_global_model(self, filename):
+        """Warm start the tuner with a task-agnostic model trained offline.
+        The model is used as the base model of the cost model, like the one
+        trained by :any:`load_history`.
+
+        Parameters
+        ----------
+        filename: str
+            A model saved by XGBoostCostModel.save with feature_type 'global'
+        """
+        GLOBAL_SCOPE.in_tuning = True
+        base_model = XGBoostCostModel(self.task, 'global', self.cost_model.loss_type,
+                                      self.cost_model.num_threads,
+                                      self.cost_model.log_interval, self.cost_model)
+        base_model.load(filename)
+
+        if not self.trials:
+            # no plan yet, use base model to select initial trials
+            self.trials = self.model_optimizer.find_maximums(base_model, self.plan_size,
+                                                             self.visited)
+            self.trial_pt = 0
+
+        self.cost_model.load_basemodel(base_model)
+        GLOBAL_SCOPE.in_tuning = False
+
     def tune(self, *args, **kwargs):  # pylint: disable=arguments-differ
         super(XGBTuner, self).tune(*args, **kwargs)
 
@@ -17,12 +17,14 @@
 """Util to invoke C/C++ compilers in the system."""
 # pylint: disable=invalid-name
 from __future__ import absolute_import as _abs
+import hashlib
 import sys
 import subprocess
 import os
 
 from .._ffi.base import py_str
 from .util import tempdir
+from . import compile_cache as _compile_cache
 
 def create_shared(output,
                   objects,
@@ -78,6 +80,63 @@ def create_executable(output,
         raise ValueError("Unsupported platform")
 
 
+def create_object(output,
+                  source,
+                  options=None,
+                  cc="g++"):
+    """Compile a source file to a position independent object file.
+
+    Parameters
+    ----------
+    output : str
+        The target object file.
+
+    source : str
+        The source file.
+
+    options : List[str]
+        The list of additional options string.
+
+    cc : Optional[str]
+        The compiler command.
+    """
+    if sys.platform == "darwin" or sys.platform.startswith("linux"):
+        _linux_compile(output, source, list(options or []) + ["-c", "-fPIC"], cc)
+    else:
+        raise ValueError("Unsupported platform")
+
+
+def source_digest(source, options=None, cc="g++"):
+    """Get the digest of a preprocessed source file, which covers the
+    headers it includes.
+
+    Parameters
+    ----------
+    source : str
+        The source file.
+
+    options : List[str]
+        The list of additional options string, e.g. include paths.
+
+    cc : Optional[str]
+        The compiler command.
+
+    Returns
+    -------
+    digest : str or None
+        The sha256 hex digest, None if the source cannot be preprocessed.
+    """
+    try:
+        proc = subprocess.Popen([cc, "-E", "-P", source] + list(options or []),
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError:
+        return None
+    (out, _) = proc.communicate()
+    if proc.returncode != 0:
+        return None
+    return hashlib.sha256(out).hexdigest()
+
+
 def get_target_by_dump_machine(compiler):
     """ Functor of get_target_triple that can get the target triple using compiler.
 
@@ -207,14 +266,48 @@ def _linux_compile(output, objects, options,
         cmd += objects
     if options:
         cmd += options
-    proc = subprocess.Popen(
-        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    (out, _) = proc.communicate()
-    if proc.returncode != 0:
-        msg = "Compilation error:\n"
-        msg += py_str(out)
-        msg += "\nCommand line: " + " ".join(cmd)
-        raise RuntimeError(msg)
+
+    def _compile():
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        (out, _) = proc.communicate()
+        if proc.returncode != 0:
+            msg = "Compilation error:\n"
+            msg += py_str(out)
+            msg += "\nCommand line: " + " ".join(cmd)
+            raise RuntimeError(msg)
+
+    cache = _compile_cache.current()
+    key = _compile_key(cmd, output, objects, options) if cache is not None else None
+    if key is None:
+        _compile()
+    else:
+        cache.build(key, os.path.splitext(output)[1], output, _compile)
+
+
+def _compile_key(cmd, output, objects, options):
+    """Get the key of the output of a compile command in the compile cache.
+
+    The key covers the compiler version, the flags, the content of the objects
+    and the preprocessed sources, which includes the headers they include.
+    Libraries passed with -l are not covered. Returns None if the output
+    cannot be cached.
+    """
+    objects = [objects] if isinstance(objects, str) else list(objects)
+    inputs = []
+    for path in objects:
+        if not os.path.isfile(path):
+            return None
+        if path.endswith((".c", ".cc", ".cpp", ".cxx")):
+            digest = source_digest(path, options, cmd[0])
+            if digest is None:
+                return None
+            inputs.append(digest)
+        else:
+            inputs.append(_compile_cache.hash_file(path))
+    flags = [x for x in cmd if x != output and x not in objects]
+    return _compile_cache.CompileCache.key(
+        _compile_cache.compiler_version(cmd[0]), flags, inputs)
 
 
 def _windows_shared(output, objects, options):
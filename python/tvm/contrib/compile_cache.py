@@ -0,0 +1,480 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Content-addressed on-disk cache of compiler outputs.
+
+An entry is a file named by the digest of everything the output depends on:
+the content of the inputs, the options and the compiler version. Entries are
+written to a temporary file and moved into place, and the least recently used
+entries are evicted when the cache exceeds its maximum size, so the cache can
+be shared by concurrent processes.
+
+The global cache used by :any:`tvm.contrib.cc` and :any:`tvm.contrib.nvcc` is
+enabled with :any:`enable` or by setting the environment variables
+``TVM_COMPILE_CACHE`` (the directory) and ``TVM_COMPILE_CACHE_MAX_SIZE``
+(in bytes). The variables are inherited by the processes of tuning builders.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from .._ffi.base import py_str
+from . import util
+
+_COMPILER_VERSIONS = {}
+# path of a lock file -> lock of the threads of this process
+_THREAD_LOCKS = {}
+_THREAD_LOCKS_GUARD = threading.Lock()
+
+
+def compiler_version(compiler):
+    """Get the version string of a compiler, memoized per process.
+
+    Parameters
+    ----------
+    compiler : str
+        The compiler command
+
+    Returns
+    -------
+    version : str
+        The output of ``compiler --version``, empty if it cannot be run
+    """
+    if compiler not in _COMPILER_VERSIONS:
+        try:
+            proc = subprocess.Popen([compiler, "--version"],
+                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            (out, _) = proc.communicate()
+            _COMPILER_VERSIONS[compiler] = py_str(out) if proc.returncode == 0 else ""
+        except OSError:
+            _COMPILER_VERSIONS[compiler] = ""
+    return _COMPILER_VERSIONS[compiler]
+
+
+def hash_file(path):
+    """Get the sha256 digest of the content of a file.
+
+    Parameters
+    ----------
+    path : str
+        The file
+
+    Returns
+    -------
+    digest : str
+        The hex digest
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class _Lock(object):
+    """A file lock excluding the threads of this process too.
+
+    fcntl locks belong to the process: its threads do not exclude each other,
+    and closing a lock file releases the lock held by another thread.
+    """
+    def __init__(self, path):
+        with _THREAD_LOCKS_GUARD:
+            self._thread_lock = _THREAD_LOCKS.setdefault(os.path.abspath(path),
+                                                         threading.Lock())
+        self._thread_lock.acquire()
+        self._file_lock = None
+        try:
+            self._file_lock = util.filelock(path)
+        finally:
+            if self._file_lock is None:
+                self._thread_lock.release()
+
+    def release(self):
+        """Release the lock"""
+        self._file_lock.release()
+        self._thread_lock.release()
+
+
+class CompileCache(object):
+    """Content-addressed cache of compiler outputs.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of the cache
+
+    max_size : int, optional
+        The maximum total size of the entries in bytes, unlimited if None.
+        The least recently used entries are evicted when it is exceeded.
+    """
+    # number of lock files the keys are spread over
+    NUM_LOCKS = 64
+    STATS_FILE = "stats"
+    # counts of the events compacted out of STATS_FILE
+    STATS_TOTAL_FILE = "stats.total"
+    # size of STATS_FILE above which it is compacted
+    MAX_STATS_SIZE = 1 << 20
+
+    def __init__(self, cache_dir, max_size=None):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(os.path.join(cache_dir, "locks"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+        self._num_events = 0
+        # bytes stored since the size of the cache was last checked
+        self._unchecked_size = None
+
+    @staticmethod
+    def key(*parts):
+        """Get the key of an output.
+
+        Parameters
+        ----------
+        parts : list of str, bytes or list
+            Everything the output depends on
+
+        Returns
+        -------
+        key : str
+            The key
+        """
+        hasher = hashlib.sha256()
+        for part in parts:
+            if not isinstance(part, bytes):
+                part = str(part).encode("utf-8")
+            hasher.update(part)
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def path(self, key, suffix=""):
+        """Get the path of an entry, it may not exist"""
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def _record(self, event, compact=True):
+        """Count a hit (h), miss (m) or eviction (e) in this process and in the
+        stats file shared by all processes. Single byte appends are atomic.
+        The stats file is compacted when it grows too large, unless compact is
+        False because the caller holds the lock of the cache."""
+        with self._lock:
+            if event == "h":
+                self._hits += 1
+            elif event == "m":
+                self._misses += 1
+            else:
+                self._evictions += 1
+            self._num_events += 1
+            check = compact and self._num_events % 1024 == 0
+        with open(os.path.join(self.cache_dir, self.STATS_FILE), "a") as f:
+            f.write(event)
+        if check:
+            try:
+                compact = os.path.getsize(os.path.join(self.cache_dir, self.STATS_FILE)) > \
+                    self.MAX_STATS_SIZE
+            except OSError:
+                compact = False
+            if compact:
+                lock = _Lock(os.path.join(self.cache_dir, ".lock"))
+                try:
+                    self._compact_stats()
+                finally:
+                    lock.release()
+
+    def _read_stats_total(self):
+        try:
+            with open(os.path.join(self.cache_dir, self.STATS_TOTAL_FILE)) as f:
+                return [int(x) for x in f.read().split()]
+        except (IOError, OSError, ValueError):
+            return [0, 0, 0]
+
+    def _compact_stats(self):
+        """Move the counts of the events in the stats file to the total file.
+        Must be called with the lock of the cache held."""
+        path = os.path.join(self.cache_dir, self.STATS_FILE)
+        compacted = path + ".compact"
+        try:
+            # appends after the move go to a new stats file
+            os.replace(path, compacted)
+        except OSError:
+            return
+        with open(compacted) as f:
+            events = f.read()
+        total = self._read_stats_total()
+        total = [total[0] + events.count("h"), total[1] + events.count("m"),
+                 total[2] + events.count("e")]
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=self.cache_dir)
+        with os.fdopen(fd, "w") as f:
+            f.write("%d %d %d\n" % tuple(total))
+        os.replace(tmp_path, os.path.join(self.cache_dir, self.STATS_TOTAL_FILE))
+        os.remove(compacted)
+
+    def _copy_entry(self, key, suffix, target):
+        path = self.path(key, suffix)
+        try:
+            shutil.copyfile(path, target)
+        except (IOError, OSError):
+            return False
+        # mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True
+
+    def fetch(self, key, suffix, target):
+        """Copy an entry to a file.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry
+
+        suffix : str
+            The suffix of the entry, e.g. the file extension of the output
+
+        target : str
+            The file to copy the entry to
+
+        Returns
+        -------
+        hit : bool
+            Whether the entry exists
+        """
+        hit = self._copy_entry(key, suffix, target)
+        self._record("h" if hit else "m")
+        return hit
+
+    def store(self, key, suffix, source):
+        """Copy a file into an entry.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry
+
+        suffix : str
+            The suffix of the entry
+
+        source : str
+            The file to store
+
+        Returns
+        -------
+        path : str
+            The path of the entry
+        """
+        path = self.path(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if self.max_size is not None:
+            # scanning the cache is expensive, do it every max_size / 16 bytes stored
+            size = os.path.getsize(path)
+            with self._lock:
+                check = self._unchecked_size is None or \
+                    self._unchecked_size + size > self.max_size // 16
+                self._unchecked_size = 0 if check else self._unchecked_size + size
+            if check:
+                self.evict()
+        return path
+
+    def build(self, key, suffix, output, func):
+        """Get an output from the cache, or build it and store it.
+
+        Processes building the same key at the same time wait for the
+        first one and use its output.
+
+        Parameters
+        ----------
+        key : str
+            The key of the output
+
+        suffix : str
+            The suffix of the entry
+
+        output : str
+            The output file
+
+        func : callable
+            The function building the output file
+
+        Returns
+        -------
+        hit : bool
+            Whether the output was in the cache
+        """
+        if self._copy_entry(key, suffix, output):
+            self._record("h")
+            return True
+        lock = _Lock(os.path.join(
+            self.cache_dir, "locks", "%d.lock" % (int(key[:8], 16) % self.NUM_LOCKS)))
+        try:
+            # another process may have built it while we waited for the lock
+            hit = self._copy_entry(key, suffix, output)
+            self._record("h" if hit else "m")
+            if not hit:
+                func()
+                self.store(key, suffix, output)
+        finally:
+            lock.release()
+        return hit
+
+    def _entries(self):
+        for name in os.listdir(self.cache_dir):
+            subdir = os.path.join(self.cache_dir, name)
+            if len(name) != 2 or not os.path.isdir(subdir):
+                continue
+            for entry in os.listdir(subdir):
+                if entry.startswith("."):
+                    continue
+                path = os.path.join(subdir, entry)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def size(self):
+        """Get the number of entries and their total size in bytes"""
+        entries = list(self._entries())
+        return len(entries), sum(x[1] for x in entries)
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits max_size,
+        and compact the stats file"""
+        if self.max_size is None:
+            return
+        lock = _Lock(os.path.join(self.cache_dir, ".lock"))
+        try:
+            entries = sorted(self._entries())
+            total = sum(x[1] for x in entries)
+            for _, size, path in entries:
+                if total <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self._record("e", compact=False)
+            self._compact_stats()
+        finally:
+            lock.release()
+
+    def stats(self, shared=False):
+        """Get the statistics of the cache.
+
+        Parameters
+        ----------
+        shared : bool, optional
+            Whether to count the lookups of all processes since the last
+            reset_stats instead of the ones of this process only
+
+        Returns
+        -------
+        stats : dict
+            The number of hits, misses and evictions, and the hit rate
+        """
+        if shared:
+            try:
+                with open(os.path.join(self.cache_dir, self.STATS_FILE)) as f:
+                    events = f.read()
+            except (IOError, OSError):
+                events = ""
+            hits, misses, evictions = self._read_stats_total()
+            hits += events.count("h")
+            misses += events.count("m")
+            evictions += events.count("e")
+        else:
+            with self._lock:
+                hits, misses, evictions = self._hits, self._misses, self._evictions
+        lookups = hits + misses
+        return {"hits": hits, "misses": misses, "evictions": evictions,
+                "hit_rate": float(hits) / lookups if lookups else 0.0}
+
+    def reset_stats(self):
+        """Reset the statistics of this process and the shared ones"""
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+        lock = _Lock(os.path.join(self.cache_dir, ".lock"))
+        try:
+            open(os.path.join(self.cache_dir, self.STATS_FILE), "w").close()
+            if os.path.exists(os.path.join(self.cache_dir, self.STATS_TOTAL_FILE)):
+                os.remove(os.path.join(self.cache_dir, self.STATS_TOTAL_FILE))
+        finally:
+            lock.release()
+
+
+_CURRENT = {"key": None, "cache": None}
+
+
+def current():
+    """Get the global compile cache.
+
+    Returns
+    -------
+    cache : CompileCache or None
+        The cache configured by the environment, None if it is disabled
+    """
+    cache_dir = os.environ.get("TVM_COMPILE_CACHE")
+    if not cache_dir:
+        return None
+    max_size = os.environ.get("TVM_COMPILE_CACHE_MAX_SIZE")
+    key = (cache_dir, max_size)
+    if _CURRENT["key"] != key:
+        _CURRENT["cache"] = CompileCache(cache_dir, int(max_size) if max_size else None)
+        _CURRENT["key"] = key
+    return _CURRENT["cache"]
+
+
+def enable(cache_dir, max_size=10 << 30):
+    """Enable the global compile cache in this process and in the processes it starts.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of the cache
+
+    max_size : int, optional
+        The maximum total size of the entries in bytes
+
+    Returns
+    -------
+    cache : CompileCache
+        The cache
+    """
+    os.environ["TVM_COMPILE_CACHE"] = cache_dir
+    if max_size is None:
+        os.environ.pop("TVM_COMPILE_CACHE_MAX_SIZE", None)
+    else:
+        os.environ["TVM_COMPILE_CACHE_MAX_SIZE"] = str(max_size)
+    return current()
+
+
+def disable():
+    """Disable the global compile cache"""
+    os.environ.pop("TVM_COMPILE_CACHE", None)
+    os.environ.pop("TVM_COMPILE_CACHE_MAX_SIZE", None)
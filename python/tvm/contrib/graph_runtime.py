@@ -15,13 +15,22 @@
 # specific language governing permissions and limitations
 # under the License.
 """Minimum graph runtime that executes graph containing TVM PackedFunc."""
+import ctypes
+import logging
+
 import numpy as np
 import tvm._ffi
 
 from tvm.rpc import _ffi_api as _rpc_ffi_api
 from tvm.rpc import base as rpc_base
 from tvm._ffi.base import string_types
-from tvm._ffi.runtime_ctypes import TVMContext
+from tvm._ffi.runtime_ctypes import TVMContext, TVMArrayHandle
+from tvm.runtime import ndarray as _nd
+
+logger = logging.getLogger("graph_runtime")
+
+# the alignment that zero-copy buffers must have, kAllocAlignment in the runtime
+ZERO_COPY_ALIGNMENT = 128
 
 
 def create(graph_json_str, libmod, ctx):
@@ -112,6 +121,66 @@ def get_device_ctx(libmod, ctx):
     return ctx, num_rpc_ctx, device_type_id
 
 
+class _OutputView(np.ndarray):
+    """numpy array that keeps the runtime array it views alive"""
+    owner = None
+
+
+def empty_aligned(shape, dtype="float32"):
+    """Allocate an uninitialized numpy array that can be bound to a graph
+    without copying, see :any:`GraphModule.set_input_zero_copy`.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        The shape of the array
+
+    dtype : str or numpy.dtype
+        The data type of the array
+
+    Returns
+    -------
+    arr : numpy.ndarray
+        The array, aligned to ZERO_COPY_ALIGNMENT bytes
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buf = np.empty(nbytes + ZERO_COPY_ALIGNMENT, dtype=np.uint8)
+    offset = (-buf.ctypes.data) % ZERO_COPY_ALIGNMENT
+    return buf[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def _zero_copy_view(value, expected, writable=False):
+    """Wrap value as an NDArray sharing its memory if it matches the shape, dtype,
+    context and alignment of the runtime-owned array expected.
+
+    Returns
+    -------
+    view : tuple of (NDArray, object) or None
+        The array and the objects to keep alive while it is bound,
+        None if value cannot be bound without copying.
+    """
+    if type(value).__name__ == "PyCapsule":
+        value = _nd.from_dlpack(value)
+    if isinstance(value, _nd.NDArray):
+        handle = value.handle.contents
+        address = (handle.data or 0) + handle.byte_offset
+        if (tuple(value.shape) != tuple(expected.shape) or value.dtype != expected.dtype
+                or value.ctx != expected.ctx or address % ZERO_COPY_ALIGNMENT):
+            return None
+        return value, value
+    if not isinstance(value, np.ndarray):
+        return None
+    if (expected.ctx.device_type != TVMContext.STR2MASK["cpu"]
+            or value.shape != tuple(expected.shape) or str(value.dtype) != expected.dtype
+            or not value.flags["C_CONTIGUOUS"] or value.ctypes.data % ZERO_COPY_ALIGNMENT
+            or (writable and not value.flags["WRITEABLE"])):
+        return None
+    arr, shape = _nd.numpyasarray(value)
+    view = _nd._make_array(ctypes.cast(ctypes.pointer(arr), TVMArrayHandle), True, False)
+    return view, (value, arr, shape)
+
+
 class GraphModule(object):
     """Wrapper runtime module.
 
@@ -139,6 +208,13 @@ class GraphModule(object):
         self._get_num_outputs = module["get_num_outputs"]
         self._load_params = module["load_params"]
         self._share_params = module["share_params"]
+        self._set_input_zero_copy = module["set_input_zero_copy"]
+        self._set_output_zero_copy = None
+        # external buffers bound to inputs and outputs, kept alive while bound
+        self._input_refs = {}
+        self._output_refs = {}
+        # outputs that could not be bound and are copied after every run
+        self._output_copies = {}
 
     def set_input(self, key=None, value=None, **params):
         """Set inputs to the module via kwargs
@@ -155,6 +231,7 @@ class GraphModule(object):
            Additional arguments
         """
         if key is not None:
+            self._unbind_input(key)
             self._get_input(key).copyfrom(value)
 
         if params:
@@ -167,8 +244,113 @@ class GraphModule(object):
                 # params from set_input
                 val = self._get_input(k)
                 if val:
+                    self._unbind_input(k)
                     self._get_input(k).copyfrom(params[k])
 
+    def _unbind_input(self, key):
+        """Point an input bound with set_input_zero_copy back to its own buffer"""
+        if key in self._input_refs:
+            self._set_input_zero_copy(key, self._get_input(key))
+            del self._input_refs[key]
+
+    def set_input_zero_copy(self, key=None, value=None, **params):
+        """Bind externally owned buffers as inputs without copying them.
+
+        The buffers must stay unchanged while the graph runs. A buffer whose shape,
+        dtype, context or alignment (see :any:`empty_aligned`) does not match the
+        input is copied instead, as in set_input.
+
+        Parameters
+        ----------
+        key : int or str
+           The input key
+
+        value : NDArray, numpy.ndarray or DLPack capsule
+           The input buffer
+
+        params : dict of str to NDArray, numpy.ndarray or DLPack capsule
+           Additional arguments
+        """
+        if key is not None:
+            params[key] = value
+        for k, val in params.items():
+            expected = self._get_input(k)
+            if not expected:
+                continue
+            view = _zero_copy_view(val, expected)
+            if view is None:
+                logger.debug("Cannot bind input %s without copying", k)
+                self.set_input(k, val)
+                continue
+            self._set_input_zero_copy(k, view[0])
+            self._input_refs[k] = view
+
+    def set_output_zero_copy(self, index, value):
+        """Bind an externally owned buffer as the index-th output, the graph
+        writes the output to it directly.
+
+        An output that aliases an input, or a buffer whose shape, dtype, context
+        or alignment (see :any:`empty_aligned`) does not match the output, is
+        copied to the buffer after every run instead.
+
+        Parameters
+        ----------
+        index : int
+           The output index
+
+        value : NDArray, numpy.ndarray or DLPack capsule
+           The output buffer
+        """
+        if type(value).__name__ == "PyCapsule":
+            value = _nd.from_dlpack(value)
+        if index in self._output_refs:
+            # point the output back to the runtime buffer first
+            self._set_output_zero_copy(index, self._get_output(index))
+            del self._output_refs[index]
+        self._output_copies.pop(index, None)
+        view = _zero_copy_view(value, self._get_output(index), writable=True)
+        if view is not None:
+            try:
+                if self._set_output_zero_copy is None:
+                    self._set_output_zero_copy = self.module["set_output_zero_copy"]
+                self._set_output_zero_copy(index, view[0])
+                self._output_refs[index] = view
+                return
+            except (AttributeError, tvm.TVMError):
+                pass
+        logger.debug("Cannot bind output %d without copying", index)
+        self._output_copies[index] = value
+
+    def get_output_view(self, index):
+        """Get the index-th output as a numpy array that shares the memory of the
+        runtime. The view is overwritten by the next run. Outputs on devices
+        other than cpu are copied.
+
+        Parameters
+        ----------
+        index : int
+            The output index
+
+        Returns
+        -------
+        out : numpy.ndarray
+            The output
+        """
+        if index in self._output_refs:
+            value = self._output_refs[index][1]
+            return value[0] if isinstance(value, tuple) else value.asnumpy()
+        out = self._get_output(index)
+        if out.ctx.device_type != TVMContext.STR2MASK["cpu"]:
+            return out.asnumpy()
+        handle = out.handle.contents
+        nbytes = int(np.prod(out.shape)) * np.dtype(out.dtype).itemsize
+        buf = (ctypes.c_byte * nbytes).from_address(handle.data + handle.byte_offset)
+        view = np.frombuffer(buf, dtype=out.dtype).reshape(out.shape)
+        # keep the runtime array alive as long as the view
+        view = view.view(_OutputView)
+        view.owner = out
+        return view
+
     def run(self, **input_dict):
         """Run forward execution of the graph
 
@@ -180,6 +362,11 @@ class GraphModule(object):
         if input_dict:
             self.set_input(**input_dict)
         self._run()
+        for index, value in self._output_copies.items():
+            if isinstance(value, np.ndarray):
+                np.copyto(value, self._get_output(index).asnumpy())
+            else:
+                self._get_output(index, value)
 
     def get_num_outputs(self):
         """Get the number of outputs from the graph
@@ -219,6 +406,14 @@ class GraphModule(object):
         out : NDArray
             The output array container
         """
+        if index in self._output_refs:
+            # the output is written to the bound buffer
+            bound = self._output_refs[index][0]
+            if out:
+                bound.copyto(out)
+                return out
+            return bound
+
         if out:
             self._get_output(index, out)
             return out
@@ -249,6 +444,23 @@ class GraphModule(object):
         """
         self._load_params(bytearray(params_bytes))
 
+    def load_params_mmap(self, path):
+        """Load parameters from a file saved by :any:`tvm.relay.save_param_mmap`.
+
+        The file is memory-mapped. On cpu the mapped arrays are bound without
+        copying (see set_input_zero_copy), so the weights are only read from disk
+        when used and their pages are shared by all processes loading the file.
+        On other devices they are copied directly from the mapping.
+
+        Parameters
+        ----------
+        path : str
+            The parameter file.
+        """
+        # pylint: disable=import-outside-toplevel
+        from tvm.relay.param_dict import load_param_mmap
+        self.set_input_zero_copy(**load_param_mmap(path))
+
     def share_params(self, other, params_bytes):
         """Share parameters from pre-existing GraphRuntime instance.
 
@@ -0,0 +1,376 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Multi-instance inference server on top of graph runtime.
+
+The server runs several GraphModule instances sharing one set of parameters,
+each in its own thread pinned to a group of cores. Concurrent requests are
+batched together up to the batch size of the graph, waiting at most a given
+latency for a batch to fill.
+"""
+import collections
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import tvm._ffi
+from tvm._ffi.runtime_ctypes import TVMContext
+
+from . import graph_runtime
+
+logger = logging.getLogger("inference_server")
+
+
+def split_cores(num_groups, cores=None):
+    """Split cores into disjoint groups of (almost) equal size.
+
+    Parameters
+    ----------
+    num_groups : int
+        The number of groups
+
+    cores : list of int, optional
+        The cores to split, the cores the process can run on by default
+
+    Returns
+    -------
+    groups : list of list of int or None
+        The groups, None if there are fewer cores than groups
+    """
+    if cores is None:
+        if hasattr(os, "sched_getaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(os.cpu_count() or 1))
+    if len(cores) < num_groups:
+        return None
+    return [cores[i * len(cores) // num_groups:(i + 1) * len(cores) // num_groups]
+            for i in range(num_groups)]
+
+
+class _Request(object):
+    """A request and the future of its outputs"""
+    def __init__(self, inputs, batch):
+        self.inputs = inputs
+        self.batch = batch
+        self.future = Future()
+        self.arrival = time.perf_counter()
+
+
+class InferenceServer(object):
+    """Serve a graph with a pool of graph runtime instances and dynamic batching.
+
+    Requests are queued and every idle instance takes a batch of them: the oldest
+    request and the following ones as long as they fit into the batch size of the
+    graph, waiting up to max_latency_ms after the arrival of the oldest one for
+    the batch to fill. The inputs of a batch are concatenated along batch_axis and
+    padded to the batch size, the outputs are split back into the requests.
+
+    Parameters
+    ----------
+    graph_json_str : str
+        The graph to be deployed in json format output by json graph.
+
+    libmod : tvm.runtime.Module
+        The module of the corresponding function
+
+    ctx : TVMContext
+        The context to deploy the module, only one context is supported.
+
+    params : dict of str to NDArray, bytearray or str, optional
+        The parameters, shared by all instances. Either a parameter dictionary,
+        its serialization by save_param_dict, or the path to a file saved by
+        save_param_mmap, which is mapped by all instances.
+
+    num_instances : int, optional
+        The number of graph runtime instances, each run by its own thread
+
+    max_latency_ms : float, optional
+        The maximum time to wait for a batch to fill
+
+    batch_axis : int, optional
+        The batch axis of the inputs and outputs. Its size in the graph inputs
+        is the maximum batch size.
+
+    core_groups : list of list of int, optional
+        The cores to bind the threads of each instance to. By default the cores
+        of the process are split evenly among the instances if ctx is cpu.
+        Binding can be disabled with the environment variable TVM_BIND_THREADS=0.
+
+    max_history : int, optional
+        The number of latest requests the latency statistics are computed on
+    """
+    def __init__(self, graph_json_str, libmod, ctx, params=None, num_instances=1,
+                 max_latency_ms=5.0, batch_axis=0, core_groups=None, max_history=10000):
+        self.max_latency = max_latency_ms / 1000.0
+        self.batch_axis = batch_axis
+        self.instances = self._create_instances(
+            graph_json_str, libmod, ctx, params, num_instances)
+
+        if core_groups is None and ctx.device_type == TVMContext.STR2MASK["cpu"]:
+            core_groups = split_cores(num_instances)
+        if core_groups is not None and len(core_groups) != num_instances:
+            raise ValueError("Got %d core groups for %d instances"
+                             % (len(core_groups), num_instances))
+        self.core_groups = core_groups
+
+        # shapes of the data inputs, looked up on first use
+        self._param_names = set(params.keys()) if isinstance(params, dict) else set()
+        self._input_shapes = {}
+        self._shape_lock = threading.Lock()
+        self.batch_size = None
+        self._num_outputs = self.instances[0].get_num_outputs()
+
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        # only one instance collects a batch at a time
+        self._batch_lock = threading.Lock()
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._latency = collections.deque(maxlen=max_history)
+        self._batch_sizes = collections.deque(maxlen=max_history)
+        self._num_requests = 0
+        self._start = time.perf_counter()
+
+        self._threads = []
+        for i in range(num_instances):
+            thread = threading.Thread(target=self._worker, args=(i,),
+                                      name="inference-%d" % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    @staticmethod
+    def _create_instances(graph_json_str, libmod, ctx, params, num_instances):
+        """Create the instances, loading the parameters once and sharing them"""
+        instances = [graph_runtime.create(graph_json_str, libmod, ctx)
+                     for _ in range(num_instances)]
+        if params is None:
+            return instances
+        if isinstance(params, str):
+            # every instance maps the same pages of the file
+            for mod in instances:
+                mod.load_params_mmap(params)
+            return instances
+        if isinstance(params, dict):
+            # pylint: disable=import-outside-toplevel
+            from tvm.relay.param_dict import save_param_dict
+            params = save_param_dict(params)
+        instances[0].load_params(params)
+        for mod in instances[1:]:
+            mod.share_params(instances[0], params)
+        return instances
+
+    def _input_shape(self, name):
+        """Get the shape and dtype of an input of the graph, and set the batch size"""
+        with self._shape_lock:
+            return self._input_shape_locked(name)
+
+    def _input_shape_locked(self, name):
+        if name not in self._input_shapes:
+            if name in self._param_names:
+                raise ValueError("%s is a parameter, not an input" % name)
+            arr = self.instances[0].get_input(name)
+            if arr is None:
+                raise ValueError("The graph has no input %s" % name)
+            shape = tuple(arr.shape)
+            batch_size = shape[self.batch_axis]
+            if self.batch_size is not None and batch_size != self.batch_size:
+                raise ValueError("The inputs of the graph have different batch sizes")
+            self.batch_size = batch_size
+            self._input_shapes[name] = (shape, arr.dtype)
+        return self._input_shapes[name]
+
+    def submit(self, **inputs):
+        """Queue a request.
+
+        Parameters
+        ----------
+        inputs : dict of str to numpy.ndarray
+            The data inputs, all with the same size along batch_axis,
+            at most the batch size of the graph.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            The future of the list of the numpy outputs
+        """
+        if not inputs:
+            raise ValueError("A request needs at least one input")
+        batch = None
+        for name, value in inputs.items():
+            shape, _ = self._input_shape(name)
+            size = np.shape(value)[self.batch_axis]
+            if batch is not None and size != batch:
+                raise ValueError("The inputs of a request have different batch sizes")
+            if size > shape[self.batch_axis]:
+                raise ValueError("Batch of %d is larger than the batch size %d of the graph"
+                                 % (size, shape[self.batch_axis]))
+            batch = size
+
+        req = _Request(inputs, batch)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The server is closed")
+            self._queue.append(req)
+            self._cond.notify_all()
+        return req.future
+
+    def run(self, **inputs):
+        """Run a request and wait for its outputs.
+
+        Parameters
+        ----------
+        inputs : dict of str to numpy.ndarray
+            The data inputs, see submit
+
+        Returns
+        -------
+        outputs : list of numpy.ndarray
+            The outputs
+        """
+        return self.submit(**inputs).result()
+
+    def _next_batch(self):
+        """Wait for the next batch of requests, None when the server is closed"""
+        with self._batch_lock, self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            batch = [self._queue.popleft()]
+            size = batch[0].batch
+            deadline = batch[0].arrival + self.max_latency
+            while size < self.batch_size:
+                if self._queue:
+                    if size + self._queue[0].batch > self.batch_size:
+                        break
+                    req = self._queue.popleft()
+                    batch.append(req)
+                    size += req.batch
+                    continue
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0 or self._closed:
+                    break
+                self._cond.wait(timeout)
+            return batch
+
+    def _run_batch(self, mod, batch):
+        """Run a batch of requests on an instance and split the outputs"""
+        axis = self.batch_axis
+        for name in batch[0].inputs:
+            shape, dtype = self._input_shapes[name]
+            if len(batch) == 1 and batch[0].batch == self.batch_size:
+                data = batch[0].inputs[name]
+            else:
+                data = np.zeros(shape, dtype=dtype)
+                begin = 0
+                for req in batch:
+                    index = [slice(None)] * len(shape)
+                    index[axis] = slice(begin, begin + req.batch)
+                    data[tuple(index)] = req.inputs[name]
+                    begin += req.batch
+            mod.set_input(name, data)
+        mod.run()
+
+        results = [[] for _ in batch]
+        for i in range(self._num_outputs):
+            out = mod.get_output(i).asnumpy()
+            begin = 0
+            for req, res in zip(batch, results):
+                if out.ndim > axis and out.shape[axis] == self.batch_size:
+                    index = [slice(None)] * out.ndim
+                    index[axis] = slice(begin, begin + req.batch)
+                    res.append(out[tuple(index)])
+                else:
+                    # an output without the batch axis is shared by all requests
+                    res.append(out)
+                begin += req.batch
+        return results
+
+    def _worker(self, idx):
+        if self.core_groups is not None:
+            cores = self.core_groups[idx]
+            config_threadpool = tvm._ffi.get_global_func("runtime.config_threadpool")
+            # bind the thread pool of this thread to its cores
+            config_threadpool(1, len(cores), *cores)
+        mod = self.instances[idx]
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                results = self._run_batch(mod, batch)
+            except Exception as err:  # pylint: disable=broad-except
+                logger.warning("Batch failed: %s", err)
+                for req in batch:
+                    req.future.set_exception(err)
+                continue
+            end = time.perf_counter()
+            for req, res in zip(batch, results):
+                req.future.set_result(res)
+            with self._stats_lock:
+                self._num_requests += len(batch)
+                self._batch_sizes.append(sum(req.batch for req in batch))
+                self._latency.extend(end - req.arrival for req in batch)
+
+    def stats(self):
+        """Get the statistics of the requests since the start or the last reset.
+
+        Returns
+        -------
+        stats : dict
+            The number of requests, the throughput in requests per second,
+            the mean batch size, and the 50th and 99th percentile latencies in ms
+            of the latest requests.
+        """
+        with self._stats_lock:
+            latency = np.array(self._latency) * 1000
+            elapsed = time.perf_counter() - self._start
+            return {
+                "requests": self._num_requests,
+                "throughput": self._num_requests / elapsed if elapsed > 0 else 0.0,
+                "mean_batch_size": float(np.mean(self._batch_sizes))
+                                   if self._batch_sizes else 0.0,
+                "p50_ms": float(np.percentile(latency, 50)) if latency.size else 0.0,
+                "p99_ms": float(np.percentile(latency, 99)) if latency.size else 0.0,
+            }
+
+    def reset_stats(self):
+        """Reset the statistics"""
+        with self._stats_lock:
+            self._latency.clear()
+            self._batch_sizes.clear()
+            self._num_requests = 0
+            self._start = time.perf_counter()
+
+    def close(self):
+        """Serve the queued requests and stop the instances"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -25,6 +25,7 @@ import warnings
 import tvm._ffi
 from tvm.runtime import ndarray as nd
 
+from . import compile_cache
 from . import util
 from .._ffi.base import py_str
 
@@ -89,19 +90,29 @@ def compile_cuda(code,
         else:
             raise ValueError("options must be str or list of str")
 
+    flags = list(cmd)
     cmd += ["-o", file_target]
     cmd += [temp_code]
 
-    proc = subprocess.Popen(
-        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    def _compile():
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
 
-    (out, _) = proc.communicate()
+        (out, _) = proc.communicate()
 
-    if proc.returncode != 0:
-        msg = code
-        msg += "\nCompilation error:\n"
-        msg += py_str(out)
-        raise RuntimeError(msg)
+        if proc.returncode != 0:
+            msg = code
+            msg += "\nCompilation error:\n"
+            msg += py_str(out)
+            raise RuntimeError(msg)
+
+    cache = compile_cache.current()
+    if cache is None:
+        _compile()
+    else:
+        key = compile_cache.CompileCache.key(
+            compile_cache.compiler_version("nvcc"), flags, code)
+        cache.build(key, "." + target, file_target, _compile)
 
     data = bytearray(open(file_target, "rb").read())
     if not data:
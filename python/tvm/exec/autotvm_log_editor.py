@@ -15,46 +15,65 @@
 # specific language governing permissions and limitations
 # under the License.
 # pylint: disable=invalid-name
-"""Pick best log entries from a large file and store them to a small file"""
+"""Pick the best log entries from large files and store them to a small file
+
+The best records are picked for every workload and target key, e.g. cpu or cuda,
+and for every workload and device model, as ApplyHistoryBest looks them up.
+
+e.g. keep the 3 best records of every workload of all the logs of a directory
+python -m tvm.exec.autotvm_log_editor --act pick-best --i logs/ --o best.log --top-k 3
+"""
 
 import argparse
+import json
 import os
 import logging
-import warnings
 
-from .. import autotvm
+from ..autotvm.record_merge import merge_records, format_stats
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument("--act", type=str, choices=['pick-best'], required=True,
                         help="The action")
-    parser.add_argument("--i", type=str, help="The input file or directory", required=True)
+    parser.add_argument("--i", type=str, nargs="+", required=True,
+                        help="The input files or directory")
     parser.add_argument("--o", type=str, help="The output file")
+    parser.add_argument("--top-k", type=int, default=1,
+                        help="The number of records kept for every workload and "
+                        "target key or device model")
+    parser.add_argument("--j", type=int, default=None,
+                        help="The number of worker processes, the number of cpus by default")
+    parser.add_argument("--tmp-dir", type=str, default=None,
+                        help="The directory of temporary files, next to the output by default")
+    parser.add_argument("--max-records", type=int, default=None,
+                        help="The number of records a worker holds in memory, "
+                        "about 1GB of records in total by default")
+    parser.add_argument("--stats", type=str, default=None,
+                        help="Write the statistics of every task to this json file")
 
     args = parser.parse_args()
     logging.basicConfig(level=logging.INFO)
 
     if args.act == 'pick-best':
-        if os.path.isfile(args.i):
-            args.o = args.o or args.i + ".best.log"
-            autotvm.record.pick_best(args.i, args.o)
-        elif os.path.isdir(args.i):
+        for path in args.i:
+            if not os.path.exists(path):
+                raise ValueError("Invalid input file: " + path)
+        if len(args.i) == 1 and os.path.isdir(args.i[0]):
+            inputs = args.i[0]
             args.o = args.o or "best.log"
-            tmp_filename = args.o + ".tmp"
-
-            with open(tmp_filename, 'w') as tmp_fout:
-                for filename in os.listdir(args.i):
-                    if filename.endswith(".log"):
-                        try:
-                            autotvm.record.pick_best(filename, tmp_fout)
-                        except Exception:  # pylint: disable=broad-except
-                            warnings.warn("Ignore invalid file %s" % filename)
-
-            logging.info("Run final filter...")
-            autotvm.record.pick_best(tmp_filename, args.o)
-            os.remove(tmp_filename)
-            logging.info("Output to %s ...", args.o)
         else:
-            raise ValueError("Invalid input file: " + args.i)
+            inputs = list(args.i)
+            args.o = args.o or args.i[0] + ".best.log"
+            # the best entries of the existing output are kept
+            if os.path.isfile(args.o) and args.o not in inputs:
+                inputs.append(args.o)
+
+        stats = merge_records(inputs, args.o, top_k=args.top_k, num_workers=args.j,
+                              tmp_dir=args.tmp_dir, max_records=args.max_records)
+        logging.info("Per task summary:\n%s", format_stats(stats))
+        if args.stats:
+            with open(args.stats, "w") as f:
+                json.dump(stats, f, indent=2)
+        logging.info("Output to %s ...", args.o)
     else:
         raise ValueError("Invalid action " + args.act)
@@ -20,14 +20,20 @@ from __future__ import absolute_import
 
 import logging
 import argparse
+import json
 import multiprocessing
 import sys
 from ..rpc.tracker import Tracker
 
 def main(args):
     """Main funciton"""
+    scheduler_options = {}
+    if args.scheduler == "fair":
+        scheduler_options["shares"] = json.loads(args.shares) if args.shares else {}
+        scheduler_options["lease_timeout"] = args.lease_timeout
     tracker = Tracker(args.host, port=args.port, port_end=args.port_end,
-                      silent=args.silent)
+                      silent=args.silent, scheduler=args.scheduler,
+                      scheduler_options=scheduler_options)
     tracker.proc.join()
 
 
@@ -45,6 +51,15 @@ if __name__ == "__main__":
                          and ROCM compilers.")
     parser.add_argument('--silent', action='store_true',
                         help="Whether run in silent mode.")
+    parser.add_argument('--scheduler', type=str, default="priority",
+                        choices=["priority", "fair"],
+                        help="The scheduler of the device queues.")
+    parser.add_argument('--shares', type=str, default=None,
+                        help="The shares of users in the fair scheduler as a json dict, \
+                        e.g. '{\"team-a\": 2, \"team-b\": 1}'.")
+    parser.add_argument('--lease-timeout', type=float, default=0,
+                        help="The seconds after which a lease no longer counts against \
+                        the share of its user in the fair scheduler.")
 
     parser.set_defaults(fork=True)
     args = parser.parse_args()
@@ -34,6 +34,7 @@ from . import parser
 from . import transform
 from . import analysis
 from .build_module import build, create_executor, optimize
+from .build_cache import BuildCache
 from .transform import build_config
 from . import debug
 from . import param_dict
@@ -140,3 +141,6 @@ fromtext = parser.fromtext
 # Param Serialization
 save_param_dict = param_dict.save_param_dict
 load_param_dict = param_dict.load_param_dict
+save_param_mmap = param_dict.save_param_mmap
+load_param_mmap = param_dict.load_param_mmap
+convert_param_dict = param_dict.convert_param_dict
@@ -19,6 +19,7 @@
 from __future__ import absolute_import
 
 import logging
+import weakref
 import numpy as np
 import tvm
 from tvm import te
@@ -142,6 +143,59 @@ def get_valid_implementations(op, attrs, inputs, out_type, target):
     return ret
 
 
+# the implementations chosen by AutoTVM in select_implementation,
+# keyed by the dispatch context
+_SELECT_CACHE = weakref.WeakKeyDictionary()
+_SELECT_STATS = {"hit": 0, "miss": 0}
+
+
+def select_implementation_stats():
+    """Get the hit and miss counts of the implementation selection cache.
+
+    Returns
+    -------
+    stats : dict of str to int
+        The numbers of hits and misses
+    """
+    return dict(_SELECT_STATS)
+
+
+def clear_select_implementation_cache():
+    """Clear the implementation selection cache and its counters."""
+    _SELECT_CACHE.clear()
+    _SELECT_STATS["hit"] = _SELECT_STATS["miss"] = 0
+
+
+def _get_select_cache(dispatch_ctx):
+    """Get the selection cache of a dispatch context, None if its queries
+    cannot be cached."""
+    # every context in the chain is queried by select_implementation
+    chain = []
+    ctx = dispatch_ctx
+    while ctx is not None:
+        if not isinstance(ctx, (autotvm.task.ApplyHistoryBest, autotvm.task.FallbackContext)):
+            return None
+        chain.append((id(ctx), ctx.version))
+        ctx = ctx._old_ctx  # pylint: disable=protected-access
+    entry = _SELECT_CACHE.get(dispatch_ctx)
+    if entry is None or entry[0] != chain:
+        entry = (chain, {})
+        _SELECT_CACHE[dispatch_ctx] = entry
+    return entry[1]
+
+
+def _select_key(op, attrs, inputs, out_type, target, all_impls):
+    try:
+        shapes = tuple((tuple(int(x) for x in t.shape), t.dtype) for t in inputs)
+    except (TypeError, ValueError):
+        # symbolic shapes
+        return None
+    attrs_hash = tvm.ir.structural_hash(attrs) if attrs is not None else None
+    # the names of the valid implementations identify the strategy
+    return (op.name, attrs_hash, shapes, str(out_type), str(target),
+            tuple(impl.name for impl in all_impls))
+
+
 def select_implementation(op, attrs, inputs, out_type, target, use_autotvm=True):
     """Select the best implementation from the op strategy.
 
@@ -189,11 +243,37 @@ def select_implementation(op, attrs, inputs, out_type, target, use_autotvm=True)
         outs = best_plevel_impl.compute(attrs, inputs, out_type)
         return best_plevel_impl, outs
 
+    dispatch_ctx = autotvm.task.DispatchContext.current
+    # computing an implementation has side effects when tracing tasks
+    env = autotvm.task.TaskExtractEnv.current
+    cache = key = None
+    if env is None or not env.tracing:
+        cache = _get_select_cache(dispatch_ctx)
+        if cache is not None:
+            key = _select_key(op, attrs, inputs, out_type, target, all_impls)
+    if key is not None and key in cache:
+        cached_attrs, impl_name = cache[key]
+        if cached_attrs is attrs or tvm.ir.structural_equal(cached_attrs, attrs):
+            for impl in all_impls:
+                if impl.name == impl_name:
+                    _SELECT_STATS["hit"] += 1
+                    return impl, impl.compute(attrs, inputs, out_type)
+
+    best_impl, outs = _select_autotvm_implementation(
+        attrs, inputs, out_type, target, all_impls, best_plevel_impl, dispatch_ctx)
+    if key is not None:
+        _SELECT_STATS["miss"] += 1
+        cache[key] = (attrs, best_impl.name)
+    return best_impl, outs
+
+
+def _select_autotvm_implementation(attrs, inputs, out_type, target,
+                                   all_impls, best_plevel_impl, dispatch_ctx):
+    """Compute all implementations and pick the best one by AutoTVM configs"""
     outputs = {}
     workloads = {}
     best_autotvm_impl = None
     best_cfg = None
-    dispatch_ctx = autotvm.task.DispatchContext.current
     autotvm.GLOBAL_SCOPE.silent = True
     for impl in all_impls:
         outs = impl.compute(attrs, inputs, out_type)
@@ -0,0 +1,224 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+On-disk cache of the artifacts of relay.build.
+
+Each entry is a directory named by the key of the build, holding the graph json,
+the exported library and the parameters. The key is a digest of the serialized
+module, the parameters, the targets, the current PassContext and the
+fingerprint of the current autotvm dispatch context.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import tvm
+from tvm import autotvm
+from tvm.contrib import util as _util
+from tvm.runtime import load_module as _load_module
+from .param_dict import save_param_dict, load_param_dict
+
+logger = logging.getLogger("relay")
+
+
+class BuildCache(object):
+    """Content-addressed cache of built models.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of the cache. It can be shared by concurrent processes.
+
+    max_size : int, optional
+        The maximum total size of the entries in bytes.
+        The least recently used entries are evicted when it is exceeded.
+    """
+    GRAPH_FILE = "graph.json"
+    LIB_FILE = "lib.so"
+    PARAMS_FILE = "params.bin"
+
+    def __init__(self, cache_dir, max_size=4 << 30):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _lock(self):
+        return _util.filelock(os.path.join(self.cache_dir, ".lock"))
+
+    def key(self, mod, target, target_host=None, params=None):
+        """Get the key of a build.
+
+        Parameters
+        ----------
+        mod : :py:class:`~tvm.IRModule`
+            The module to build
+
+        target : dict of IntImm to Target
+            The targets of the build
+
+        target_host : Target, optional
+            The host target
+
+        params : dict of str to NDArray, optional
+            The parameters bound to the module
+
+        Returns
+        -------
+        key : str or None
+            The key, None if the build cannot be cached because the
+            current dispatch context has no fingerprint.
+        """
+        fingerprint = autotvm.DispatchContext.current.fingerprint()
+        if fingerprint is None:
+            logger.debug("Dispatch context %s has no fingerprint, skip build cache",
+                         type(autotvm.DispatchContext.current).__name__)
+            return None
+
+        hasher = hashlib.sha256()
+        def _update(x):
+            hasher.update(str(x).encode("utf-8"))
+            hasher.update(b"\0")
+
+        _update(tvm.__version__)
+        # the serialized module, a 64-bit structural hash alone may collide
+        _update(tvm.ir.save_json(mod))
+        for name in sorted(params or {}):
+            value = params[name]
+            value = value.asnumpy() if isinstance(value, tvm.nd.NDArray) else np.asarray(value)
+            _update(name)
+            _update((value.shape, value.dtype))
+            hasher.update(np.ascontiguousarray(value).tobytes())
+        for dev_type, tgt in sorted((int(k), str(v)) for k, v in target.items()):
+            _update((dev_type, tgt))
+        _update(target_host)
+
+        pass_ctx = tvm.transform.PassContext.current()
+        _update(pass_ctx.opt_level)
+        _update(sorted(str(x) for x in pass_ctx.required_pass))
+        _update(sorted(str(x) for x in pass_ctx.disabled_pass))
+        _update(sorted((str(k), str(v)) for k, v in pass_ctx.config.items()))
+        _update(fingerprint)
+        return hasher.hexdigest()
+
+    def load(self, key):
+        """Load the artifacts of a build.
+
+        Parameters
+        ----------
+        key : str
+            The key of the build
+
+        Returns
+        -------
+        artifacts : tuple of (str, Module, dict) or None
+            The graph json, library and parameters, None on a cache miss
+        """
+        path = os.path.join(self.cache_dir, key)
+        lock = self._lock()
+        try:
+            if not os.path.isdir(path):
+                return None
+            with open(os.path.join(path, self.GRAPH_FILE)) as f:
+                graph_json = f.read()
+            lib = _load_module(os.path.join(path, self.LIB_FILE))
+            with open(os.path.join(path, self.PARAMS_FILE), "rb") as f:
+                params = load_param_dict(bytearray(f.read()))
+            # mark the entry as recently used
+            os.utime(path)
+        except (IOError, OSError, tvm.TVMError) as err:
+            logger.warning("Broken build cache entry %s: %s", path, err)
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        finally:
+            lock.release()
+        logger.debug("Load build %s from cache", key)
+        return graph_json, lib, params
+
+    def save(self, key, graph_json, lib, params):
+        """Save the artifacts of a build.
+
+        Parameters
+        ----------
+        key : str
+            The key of the build
+
+        graph_json : str
+            The graph json
+
+        lib : Module
+            The built library
+
+        params : dict of str to NDArray
+            The parameters
+
+        Returns
+        -------
+        saved : bool
+            Whether the build was saved. A build whose library cannot be
+            exported by the host compiler, e.g. cross-compiled, is not cached.
+        """
+        # write the entry outside of the lock, then move it into place atomically
+        tmp_path = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            try:
+                with open(os.path.join(tmp_path, self.GRAPH_FILE), "w") as f:
+                    f.write(graph_json)
+                lib.export_library(os.path.join(tmp_path, self.LIB_FILE))
+                with open(os.path.join(tmp_path, self.PARAMS_FILE), "wb") as f:
+                    f.write(save_param_dict(params))
+            except (IOError, OSError, ValueError, RuntimeError) as err:
+                logger.warning("Cannot save build %s to cache: %s", key, err)
+                return False
+
+            lock = self._lock()
+            try:
+                path = os.path.join(self.cache_dir, key)
+                if not os.path.isdir(path):
+                    os.rename(tmp_path, path)
+                self._evict(keep=key)
+            finally:
+                lock.release()
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return True
+
+    def _evict(self, keep=None):
+        """Remove the least recently used entries until the cache fits max_size.
+        Must be called with the lock held."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, x)) for x in os.listdir(path))
+            entries.append((os.path.getmtime(path), name, size))
+            total += size
+
+        for _, name, size in sorted(entries):
+            if total <= self.max_size:
+                break
+            if name == keep:
+                continue
+            logger.debug("Evict build %s from cache", name)
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            total -= size
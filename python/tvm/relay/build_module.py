@@ -30,6 +30,7 @@ from . import _build_module
 from . import ty as _ty
 from . import expr as _expr
 from . import function as _function
+from .build_cache import BuildCache
 from .backend import interpreter as _interpreter
 from .backend.vm import VMExecutor
 
@@ -181,7 +182,7 @@ class BuildModule(object):
         return ret
 
 
-def build(mod, target=None, target_host=None, params=None):
+def build(mod, target=None, target_host=None, params=None, cache=None):
     """Helper function that builds a Relay function to run on TVM graph
     runtime.
 
@@ -208,6 +209,11 @@ def build(mod, target=None, target_host=None, params=None):
         Input parameters to the graph that do not change
         during inference time. Used for constant folding.
 
+    cache : str or :any:`tvm.relay.BuildCache`, optional
+        The build cache, or the directory of the build cache. When the module,
+        parameters, targets, PassContext and autotvm dispatch context match a
+        previous build, its artifacts are loaded from the cache instead of compiling.
+
     Returns
     -------
     graph_json : str
@@ -247,8 +253,21 @@ def build(mod, target=None, target_host=None, params=None):
         tophub_context = autotvm.util.EmptyContext()
 
     with tophub_context:
+        cache_key = None
+        if cache is not None:
+            if not isinstance(cache, BuildCache):
+                cache = BuildCache(cache)
+            cache_key = cache.key(mod, target, target_host, params)
+            if cache_key is not None:
+                cached = cache.load(cache_key)
+                if cached is not None:
+                    return cached
+
         bld_mod = BuildModule()
         graph_json, mod, params = bld_mod.build(mod, target, target_host, params)
+
+        if cache_key is not None:
+            cache.save(cache_key, graph_json, mod, params)
     return graph_json, mod, params
 
 
@@ -17,7 +17,9 @@
 # pylint: disable=broad-except
 """Common utilities"""
 from __future__ import absolute_import as _abs
+import hashlib
 import logging
+from collections import OrderedDict
 import numpy as np
 
 import tvm
@@ -492,14 +494,90 @@ def infer_shape(inputs, mod=None):
     return checked_type
 
 
+# results of infer_value, keyed by a digest of the evaluated function and the
+# values of its bound params, so the entries do not keep the params alive
+_INFER_VALUE_CACHE = OrderedDict()
+_INFER_VALUE_CACHE_SIZE = 1024
+# params larger than this number of bytes are not hashed, their results are not cached
+_INFER_VALUE_MAX_PARAM_BYTES = 1 << 16
+
+
+def clear_infer_value_cache():
+    """Clear the cached results of infer_value."""
+    _INFER_VALUE_CACHE.clear()
+
+
+def _infer_value_key(func, bound):
+    """Get the digest of a function and the values bound to its params,
+    None if a param is too large to be hashed on every call"""
+    bound = [x if isinstance(x, tvm.nd.NDArray) else np.asarray(x) for x in bound]
+    for value in bound:
+        nbytes = np.dtype(value.dtype).itemsize * int(np.prod(value.shape))
+        if nbytes > _INFER_VALUE_MAX_PARAM_BYTES:
+            return None
+    hasher = hashlib.sha256()
+    hasher.update(tvm.ir.save_json(func).encode("utf-8"))
+    for value in bound:
+        value = value.asnumpy() if isinstance(value, tvm.nd.NDArray) else value
+        hasher.update(str((value.shape, value.dtype)).encode("utf-8"))
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    return hasher.hexdigest()
+
+
+def _fold_to_constant(input_val, params):
+    """Try to evaluate an expression by binding the available params and
+    constant folding it. This avoids compiling a program for shape arithmetic,
+    e.g. shape_of on tensors with static shapes.
+    Return None if the expression does not fold to a constant."""
+    binds = {var: _expr.const(params[var.name_hint])
+             for var in analysis.free_vars(input_val) if var.name_hint in params}
+    try:
+        mod = IRModule.from_expr(_expr.bind(input_val, binds) if binds else input_val)
+        mod = _transform.InferType()(mod)
+        mod = _transform.FoldConstant()(mod)
+    except Exception:
+        return None
+    body = mod["main"].body
+    if isinstance(body, _expr.Constant):
+        return body.data
+    return None
+
+
 def infer_value(input_val, params, mod=None):
     """A hack for getting the value of an expression by evaluating a
     portion of the relay graph. This is often needed for functions that
     whose output shape depends on the value of a tensor.
+
+    Results are cached unless mod is given, whose globals may be called,
+    or a bound param is large. Expressions that fold to constants are
+    evaluated without compiling a program.
     """
+    free_vars = analysis.free_vars(input_val)
     # Check that all free variables have associated parameters.
-    assert all(var.name_hint in params.keys() for var in analysis.free_vars(
-        input_val)), "All inputs to infer must be available in params."
+    assert all(var.name_hint in params.keys() for var in free_vars), \
+        "All inputs to infer must be available in params."
+
+    key = None
+    if mod is None:
+        func = _function.Function(free_vars, input_val)
+        key = _infer_value_key(func, [params[var.name_hint] for var in free_vars])
+    result = _INFER_VALUE_CACHE.get(key) if key is not None else None
+    if result is not None:
+        _INFER_VALUE_CACHE.move_to_end(key)
+        return result
+
+    result = _fold_to_constant(input_val, params)
+    if result is None:
+        result = _infer_value_by_build(input_val, params, mod)
+    if key is not None:
+        _INFER_VALUE_CACHE[key] = result
+        if len(_INFER_VALUE_CACHE) > _INFER_VALUE_CACHE_SIZE:
+            _INFER_VALUE_CACHE.popitem(last=False)
+    return result
+
+
+def _infer_value_by_build(input_val, params, mod=None):
+    """Evaluate an expression by building and running it"""
     try:
         # TODO(kevinthesun): Use VM for all cases.
         # pylint: disable=import-outside-toplevel
@@ -532,6 +610,11 @@ def infer_value_simulated(input_val, params):
     implementing certain onnx operators where we need to evaluate the graph
     to determine a static shape.
     """
+    # the value may only depend on the shapes of the missing inputs
+    output_value = _fold_to_constant(input_val, params)
+    if output_value is not None:
+        return output_value
+
     fake_params = []
     # Add a fake copy of all missing params.
     for free_param in analysis.free_vars(input_val):
@@ -16,6 +16,13 @@
 # under the License.
 # pylint: disable=invalid-name
 """Helper utility to save parameter dicts."""
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
 import tvm
 import tvm._ffi
 
@@ -76,3 +83,206 @@ def load_param_dict(param_bytes):
         param_bytes = bytearray(param_bytes)
     load_arr = _load_param_dict(param_bytes)
     return {v.name : v.array for v in load_arr}
+
+
+# The memory-mappable parameter format:
+#   magic (8 bytes), version (uint64), index size (uint64), json index,
+#   then the data of every array, each aligned to MMAP_ALIGNMENT bytes.
+# The index is a list of {"name", "dtype", "shape", "offset"} with offsets
+# relative to the start of the file. All numbers are little endian.
+MMAP_MAGIC = b"TVMPMAP\0"
+MMAP_VERSION = 1
+MMAP_ALIGNMENT = 128
+
+# The format of save_param_dict
+_PARAM_LIST_MAGIC = 0xF7E58D4F05049CB7
+_NDARRAY_MAGIC = 0xDD5E40F096B4A13F
+_DTYPE_CODES = {0: "int", 1: "uint", 2: "float"}
+_COPY_CHUNK = 1 << 24
+
+
+def _align(offset):
+    return (offset + MMAP_ALIGNMENT - 1) // MMAP_ALIGNMENT * MMAP_ALIGNMENT
+
+
+def _write_param_mmap(path, entries, write_data):
+    """Write a parameter file from a list of (name, dtype, shape, nbytes),
+    write_data(i, file) writes the data of the i-th entry."""
+    header_size = len(MMAP_MAGIC) + 16
+    # the data offsets depend on the index size and vice versa,
+    # so grow the reserved index size until it fits
+    reserved = 0
+    while True:
+        offset = _align(header_size + reserved)
+        index = []
+        for name, dtype, shape, nbytes in entries:
+            index.append({"name": name, "dtype": dtype,
+                          "shape": [int(x) for x in shape], "offset": offset})
+            offset = _align(offset + nbytes)
+        index_bytes = json.dumps(index).encode("utf-8")
+        if len(index_bytes) <= reserved:
+            break
+        reserved = len(index_bytes) + 64
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MMAP_MAGIC)
+        f.write(struct.pack("<QQ", MMAP_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for i, item in enumerate(index):
+            f.seek(item["offset"])
+            write_data(i, f)
+        # pad the file to the end of the last array
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+
+
+def save_param_mmap(params, path):
+    """Save parameter dictionary to a file that can be memory-mapped.
+
+    Unlike save_param_dict, the arrays are aligned in the file, so that
+    load_param_mmap can use them without reading or copying them.
+
+    Parameters
+    ----------
+    params : dict of str to NDArray or numpy.ndarray
+        The parameter dictionary.
+
+    path : str
+        The file to write.
+    """
+    arrays = []
+    for name, value in params.items():
+        value = value.asnumpy() if isinstance(value, tvm.nd.NDArray) else np.asarray(value)
+        arrays.append((name, np.ascontiguousarray(value)))
+    entries = [(name, str(value.dtype), value.shape, value.nbytes) for name, value in arrays]
+
+    def _write(i, f):
+        f.write(arrays[i][1].astype(arrays[i][1].dtype.newbyteorder("<"), copy=False).tobytes())
+    _write_param_mmap(path, entries, _write)
+
+
+def load_param_mmap(path):
+    """Map a parameter file saved by save_param_mmap into memory.
+
+    The data is not read until it is used, and the pages are shared by all
+    the processes mapping the same file.
+
+    Parameters
+    ----------
+    path : str
+        The parameter file.
+
+    Returns
+    -------
+    params : dict of str to numpy.ndarray
+        The parameter dictionary. The arrays are read-only views of the
+        file, aligned to MMAP_ALIGNMENT bytes.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MMAP_MAGIC)) != MMAP_MAGIC:
+            raise ValueError("%s is not a memory-mapped parameter file, "
+                             "convert it with convert_param_dict" % path)
+        version, index_size = struct.unpack("<QQ", f.read(16))
+        if version != MMAP_VERSION:
+            raise ValueError("Unsupported parameter file version %d" % version)
+        index = json.loads(f.read(index_size).decode("utf-8"))
+        if not index:
+            return {}
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    params = {}
+    for item in index:
+        dtype = np.dtype(item["dtype"]).newbyteorder("<")
+        count = int(np.prod(item["shape"]))
+        params[item["name"]] = np.frombuffer(
+            buf, dtype=dtype, count=count, offset=item["offset"]).reshape(item["shape"])
+    return params
+
+
+def _read_param_dict_index(f):
+    """Read the names and array headers of a file in the save_param_dict format.
+
+    Returns
+    -------
+    entries : list of (str, str, tuple, int, int)
+        The name, dtype, shape, data size and data offset of every array
+    """
+    def _read(fmt):
+        size = struct.calcsize(fmt)
+        data = f.read(size)
+        if len(data) != size:
+            raise ValueError("Invalid parameters file format")
+        return struct.unpack(fmt, data)
+
+    header, _ = _read("<QQ")
+    if header != _PARAM_LIST_MAGIC:
+        raise ValueError("Invalid parameters file format")
+    names = []
+    for _ in range(_read("<Q")[0]):
+        names.append(f.read(_read("<Q")[0]).decode("utf-8"))
+    if _read("<Q")[0] != len(names):
+        raise ValueError("Invalid parameters file format")
+
+    entries = []
+    for name in names:
+        header, _, _, _, ndim, code, bits, lanes = _read("<QQiiiBBH")
+        if header != _NDARRAY_MAGIC:
+            raise ValueError("Invalid parameters file format")
+        if code not in _DTYPE_CODES or lanes != 1:
+            raise ValueError("Cannot map parameter %s with type code %d and %d lanes"
+                             % (name, code, lanes))
+        shape = _read("<%dq" % ndim)
+        nbytes = _read("<q")[0]
+        entries.append((name, "%s%d" % (_DTYPE_CODES[code], bits), shape, nbytes, f.tell()))
+        f.seek(nbytes, os.SEEK_CUR)
+    return entries
+
+
+def convert_param_dict(src, path):
+    """Convert parameters saved by save_param_dict to the format of
+    save_param_mmap. The data is copied in chunks, so that the parameters
+    never need to fit in memory.
+
+    Parameters
+    ----------
+    src : str or bytearray
+        The file written from the result of save_param_dict, or the result itself.
+
+    path : str
+        The file to write.
+    """
+    if isinstance(src, (bytes, bytearray)):
+        src = memoryview(src)
+        class _Reader(object):
+            """Minimal file interface of a byte buffer"""
+            pos = 0
+            def read(self, size):
+                data = src[self.pos:self.pos + size].tobytes()
+                self.pos += len(data)
+                return data
+            def seek(self, offset, whence=os.SEEK_SET):
+                self.pos = offset + (self.pos if whence == os.SEEK_CUR else 0)
+            def tell(self):
+                return self.pos
+            def close(self):
+                pass
+        fin = _Reader()
+    else:
+        fin = open(src, "rb")
+
+    try:
+        entries = _read_param_dict_index(fin)
+
+        def _write(i, f):
+            remain, offset = entries[i][3], entries[i][4]
+            fin.seek(offset)
+            while remain > 0:
+                chunk = fin.read(min(remain, _COPY_CHUNK))
+                if not chunk:
+                    raise ValueError("Invalid parameters file format")
+                f.write(chunk)
+                remain -= len(chunk)
+        _write_param_mmap(path, [x[:4] for x in entries], _write)
+    finally:
+        fin.close()
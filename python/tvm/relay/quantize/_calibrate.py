@@ -30,7 +30,8 @@ from .. import expr as _expr
 from .. import analysis as _analysis
 from .. import build_module as _build_module
 from ...contrib import graph_runtime
-from .kl_divergence import _find_scale_by_kl
+from .kl_divergence import _find_scale_by_kl, _find_scale_by_kl_histogram_args, \
+    _StreamingHistogram
 
 
 def _get_profile_runtime(mod):
@@ -109,6 +110,55 @@ def _kl_scale(mod, dataset):
     return func
 
 
+def collect_histograms(mod, dataset, num_bins=8001):
+    """Given an annotated graph, run the calibration dataset through its profile graph
+    once and keep a running histogram of the input of every simulated_quantize op.
+    Unlike collect_stats, the memory does not grow with the size of the dataset.
+
+    Parameters
+    ----------
+    mod: Module
+        The simulation graph after annotation.
+
+    dataset: Iterable[NDArray]
+        The calibration dataset.
+
+    num_bins: optional, int
+        The number of bins of each histogram.
+
+    Returns
+    -------
+    ret: list of _StreamingHistogram
+        The histogram of each layer
+    """
+    logging.info("collecting histograms for calibration...")
+    runtime = _get_profile_runtime(mod)
+    num_outputs = runtime.get_num_outputs()
+    hists = [_StreamingHistogram(num_bins) for _ in range(num_outputs)]
+    for batch in dataset:
+        runtime.set_input(**batch)
+        runtime.run()
+        for j, hist in enumerate(hists):
+            hist.update(runtime.get_output(j).asnumpy())
+    return hists
+
+
+def _kl_scale_stream(mod, dataset):
+    hists = collect_histograms(mod, dataset)
+    logging.info("finding threshold with kl for calibration...")
+    with mp.Pool() as pool:
+        scales = list(pool.map(_find_scale_by_kl_histogram_args,
+                               [(h.hist, h.thres, h.min_val) for h in hists]))
+
+    def func(_):
+        scale = scales[func.scale_idx]
+        func.scale_idx += 1
+        return scale
+    func.scale_idx = 0
+
+    return func
+
+
 def _set_params(mod, input_scale_func, weight_scale_func):
     quantize_op = _op.get("relay.op.annotation.simulated_quantize")
     cfg = quantize.current_qconfig()
@@ -192,6 +242,8 @@ def calibrate(dataset=None):
 
         if cfg.calibrate_mode == 'kl_divergence':
             input_scale_func = _kl_scale(mod, dataset)
+        elif cfg.calibrate_mode == 'kl_divergence_stream':
+            input_scale_func = _kl_scale_stream(mod, dataset)
         elif cfg.calibrate_mode == 'global_scale':
             input_scale_func = _global_scale
         else:
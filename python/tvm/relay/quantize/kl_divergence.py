@@ -36,6 +36,16 @@ def _find_scale_by_kl(arr, quantized_dtype='int8',
     max_val = np.max(arr)
     thres = max(abs(min_val), abs(max_val))
 
+    hist, _ = np.histogram(arr, bins=num_bins, range=(-thres, thres))
+    return _find_scale_by_kl_histogram(hist, thres, min_val, quantized_dtype,
+                                       num_quantized_bins)
+
+
+def _find_scale_by_kl_histogram(hist, thres, min_val, quantized_dtype='int8',
+                                num_quantized_bins=255):
+    """Find the optimal threshold from a histogram of a tensor with
+    len(hist) bins evenly covering [-thres, thres]."""
+    num_bins = len(hist)
     if min_val >= 0 and quantized_dtype in ['uint8']:
         # We need to move negative bins to positive bins to fit uint8 range.
         num_quantized_bins = num_quantized_bins * 2 + 1
@@ -44,9 +54,71 @@ def _find_scale_by_kl(arr, quantized_dtype='int8',
         ptr = arr.ctypes.data_as(ctypes.POINTER(ctypes_type))
         return ctypes.cast(ptr, ctypes.c_void_p)
 
-    hist, hist_edges = np.histogram(arr, bins=num_bins, range=(-thres, thres))
-    hist_ptr = get_pointer(hist.astype(np.int32), ctypes.c_int)
+    # keep the converted arrays alive until the call returns
+    hist = np.ascontiguousarray(hist, dtype=np.int32)
+    hist_edges = np.linspace(-thres, thres, num_bins + 1).astype(np.float32)
+    hist_ptr = get_pointer(hist, ctypes.c_int)
     hist_edges_ptr = get_pointer(hist_edges, ctypes.c_float)
 
     return _quantize.FindScaleByKLMinimization(hist_ptr, hist_edges_ptr,
                                                num_bins, num_quantized_bins)
+
+
+def _find_scale_by_kl_histogram_args(args):
+    """Unpack the arguments of _find_scale_by_kl_histogram for Pool.map"""
+    return _find_scale_by_kl_histogram(*args)
+
+
+class _StreamingHistogram(object):
+    """Histogram of a stream of tensors over a symmetric range [-thres, thres]
+    that grows with the largest absolute value seen so far.
+
+    The range grows by odd integer factors, so every new bin covers whole old
+    bins and re-binning does not lose any precision.
+
+    Parameters
+    ----------
+    num_bins : int
+        The number of bins, must be odd so that a bin is centered at zero
+    """
+    def __init__(self, num_bins=8001):
+        assert num_bins % 2 == 1, "the number of bins must be odd"
+        self.num_bins = num_bins
+        self.hist = np.zeros(num_bins, dtype=np.int64)
+        self.thres = 0.0
+        self.min_val = np.inf
+        self.max_val = -np.inf
+
+    def _grow(self, thres):
+        factor = int(np.ceil(thres / self.thres))
+        if factor % 2 == 0:
+            factor += 1
+        half = self.num_bins // 2
+        offset = np.arange(self.num_bins) - half
+        # old bins with offsets [k * factor - factor // 2, k * factor + factor // 2] form bin k
+        new_index = np.floor_divide(offset + factor // 2, factor) + half
+        hist = np.zeros_like(self.hist)
+        np.add.at(hist, new_index, self.hist)
+        self.hist = hist
+        self.thres *= factor
+
+    def update(self, arr):
+        """Add the values of a tensor to the histogram"""
+        arr = np.asarray(arr).reshape(-1)
+        if arr.size == 0:
+            return
+        min_val, max_val = np.min(arr), np.max(arr)
+        self.min_val = min(self.min_val, min_val)
+        self.max_val = max(self.max_val, max_val)
+        thres = float(max(abs(min_val), abs(max_val)))
+        if thres > self.thres:
+            if self.thres == 0:
+                # all the values so far are zeros in the center bin
+                self.thres = thres
+            else:
+                self._grow(thres)
+        if self.thres == 0:
+            self.hist[self.num_bins // 2] += arr.size
+        else:
+            self.hist += np.histogram(arr, bins=self.num_bins,
+                                      range=(-self.thres, self.thres))[0]
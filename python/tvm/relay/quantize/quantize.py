@@ -145,9 +145,11 @@ def qconfig(**kwargs):
         Number of bit for every kind of annotate field.
 
     calibrate_mode: str
-        The calibration mode. 'global_scale' or 'kl_divergence'.
+        The calibration mode. 'global_scale', 'kl_divergence' or 'kl_divergence_stream'.
         global_scale: use global scale
         kl_divergence: find scales by kl divergence on the dataset.
+        kl_divergence_stream: find scales by kl divergence on running histograms
+        collected in a single pass over the dataset, in memory independent of its size.
 
     global_scale: float
         The global scale for calibration.
@@ -31,6 +31,8 @@ from .._ffi.base import py_str
 RPC_MAGIC = 0xff271
 # magic header for RPC tracker(control plane)
 RPC_TRACKER_MAGIC = 0x2f271
+# magic header for RPC tracker with binary messages
+RPC_TRACKER_BINARY_MAGIC = 0x2f272
 # sucess response
 RPC_CODE_SUCCESS = RPC_MAGIC + 0
 # duplicate key in proxy
@@ -60,26 +62,212 @@ def get_addr_family(addr):
     return res[0][0]
 
 
-def recvall(sock, nbytes):
-    """Receive all nbytes from socket.
+# The maximum number of bytes received by one call
+RECV_WINDOW = 1 << 20
+
+
+def recv_into(sock, buf):
+    """Fill a buffer with bytes from socket.
 
     Parameters
     ----------
     sock: Socket
        The socket
 
-    nbytes : int
-       Number of bytes to be received.
+    buf : bytearray or memoryview
+       The writable buffer to be filled, it can be reused across calls.
     """
-    res = []
+    view = memoryview(buf)
+    if view.format != "B":
+        view = view.cast("B")
+    nbytes = len(view)
     nread = 0
     while nread < nbytes:
-        chunk = sock.recv(min(nbytes - nread, 1024))
+        chunk = sock.recv_into(view[nread:] if nread else view,
+                               min(nbytes - nread, RECV_WINDOW))
         if not chunk:
             raise IOError("connection reset")
-        nread += len(chunk)
-        res.append(chunk)
-    return b"".join(res)
+        nread += chunk
+
+
+def recvall(sock, nbytes):
+    """Receive all nbytes from socket.
+
+    Parameters
+    ----------
+    sock: Socket
+       The socket
+
+    nbytes : int
+       Number of bytes to be received.
+
+    Returns
+    -------
+    data : bytearray
+       The bytes received.
+    """
+    buf = bytearray(nbytes)
+    recv_into(sock, buf)
+    return buf
+
+
+def _pack_value(value, out):
+    """Append the binary encoding of a json-like value to out"""
+    if value is None:
+        out.append(b"N")
+    elif isinstance(value, bool):
+        out.append(b"T" if value else b"F")
+    elif isinstance(value, int):
+        out.append(b"i" + struct.pack("<q", value))
+    elif isinstance(value, float):
+        out.append(b"f" + struct.pack("<d", value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(b"s" + struct.pack("<I", len(data)))
+        out.append(data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        value = memoryview(value).cast("B")
+        out.append(b"b" + struct.pack("<I", len(value)))
+        out.append(value)
+    elif isinstance(value, (list, tuple)):
+        out.append(b"l" + struct.pack("<I", len(value)))
+        for item in value:
+            _pack_value(item, out)
+    elif isinstance(value, dict):
+        out.append(b"d" + struct.pack("<I", len(value)))
+        for key, item in value.items():
+            _pack_value(key, out)
+            _pack_value(item, out)
+    else:
+        raise TypeError("Cannot encode %s in a binary message" % type(value).__name__)
+
+
+def _unpack_value(view, pos):
+    """Decode a value encoded by _pack_value at pos, return it and the next position"""
+    tag = view[pos:pos + 1].tobytes()
+    pos += 1
+    if tag == b"N":
+        return None, pos
+    if tag in (b"T", b"F"):
+        return tag == b"T", pos
+    if tag == b"i":
+        return struct.unpack_from("<q", view, pos)[0], pos + 8
+    if tag == b"f":
+        return struct.unpack_from("<d", view, pos)[0], pos + 8
+    size = struct.unpack_from("<I", view, pos)[0]
+    pos += 4
+    if tag == b"s":
+        return py_str(view[pos:pos + size].tobytes()), pos + size
+    if tag == b"b":
+        return view[pos:pos + size].tobytes(), pos + size
+    if tag == b"l":
+        res = []
+        for _ in range(size):
+            item, pos = _unpack_value(view, pos)
+            res.append(item)
+        return res, pos
+    if tag == b"d":
+        res = {}
+        for _ in range(size):
+            key, pos = _unpack_value(view, pos)
+            res[key], pos = _unpack_value(view, pos)
+        return res, pos
+    raise ValueError("Invalid binary message")
+
+
+def encode_message(data, binary=False):
+    """Encode a python value as a length prefixed message.
+
+    Parameters
+    ----------
+    data : object
+        Python value to be encoded, of None, bool, int, float, str, list and dict,
+        and also bytes if binary is True.
+
+    binary : bool, optional
+        Whether to use the binary encoding instead of json.
+        The binary encoding carries bytes without escaping them.
+
+    Returns
+    -------
+    message : list of bytes
+        The pieces of the message, ready to be joined or sent
+    """
+    if not binary:
+        data = json.dumps(data).encode("utf-8")
+        return [struct.pack("<i", len(data)), data]
+    out = [b""]
+    _pack_value(data, out)
+    out[0] = struct.pack("<i", sum(len(x) for x in out))
+    return out
+
+
+def decode_message(payload, binary=False):
+    """Decode the payload of a message, without its length prefix.
+
+    Parameters
+    ----------
+    payload : bytes, bytearray or memoryview
+        The payload
+
+    binary : bool, optional
+        Whether the payload is in the binary encoding
+
+    Returns
+    -------
+    value : object
+        The value of the message.
+    """
+    if binary:
+        view = memoryview(payload).cast("B")
+        value, pos = _unpack_value(view, 0)
+        if pos != len(view):
+            raise ValueError("Invalid binary message")
+        return value
+    return json.loads(py_str(bytes(payload)))
+
+
+def sendmsg(sock, data, binary=False):
+    """send a python value to remote as a length prefixed message
+
+    Parameters
+    ----------
+    sock : Socket
+        The socket
+
+    data : object
+        Python value to be sent.
+
+    binary : bool, optional
+        Whether to use the binary encoding instead of json.
+    """
+    pieces = encode_message(data, binary)
+    if sum(len(x) for x in pieces) <= RECV_WINDOW:
+        # send small messages in one packet
+        sock.sendall(b"".join(pieces))
+    else:
+        for piece in pieces:
+            sock.sendall(piece)
+
+
+def recvmsg(sock, binary=False):
+    """receive a python value sent by sendmsg
+
+    Parameters
+    ----------
+    sock : Socket
+        The socket
+
+    binary : bool, optional
+        Whether the message is in the binary encoding.
+
+    Returns
+    -------
+    value : object
+        The value received.
+    """
+    size = struct.unpack("<i", recvall(sock, 4))[0]
+    return decode_message(recvall(sock, size), binary)
 
 
 def sendjson(sock, data):
@@ -93,9 +281,7 @@ def sendjson(sock, data):
     data : object
         Python value to be sent.
     """
-    data = json.dumps(data)
-    sock.sendall(struct.pack("<i", len(data)))
-    sock.sendall(data.encode("utf-8"))
+    sendmsg(sock, data)
 
 
 def recvjson(sock):
@@ -111,9 +297,7 @@ def recvjson(sock):
     value : object
         The value received.
     """
-    size = struct.unpack("<i", recvall(sock, 4))[0]
-    data = json.loads(py_str(recvall(sock, size)))
-    return data
+    return recvmsg(sock)
 
 
 def random_key(prefix, cmap=None):
@@ -15,11 +15,14 @@
 # specific language governing permissions and limitations
 # under the License.
 """RPC client tools"""
+import io
+import logging
 import os
 import stat
 import socket
 import struct
 import time
+import zlib
 
 import tvm._ffi
 from tvm.contrib import util
@@ -30,6 +33,24 @@ from . import base
 from . import server
 from . import _ffi_api
 
+logger = logging.getLogger("RPCClient")
+
+# The default number of bytes of a chunk of file transfer
+CHUNK_SIZE = 4 << 20
+_MAX_CHUNK_RETRY = 3
+
+
+def _crc32(fin, nbytes):
+    """Get the CRC-32 of the next nbytes of a file"""
+    crc = 0
+    while nbytes > 0:
+        data = fin.read(min(nbytes, CHUNK_SIZE))
+        if not data:
+            break
+        crc = zlib.crc32(data, crc)
+        nbytes -= len(data)
+    return crc
+
 
 class RPCSession(object):
     """RPC Client session module
@@ -91,9 +112,27 @@ class RPCSession(object):
         ctx._rpc_sess = self
         return ctx
 
-    def upload(self, data, target=None):
+    def _get_server_func(self, name):
+        """Get a function of the server environment, None if the server lacks it"""
+        if name not in self._remote_funcs:
+            try:
+                self._remote_funcs[name] = self.get_function("tvm.rpc.server." + name)
+            except AttributeError:
+                self._remote_funcs[name] = None
+        return self._remote_funcs[name]
+
+    def _remote_crc32(self, path, nbytes):
+        return self._get_server_func("file_crc32")(path, nbytes) & 0xffffffff
+
+    def upload(self, data, target=None, chunk_size=CHUNK_SIZE, progress=None):
         """Upload file to remote runtime temp folder
 
+        The file is streamed in chunks of chunk_size bytes, each checked by
+        its CRC-32 on the remote. A file larger than a chunk is written to
+        target.part first, so that an interrupted upload resumes from there.
+        The upload is skipped when the remote target has the same size and CRC-32.
+        Servers without chunked transfer get the whole file in one call.
+
         Parameters
         ----------
         data : str or bytearray
@@ -101,38 +140,202 @@ class RPCSession(object):
 
         target : str, optional
             The path in remote
+
+        chunk_size : int, optional
+            The number of bytes sent by one remote call
+
+        progress : callable, optional
+            Called with the number of bytes sent and the total after each chunk
         """
         if isinstance(data, bytearray):
             if not target:
                 raise ValueError("target must present when file is a bytearray")
-            blob = data
+            size = len(data)
         else:
-            blob = bytearray(open(data, "rb").read())
+            size = os.path.getsize(data)
             if not target:
                 target = os.path.basename(data)
 
-        if "upload" not in self._remote_funcs:
-            self._remote_funcs["upload"] = self.get_function(
-                "tvm.rpc.server.upload")
-        self._remote_funcs["upload"](target, blob)
+        file_size = self._get_server_func("file_size")
+        if file_size is None:
+            blob = data if isinstance(data, bytearray) else bytearray(open(data, "rb").read())
+            self._get_server_func("upload")(target, blob)
+            return
+
+        with (io.BytesIO(data) if isinstance(data, bytearray) else open(data, "rb")) as fin:
+            if file_size(target) == size and self._remote_crc32(target, size) == \
+                    _crc32(fin, size):
+                logger.debug("Skip uploading %s, the remote has the same file", target)
+                if progress:
+                    progress(size, size)
+                return
+
+            part = target + ".part" if size > chunk_size else target
+            offset = 0
+            if part != target:
+                part_size = file_size(part)
+                fin.seek(0)
+                if 0 < part_size <= size and \
+                        self._remote_crc32(part, part_size) == _crc32(fin, part_size):
+                    logger.info("Resume uploading %s from %d bytes", target, part_size)
+                    offset = part_size
+
+            upload_chunk = self._get_server_func("upload_chunk")
+            buf = bytearray(chunk_size)
+            fin.seek(offset)
+            while offset < size or offset == 0:
+                nread = fin.readinto(buf)
+                chunk = buf if nread == chunk_size else buf[:nread]
+                crc = zlib.crc32(chunk)
+                for retry in range(_MAX_CHUNK_RETRY):
+                    try:
+                        upload_chunk(part, offset, chunk, crc)
+                        break
+                    except TVMError:
+                        if retry + 1 == _MAX_CHUNK_RETRY:
+                            raise
+                offset += nread
+                if progress:
+                    progress(offset, size)
+                if not nread:
+                    break
+        if part != target:
+            self._get_server_func("rename")(part, target)
+
+    def upload_batch(self, files, chunk_size=CHUNK_SIZE):
+        """Upload several files to remote runtime temp folder, packing the
+        files into remote calls of at most chunk_size bytes.
+
+        Each call is checked by its CRC-32. Files larger than chunk_size and
+        servers without batched transfer fall back to upload.
+
+        Parameters
+        ----------
+        files : list of str
+            The file names in local to upload, each to its base name in remote.
 
-    def download(self, path):
+        chunk_size : int, optional
+            The maximum number of bytes sent by one remote call
+        """
+        upload_batch = self._get_server_func("upload_batch")
+        blob = bytearray()
+        names = []
+
+        def _flush():
+            crc = zlib.crc32(blob)
+            for retry in range(_MAX_CHUNK_RETRY):
+                try:
+                    upload_batch(blob, crc, *names)
+                    break
+                except TVMError:
+                    if retry + 1 == _MAX_CHUNK_RETRY:
+                        raise
+            del blob[:]
+            del names[:]
+
+        for path in files:
+            size = os.path.getsize(path)
+            if upload_batch is None or size > chunk_size:
+                self.upload(path, chunk_size=chunk_size)
+                continue
+            if names and len(blob) + size > chunk_size:
+                _flush()
+            with open(path, "rb") as fin:
+                blob += fin.read()
+            names.extend([os.path.basename(path), size])
+        if names:
+            _flush()
+
+    def download(self, path, target=None, chunk_size=CHUNK_SIZE, progress=None):
         """Download file from remote temp folder.
 
+        The file is streamed in chunks of chunk_size bytes and checked by its
+        CRC-32. When downloading to a local file, the file is written to
+        target.part first, so that an interrupted download resumes from there,
+        and the download is skipped when target has the same size and CRC-32.
+
         Parameters
         ----------
         path : str
             The relative location to remote temp folder.
 
+        target : str, optional
+            The local file to write to, by default the file is returned.
+
+        chunk_size : int, optional
+            The number of bytes received by one remote call
+
+        progress : callable, optional
+            Called with the number of bytes received and the total after each chunk
+
         Returns
         -------
-        blob : bytearray
-            The result blob from the file.
+        blob : bytearray or str
+            The result blob from the file, or target when it is given.
         """
-        if "download" not in self._remote_funcs:
-            self._remote_funcs["download"] = self.get_function(
-                "tvm.rpc.server.download")
-        return self._remote_funcs["download"](path)
+        file_size = self._get_server_func("file_size")
+        if file_size is None:
+            blob = self._get_server_func("download")(path)
+            if target is None:
+                return blob
+            with open(target, "wb") as fout:
+                fout.write(blob)
+            return target
+
+        size = file_size(path)
+        if size < 0:
+            raise IOError("Remote file %s does not exist" % path)
+        expected_crc = self._remote_crc32(path, size)
+        download_chunk = self._get_server_func("download_chunk")
+
+        if target is None:
+            blob = bytearray(size)
+            offset, crc = 0, 0
+            while offset < size:
+                chunk = download_chunk(path, offset, min(chunk_size, size - offset))
+                if not chunk:
+                    raise IOError("Remote file %s is truncated" % path)
+                blob[offset:offset + len(chunk)] = chunk
+                crc = zlib.crc32(chunk, crc)
+                offset += len(chunk)
+                if progress:
+                    progress(offset, size)
+            if crc != expected_crc:
+                raise IOError("Checksum mismatch of downloaded %s" % path)
+            return blob
+
+        if os.path.isfile(target) and os.path.getsize(target) == size:
+            with open(target, "rb") as fin:
+                if _crc32(fin, size) == expected_crc:
+                    logger.debug("Skip downloading %s, the local file is the same", path)
+                    return target
+
+        part = target + ".part"
+        offset, crc = 0, 0
+        if os.path.isfile(part) and 0 < os.path.getsize(part) <= size:
+            with open(part, "rb") as fin:
+                crc = _crc32(fin, os.path.getsize(part))
+            if crc == self._remote_crc32(path, os.path.getsize(part)):
+                offset = os.path.getsize(part)
+                logger.info("Resume downloading %s from %d bytes", path, offset)
+            else:
+                crc = 0
+        with open(part, "r+b" if offset else "wb") as fout:
+            fout.seek(offset)
+            while offset < size:
+                chunk = download_chunk(path, offset, min(chunk_size, size - offset))
+                if not chunk:
+                    raise IOError("Remote file %s is truncated" % path)
+                fout.write(chunk)
+                crc = zlib.crc32(chunk, crc)
+                offset += len(chunk)
+                if progress:
+                    progress(offset, size)
+        if crc != expected_crc:
+            os.remove(part)
+            raise IOError("Checksum mismatch of downloaded %s" % path)
+        os.replace(part, target)
+        return target
 
     def remove(self, path):
         """Remove file from remote temp folder.
@@ -242,10 +445,15 @@ class TrackerSession(object):
     ----------
     addr : tuple
         The address tuple
+
+    binary : bool, optional
+        Whether to exchange binary messages instead of json with the tracker
     """
-    def __init__(self, addr):
+    def __init__(self, addr, binary=False):
         self._addr = addr
         self._sock = None
+        self._binary = binary
+        self._magic = base.RPC_TRACKER_BINARY_MAGIC if binary else base.RPC_TRACKER_MAGIC
         self._connect()
 
     def __del__(self):
@@ -253,9 +461,9 @@ class TrackerSession(object):
 
     def _connect(self):
         self._sock = base.connect_with_retry(self._addr)
-        self._sock.sendall(struct.pack("<i", base.RPC_TRACKER_MAGIC))
+        self._sock.sendall(struct.pack("<i", self._magic))
         magic = struct.unpack("<i", base.recvall(self._sock, 4))[0]
-        if magic != base.RPC_TRACKER_MAGIC:
+        if magic != self._magic:
             raise RuntimeError("%s is not RPC Tracker" % str(self._addr))
 
     def close(self):
@@ -266,8 +474,8 @@ class TrackerSession(object):
 
     def summary(self):
         """Get the summary dict of the tracker."""
-        base.sendjson(self._sock, [base.TrackerCode.SUMMARY])
-        value = base.recvjson(self._sock)
+        base.sendmsg(self._sock, [base.TrackerCode.SUMMARY], self._binary)
+        value = base.recvmsg(self._sock, self._binary)
         if value[0] != base.TrackerCode.SUCCESS:
             raise RuntimeError("Invalid return value %s" % str(value))
         return value[1]
@@ -316,7 +524,7 @@ class TrackerSession(object):
         res += separate_line
         return res
 
-    def request(self, key, priority=1, session_timeout=0, max_retry=5):
+    def request(self, key, priority=1, session_timeout=0, max_retry=5, user=""):
         """Request a new connection from the tracker.
 
         Parameters
@@ -334,15 +542,19 @@ class TrackerSession(object):
 
         max_retry : int, optional
             Maximum number of times to retry before give up.
+
+        user : str, optional
+            The user name used by fair-share trackers.
+            By default the user is identified by its host.
         """
         last_err = None
         for _ in range(max_retry):
             try:
                 if self._sock is None:
                     self._connect()
-                base.sendjson(self._sock,
-                              [base.TrackerCode.REQUEST, key, "", priority])
-                value = base.recvjson(self._sock)
+                base.sendmsg(self._sock, [base.TrackerCode.REQUEST, key, user, priority],
+                             self._binary)
+                value = base.recvmsg(self._sock, self._binary)
                 if value[0] != base.TrackerCode.SUCCESS:
                     raise RuntimeError("Invalid return value %s" % str(value))
                 url, port, matchkey = value[1]
@@ -467,7 +679,7 @@ def connect(url, port, key="", session_timeout=0, session_constructor_args=None)
     return RPCSession(sess)
 
 
-def connect_tracker(url, port):
+def connect_tracker(url, port, binary=False):
     """Connect to a RPC tracker
 
     Parameters
@@ -478,9 +690,12 @@ def connect_tracker(url, port):
     port : int
         The port to connect to
 
+    binary : bool, optional
+        Whether to exchange binary messages instead of json with the tracker
+
     Returns
     -------
     sess : TrackerSession
         The connected tracker session.
     """
-    return TrackerSession((url, port))
+    return TrackerSession((url, port), binary)
@@ -16,10 +16,14 @@
 # under the License.
 """Utilities used in tornado."""
 
+import collections
 import socket
 import errno
 from tornado import ioloop
 
+# The size of the buffer reused by every read
+READ_WINDOW = 1 << 18
+
 class TCPHandler(object):
     """TCP socket handler backed tornado event loop.
 
@@ -32,7 +36,8 @@ class TCPHandler(object):
         self._sock = sock
         self._ioloop = ioloop.IOLoop.current()
         self._sock.setblocking(0)
-        self._pending_write = []
+        self._pending_write = collections.deque()
+        self._read_buf = bytearray(READ_WINDOW)
         self._signal_close = False
         def _event_handler(_, events):
             self._event_handler(events)
@@ -86,9 +91,10 @@ class TCPHandler(object):
                     return
                 nsend = self._sock.send(msg)
                 if nsend != len(msg):
-                    self._pending_write[0] = msg[nsend:]
+                    # keep the rest without copying it
+                    self._pending_write[0] = memoryview(msg)[nsend:]
                 else:
-                    self._pending_write.pop(0)
+                    self._pending_write.popleft()
             except socket.error as err:
                 if err.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
                     break
@@ -107,9 +113,9 @@ class TCPHandler(object):
     def _update_read(self):
         """Update state when there is read event"""
         try:
-            msg = bytes(self._sock.recv(4096))
-            if msg:
-                self.on_message(msg)
+            nread = self._sock.recv_into(self._read_buf)
+            if nread:
+                self.on_message(bytes(memoryview(self._read_buf)[:nread]))
                 return True
             # normal close, remote is closed
             self.close()
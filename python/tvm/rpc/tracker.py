@@ -22,8 +22,9 @@ Note
 ----
 Tracker is a TCP based rest api with the following protocol:
 - Initial handshake to the peer
-  - RPC_TRACKER_MAGIC
+  - RPC_TRACKER_MAGIC, or RPC_TRACKER_BINARY_MAGIC for binary messages
 - Normal message: [size(int32), json-data]
+  - with binary messages, the data is encoded by base.encode_message(binary=True)
 - Each message is initiated by the client, and the tracker replies with a json.
 
 List of available APIs:
@@ -42,13 +43,14 @@ List of available APIs:
 # pylint: disable=invalid-name
 
 import heapq
+import itertools
 import time
 import logging
 import socket
 import multiprocessing
 import errno
 import struct
-import json
+from collections import OrderedDict
 
 try:
     from tornado import ioloop
@@ -57,9 +59,8 @@ except ImportError as error_msg:
     raise ImportError(
         "RPCTracker module requires tornado package %s. Try 'pip install tornado'." % error_msg)
 
-from .._ffi.base import py_str
 from . import base
-from .base import RPC_TRACKER_MAGIC, TrackerCode
+from .base import RPC_TRACKER_MAGIC, RPC_TRACKER_BINARY_MAGIC, TrackerCode
 
 logger = logging.getLogger("RPCTracker")
 
@@ -145,12 +146,213 @@ class PriorityScheduler(Scheduler):
                 "pending": len(self._requests)}
 
 
+class FairShareScheduler(Scheduler):
+    """Fair-share scheduler that divides the devices of a key among users.
+
+    A free device goes to the user whose number of active leases divided by
+    its share is smallest, so a user with a large tuning job cannot starve
+    the others. Requests of the same user are served by priority, then FIFO.
+
+    A lease starts when a device is handed to a user and ends when the server
+    of the device reports itself free again.
+
+    Parameters
+    ----------
+    key : str
+        The device key
+
+    shares : dict of str to float, optional
+        The share of each user, users not in the dict have share 1
+
+    lease_timeout : float, optional
+        Leases older than this number of seconds are treated as idle and no
+        longer count against the share of their user. 0 means never.
+        The tracker cannot end the session of a server, so the device of an
+        expired lease is not reclaimed: it stays busy until its server reports
+        itself free, e.g. when the session of a crashed client times out.
+    """
+    def __init__(self, key, shares=None, lease_timeout=0):
+        self._key = key
+        self._shares = shares or {}
+        self._lease_timeout = lease_timeout
+        # free devices in FIFO order, value -> None
+        self._values = OrderedDict()
+        # user -> heap of (-priority, time, seq, callback)
+        self._requests = {}
+        # heap of (load, time of first request, seq, user), stale entries are skipped
+        self._user_heap = []
+        self._user_entry = {}
+        # connection of the server -> (user, start time)
+        self._leases = {}
+        # expired leases whose device is still busy, same layout as _leases
+        self._expired = {}
+        self._user_active = {}
+        self._user_granted = {}
+        self._counter = itertools.count()
+        self._num_pending = 0
+        self._num_expired = 0
+
+        self._start_time = self._last_time = time.time()
+        self._device_seconds = 0.0
+        self._busy_seconds = 0.0
+
+    def _advance(self):
+        """Integrate the number of devices and busy devices over time"""
+        now = time.time()
+        elapsed = now - self._last_time
+        num_busy = len(self._leases) + len(self._expired)
+        self._device_seconds += elapsed * (len(self._values) + num_busy)
+        self._busy_seconds += elapsed * num_busy
+        self._last_time = now
+        return now
+
+    def _load(self, user):
+        return self._user_active.get(user, 0) / float(self._shares.get(user, 1))
+
+    def _push_user(self, user):
+        queue = self._requests.get(user)
+        if not queue:
+            self._user_entry.pop(user, None)
+            return
+        entry = (self._load(user), queue[0][1], next(self._counter), user)
+        self._user_entry[user] = entry
+        heapq.heappush(self._user_heap, entry)
+
+    def _pop_user(self):
+        while self._user_heap:
+            entry = heapq.heappop(self._user_heap)
+            if self._user_entry.get(entry[-1]) is entry:
+                del self._user_entry[entry[-1]]
+                return entry[-1]
+        return None
+
+    def _end_lease(self, conn, now):
+        user, _ = self._leases.pop(conn)
+        self._user_active[user] -= 1
+        if self._user_active[user] == 0:
+            del self._user_active[user]
+        if user in self._user_entry:
+            self._push_user(user)
+
+    def _expire_leases(self, now):
+        if not self._lease_timeout:
+            return
+        for conn, (_, start) in list(self._leases.items()):
+            if now - start > self._lease_timeout:
+                logger.info("Lease of %s on %s expired", self._leases[conn][0], self._key)
+                self._num_expired += 1
+                self._expired[conn] = self._leases[conn]
+                self._end_lease(conn, now)
+
+    def _schedule(self):
+        now = self._advance()
+        self._expire_leases(now)
+        while self._values and self._user_heap:
+            user = self._pop_user()
+            if user is None:
+                break
+            queue = self._requests[user]
+            item = heapq.heappop(queue)
+            self._num_pending -= 1
+            if not queue:
+                del self._requests[user]
+            value, _ = self._values.popitem(last=False)
+            if item[-1](value[1:]):
+                value[0].pending_matchkeys.remove(value[-1])
+                self._leases[value[0]] = (user, now)
+                self._user_active[user] = self._user_active.get(user, 0) + 1
+                self._user_granted[user] = self._user_granted.get(user, 0) + 1
+            else:
+                # the requester is gone, keep the device
+                self._values[value] = None
+                self._values.move_to_end(value, last=False)
+            self._push_user(user)
+
+    def put(self, value):
+        now = self._advance()
+        # the server reports itself free again after its session ends
+        if value[0] in self._leases:
+            self._end_lease(value[0], now)
+        self._expired.pop(value[0], None)
+        self._values[value] = None
+        self._schedule()
+
+    def request(self, user, priority, callback):
+        queue = self._requests.setdefault(user, [])
+        heapq.heappush(queue, (-priority, time.time(), next(self._counter), callback))
+        self._num_pending += 1
+        if len(queue) == 1:
+            self._push_user(user)
+        self._schedule()
+
+    def remove(self, value):
+        now = self._advance()
+        if value in self._values:
+            del self._values[value]
+        if value[0] in self._leases:
+            self._end_lease(value[0], now)
+        self._expired.pop(value[0], None)
+        self._schedule()
+
+    def summary(self):
+        """Get summary information of the scheduler.
+
+        busy counts all the devices in use, including the ones of expired
+        leases, which are also counted by expired_busy. expired is the number
+        of leases that expired since the start.
+        """
+        self._expire_leases(self._advance())
+        users = {}
+        for user in set(self._requests) | set(self._user_active) | set(self._user_granted):
+            users[user] = {"active": self._user_active.get(user, 0),
+                           "granted": self._user_granted.get(user, 0),
+                           "pending": len(self._requests.get(user, ())),
+                           "share": self._shares.get(user, 1)}
+        return {"free": len(self._values),
+                "pending": self._num_pending,
+                "busy": len(self._leases) + len(self._expired),
+                "expired": self._num_expired,
+                "expired_busy": len(self._expired),
+                "utilization": (self._busy_seconds / self._device_seconds
+                                if self._device_seconds > 0 else 0.0),
+                "uptime": time.time() - self._start_time,
+                "users": users}
+
+
+def create_scheduler(key, scheduler="priority", **kwargs):
+    """Create the scheduler of a device key.
+
+    Parameters
+    ----------
+    key : str
+        The device key
+
+    scheduler : str
+        The kind of scheduler, "priority" or "fair"
+
+    kwargs : dict
+        The options passed to the scheduler
+
+    Returns
+    -------
+    scheduler : Scheduler
+        The created scheduler
+    """
+    if scheduler == "priority":
+        return PriorityScheduler(key)
+    if scheduler == "fair":
+        return FairShareScheduler(key, **kwargs)
+    raise ValueError("Unknown scheduler %s" % scheduler)
+
+
 class TCPEventHandler(tornado_util.TCPHandler):
     """Base asynchronize message handler.
 
     The tracker and client follows a simple message protocol.
     The message is in form [nbytes(int32)] [json-str].
-    All the information is packed in json-str
+    All the information is packed in json-str, or in the binary
+    encoding of base.encode_message if the client connects with
+    RPC_TRACKER_BINARY_MAGIC.
     """
     def __init__(self, tracker, sock, addr):
         super(TCPEventHandler, self).__init__(sock)
@@ -159,6 +361,7 @@ class TCPEventHandler(tornado_util.TCPHandler):
         self._msg_size = 0
         self._addr = addr
         self._init_req_nbytes = 4
+        self._binary = False
         self._info = {"addr": addr}
         # list of pending match keys that has not been used.
         self.pending_matchkeys = set()
@@ -179,10 +382,11 @@ class TCPEventHandler(tornado_util.TCPHandler):
             logger.warning("Invalid connection from %s", self.name())
             self.close()
         magic = struct.unpack('<i', message)[0]
-        if magic != RPC_TRACKER_MAGIC:
+        if magic not in (RPC_TRACKER_MAGIC, RPC_TRACKER_BINARY_MAGIC):
             logger.warning("Invalid magic from %s", self.name())
             self.close()
-        self.write_message(struct.pack('<i', RPC_TRACKER_MAGIC), binary=True)
+        self._binary = magic == RPC_TRACKER_BINARY_MAGIC
+        self.write_message(struct.pack('<i', magic), binary=True)
         self._init_req_nbytes = 0
 
     def on_message(self, message):
@@ -200,27 +404,30 @@ class TCPEventHandler(tornado_util.TCPHandler):
 
         self._data += message
 
+        # parse all complete messages, then drop them from the buffer at once
+        pos = 0
         while True:
             if self._msg_size == 0:
-                if len(self._data) >= 4:
-                    self._msg_size = struct.unpack('<i', self._data[:4])[0]
+                if len(self._data) - pos >= 4:
+                    self._msg_size = struct.unpack_from('<i', self._data, pos)[0]
                 else:
-                    return
-            if self._msg_size != 0 and len(self._data) >= self._msg_size + 4:
-                msg = py_str(bytes(self._data[4:4 + self._msg_size]))
-                del self._data[:4 + self._msg_size]
+                    break
+            if self._msg_size != 0 and len(self._data) - pos >= self._msg_size + 4:
+                with memoryview(self._data) as view:
+                    args = base.decode_message(
+                        view[pos + 4:pos + 4 + self._msg_size], self._binary)
+                pos += 4 + self._msg_size
                 self._msg_size = 0
-                # pylint: disable=broad-except
-                self.call_handler(json.loads(msg))
+                self.call_handler(args)
+                if self._sock is None:
+                    return
             else:
-                return
+                break
+        del self._data[:pos]
 
     def ret_value(self, data):
         """return value to the output"""
-        data = json.dumps(data)
-        self.write_message(
-            struct.pack('<i', len(data)), binary=True)
-        self.write_message(data.encode("utf-8"), binary=True)
+        self.write_message(b"".join(base.encode_message(data, self._binary)), binary=True)
 
     def call_handler(self, args):
         """Event handler when json request arrives."""
@@ -239,7 +446,8 @@ class TCPEventHandler(tornado_util.TCPHandler):
             self.ret_value(TrackerCode.SUCCESS)
         elif code == TrackerCode.REQUEST:
             key = args[1]
-            user = args[2]
+            # anonymous users are identified by their host
+            user = args[2] or self._addr[0]
             priority = args[3]
             def _cb(value):
                 # if the connection is already closed
@@ -282,8 +490,10 @@ class TCPEventHandler(tornado_util.TCPHandler):
 
 class TrackerServerHandler(object):
     """Tracker that tracks the resources."""
-    def __init__(self, sock, stop_key):
+    def __init__(self, sock, stop_key, scheduler="priority", scheduler_options=None):
         self._scheduler_map = {}
+        self._scheduler = scheduler
+        self._scheduler_options = scheduler_options or {}
         self._sock = sock
         self._sock.setblocking(0)
         self._ioloop = ioloop.IOLoop.current()
@@ -305,7 +515,7 @@ class TrackerServerHandler(object):
 
     def create_scheduler(self, key):
         """Create a new scheduler."""
-        return PriorityScheduler(key)
+        return create_scheduler(key, self._scheduler, **self._scheduler_options)
 
     def put(self, key, value):
         """Report a new resource to the tracker."""
@@ -350,8 +560,8 @@ class TrackerServerHandler(object):
         """Run the tracker server"""
         self._ioloop.start()
 
-def _tracker_server(listen_sock, stop_key):
-    handler = TrackerServerHandler(listen_sock, stop_key)
+def _tracker_server(listen_sock, stop_key, scheduler, scheduler_options):
+    handler = TrackerServerHandler(listen_sock, stop_key, scheduler, scheduler_options)
     handler.run()
 
 
@@ -373,12 +583,21 @@ class Tracker(object):
 
     silent: bool, optional
         Whether run in silent mode
+
+    scheduler: str, optional
+        The scheduler of every device key, "priority" or "fair"
+
+    scheduler_options: dict, optional
+        The options of the scheduler, e.g. {"shares": {...}, "lease_timeout": 600}
+        for the fair-share scheduler
     """
     def __init__(self,
                  host,
                  port=9190,
                  port_end=9199,
-                 silent=False):
+                 silent=False,
+                 scheduler="priority",
+                 scheduler_options=None):
         if silent:
             logger.setLevel(logging.WARN)
 
@@ -399,7 +618,7 @@ class Tracker(object):
         logger.info("bind to %s:%d", host, self.port)
         sock.listen(1)
         self.proc = multiprocessing.Process(
-            target=_tracker_server, args=(sock, self.stop_key))
+            target=_tracker_server, args=(sock, self.stop_key, scheduler, scheduler_options))
         self.proc.start()
         self.host = host
         # close the socket on this process
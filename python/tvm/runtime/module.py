@@ -18,7 +18,12 @@
 # pylint: disable=invalid-name, unused-import, import-outside-toplevel
 """Runtime Module namespace."""
 import ctypes
+import functools
+import os
+import re
 import struct
+import time
+import types
 from collections import namedtuple
 
 import tvm._ffi
@@ -27,6 +32,7 @@ from tvm._ffi.libinfo import find_include_path
 from .packed_func import PackedFunc, PackedFuncHandle, _set_class_module
 
 from . import _ffi_api
+from .timing import summarize
 
 
 # profile result of time evaluator
@@ -163,7 +169,9 @@ class Module(object):
         """
         _ffi_api.ModuleSaveToFile(self, file_name, fmt)
 
-    def time_evaluator(self, func_name, ctx, number=10, repeat=1, min_repeat_ms=0):
+    def time_evaluator(self, func_name, ctx, number=10, repeat=1, min_repeat_ms=0,
+                       adaptive=False, target=0.01, criterion="ci", max_time_ms=1000,
+                       max_repeat=100):
         """Get an evaluator that measures time cost of running function.
 
         Parameters
@@ -193,16 +201,39 @@ class Module(object):
             i.e., When the run time of one `repeat` falls below this time, the `number` parameter
             will be automatically increased.
 
+        adaptive: bool, optional
+            Whether to keep measuring rounds of `repeat` costs until the precision
+            target is reached, the total measurement time exceeds max_time_ms or
+            max_repeat costs are collected.
+
+        target: float, optional
+            The precision target of the adaptive mode, relative to the mean cost.
+
+        criterion: str, optional
+            The precision measure of the adaptive mode compared to target:
+            "ci" for the half width of the 95% confidence interval of the mean,
+            "cv" for the coefficient of variation.
+
+        max_time_ms: int, optional
+            The maximum duration of an adaptive measurement in milliseconds.
+            It is checked after every round.
+
+        max_repeat: int, optional
+            The maximum number of costs of an adaptive measurement.
+
         Note
         ----
         The function will be invoked  (1 + number x repeat) times,
         with the first call discarded in case there is lazy initialization.
+        In adaptive mode, this happens for every round.
 
         Returns
         -------
         ftimer : function
             The function that takes same argument as func and returns a ProfileResult.
             The ProfileResult reports `repeat` time costs in seconds.
+            In adaptive mode, it returns a TimingStats instead, which reports all
+            the costs and their statistics.
         """
         try:
             feval = _ffi_api.RPCTimeEvaluator(
@@ -218,6 +249,25 @@ class Module(object):
                 mean = sum(results) / float(repeat)
                 return ProfileResult(mean=mean, results=results)
 
+            def adaptive_evaluator(*args):
+                """Internal evaluator measuring rounds until the target is reached."""
+                fmt = "@" + ("d" * repeat)
+                results = []
+                tstart = time.time()
+                while True:
+                    results.extend(struct.unpack(fmt, feval(*args)))
+                    stats = summarize(results)
+                    error = stats.rel_ci if criterion == "ci" else stats.cv
+                    if len(results) >= 3 and error <= target:
+                        return stats._replace(converged=True)
+                    if (time.time() - tstart) * 1000 >= max_time_ms or \
+                            len(results) + repeat > max_repeat:
+                        return stats
+
+            if adaptive:
+                if criterion not in ("ci", "cv"):
+                    raise ValueError("Unknown criterion %s, expect ci or cv" % criterion)
+                return adaptive_evaluator
             return evaluator
         except NameError:
             raise NameError("time_evaluate is only supported when RPC is enabled")
@@ -245,6 +295,8 @@ class Module(object):
                        file_name,
                        fcompile=None,
                        addons=None,
+                       cache_dir=None,
+                       num_workers=1,
                        **kwargs):
         """Export the module and its imported device code one library.
 
@@ -261,6 +313,20 @@ class Module(object):
             If fcompile has attribute object_format, will compile host library
             to that format. Otherwise, will use default format "o".
 
+        addons : list of str, optional
+            Additional files passed to fcompile
+
+        cache_dir : str, optional
+            If set, the exported library is cached in this directory keyed by the
+            content of its inputs, and a library with the same inputs is copied
+            from the cache instead of linked again. With the default fcompile, the
+            C sources, including the packed imported modules, are compiled to
+            objects which are cached by their preprocessed sources. fcompile is identified by its
+            name and the values it closes over.
+
+        num_workers : int, optional
+            The number of threads saving the modules and compiling the sources
+
         kwargs : dict, optional
             Additional arguments passed to fcompile
         """
@@ -288,6 +354,7 @@ class Module(object):
         is_system_lib = False
         has_c_module = False
         llvm_target_triple = None
+        saves = []
         for index, module in enumerate(modules):
             if fcompile is not None and hasattr(fcompile, "object_format"):
                 object_format = fcompile.object_format
@@ -299,12 +366,14 @@ class Module(object):
                     object_format = "cc"
                     has_c_module = True
             path_obj = temp.relpath("lib" + str(index) + "." + object_format)
-            module.save(path_obj)
+            saves.append((module, path_obj))
             files.append(path_obj)
             is_system_lib = (module.type_key == "llvm" and
                              module.get_function("__tvm_is_system_module")())
             llvm_target_triple = (module.type_key == "llvm" and
                                   module.get_function("_get_target_triple")())
+        # the modules are independent, code generation releases the GIL
+        _map_parallel(lambda item: item[0].save(item[1]), saves, num_workers)
         if not fcompile:
             if file_name.endswith(".tar"):
                 fcompile = _tar.tar
@@ -337,7 +406,93 @@ class Module(object):
             opts = options + ["-I" + path for path in find_include_path()]
             kwargs.update({'options': opts})
 
-        fcompile(file_name, files, **kwargs)
+        if cache_dir is None:
+            fcompile(file_name, files, **kwargs)
+        else:
+            _compile_cached(file_name, files, fcompile, cache_dir, num_workers, temp, kwargs)
+
+
+def _map_parallel(func, items, num_workers):
+    """Apply func to items with a pool of num_workers threads"""
+    if num_workers <= 1 or len(items) <= 1:
+        return [func(x) for x in items]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        return list(pool.map(func, items))
+
+
+def _stable_repr(value):
+    """repr of a value, or its type if the repr holds an object address that changes
+    from run to run"""
+    text = repr(value)
+    if re.search(r" at 0x[0-9a-fA-F]+", text):
+        return "%s.%s" % (type(value).__module__, type(value).__qualname__)
+    return text
+
+
+def _code_key(code):
+    """Identify a code object by its bytecode and constants, including nested functions"""
+    return [code.co_code] + [_code_key(x) if isinstance(x, types.CodeType) else repr(x)
+                             for x in code.co_consts]
+
+
+def _func_key(func, depth=3):
+    """Identify a compile function by its name, its code and the values it closes over"""
+    if isinstance(func, functools.partial):
+        return ["partial", _func_key(func.func, depth),
+                [_stable_repr(x) for x in func.args],
+                sorted((k, _stable_repr(v)) for k, v in func.keywords.items())]
+    parts = [getattr(func, "__module__", None),
+             getattr(func, "__qualname__", None) or _stable_repr(func)]
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        parts.append(_code_key(code))
+    for cell in getattr(func, "__closure__", None) or ():
+        value = cell.cell_contents
+        parts.append(_func_key(value, depth - 1) if callable(value) and depth > 0
+                     else _stable_repr(value))
+    return parts
+
+
+def _compile_cached(file_name, files, fcompile, cache_dir, num_workers, temp, kwargs):
+    """Link files to file_name with fcompile, reusing the objects and
+    libraries in cache_dir built from the same inputs"""
+    import sys
+    from tvm.contrib import cc as _cc
+    from tvm.contrib.compile_cache import CompileCache, compiler_version, hash_file
+
+    cache = CompileCache(cache_dir)
+    link_options = []
+    if fcompile is _cc.create_shared and sys.platform != "win32":
+        # compile the sources separately to cache their objects
+        compiler = kwargs.get("cc", "g++")
+        options = kwargs.get("options") or []
+        options = list(options) if isinstance(options, (list, tuple)) else [options]
+        link_options = [compiler_version(compiler)]
+
+        def _compile(item):
+            index, path = item
+            if not path.endswith((".c", ".cc", ".cpp")):
+                return path
+            path_obj = temp.relpath("obj%d.o" % index)
+            # the preprocessed source covers the included headers, e.g. of the runtime
+            digest = _cc.source_digest(path, options, compiler)
+            if digest is None:
+                _cc.create_object(path_obj, path, options, compiler)
+                return path_obj
+            key = CompileCache.key(compiler, compiler_version(compiler), options, digest)
+            cache.build(key, ".o", path_obj,
+                        lambda: _cc.create_object(path_obj, path, options, compiler))
+            return path_obj
+
+        files = _map_parallel(_compile, list(enumerate(files)), num_workers)
+
+    suffix = os.path.splitext(file_name)[1]
+    inputs = [(os.path.splitext(path)[1], hash_file(path)) for path in files]
+    key = CompileCache.key(_func_key(fcompile),
+                           sorted((k, _stable_repr(v)) for k, v in kwargs.items()),
+                           link_options, inputs, suffix)
+    cache.build(key, suffix, file_name, lambda: fcompile(file_name, files, **kwargs))
 
 
 def system_lib():
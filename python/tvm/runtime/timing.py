@@ -0,0 +1,150 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Statistics of time measurements.
+
+Outliers are the samples whose modified z-score, computed from the median
+and the median absolute deviation, exceeds a threshold. The mean, standard
+deviation and confidence interval are computed without the outliers.
+Drift is the change of the samples over the measurement, relative to their
+median, along a robust linear fit of the samples in measurement order, e.g. a
+device slowing down as it heats up.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# two-sided 95% quantiles of the t distribution for 1 to 30 degrees of freedom
+_T95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+# the modified z-score above which a sample is an outlier
+OUTLIER_THRESHOLD = 3.5
+
+
+class TimingStats(namedtuple("TimingStats", [
+        "mean", "results", "median", "std", "cv", "rel_ci",
+        "p10", "p90", "outliers", "drift", "converged"])):
+    """Statistics of the time costs of a function.
+
+    The first two fields are the ones of ProfileResult, so it can be used in
+    its place.
+
+    Parameters
+    ----------
+    mean : float
+        The mean of the costs, outliers excluded
+    results : tuple of float
+        All the costs in seconds, in measurement order
+    median : float
+        The median of the costs
+    std : float
+        The sample standard deviation of the costs, outliers excluded
+    cv : float
+        The coefficient of variation, std / mean
+    rel_ci : float
+        The half width of the 95% confidence interval of the mean, relative to the mean
+    p10 : float
+        The 10th percentile of the costs
+    p90 : float
+        The 90th percentile of the costs
+    outliers : tuple of int
+        The indices of the outliers in results
+    drift : float
+        The change of the costs from the first to the last one along their trend,
+        relative to the median
+    converged : bool
+        Whether the measurement reached its precision target
+    """
+    __slots__ = ()
+
+    @property
+    def inliers(self):
+        """The costs without the outliers, in measurement order"""
+        outliers = set(self.outliers)
+        return tuple(x for i, x in enumerate(self.results) if i not in outliers)
+
+
+def find_outliers(results, threshold=OUTLIER_THRESHOLD):
+    """Find the outliers of a list of costs by their modified z-score.
+
+    Parameters
+    ----------
+    results : list of float
+        The costs
+    threshold : float, optional
+        The modified z-score above which a cost is an outlier
+
+    Returns
+    -------
+    outliers : tuple of int
+        The indices of the outliers
+    """
+    arr = np.asarray(results, dtype="float64")
+    if arr.size < 3:
+        return ()
+    median = np.median(arr)
+    mad = np.median(np.abs(arr - median))
+    if mad == 0:
+        return ()
+    score = 0.6745 * np.abs(arr - median) / mad
+    return tuple(int(i) for i in np.nonzero(score > threshold)[0])
+
+
+def summarize(results, converged=False):
+    """Compute the statistics of a list of costs.
+
+    Parameters
+    ----------
+    results : list of float
+        The costs in seconds, in measurement order
+    converged : bool, optional
+        Whether the measurement reached its precision target
+
+    Returns
+    -------
+    stats : TimingStats
+        The statistics
+    """
+    results = tuple(float(x) for x in results)
+    arr = np.asarray(results, dtype="float64")
+    outliers = find_outliers(results)
+    inliers = np.delete(arr, outliers) if outliers else arr
+
+    num = inliers.size
+    mean = float(np.mean(inliers))
+    std = float(np.std(inliers, ddof=1)) if num > 1 else 0.0
+    cv = std / mean if mean > 0 else 0.0
+    if num > 1:
+        tval = _T95[num - 2] if num - 1 <= len(_T95) else 1.96
+        rel_ci = tval * cv / math.sqrt(num)
+    else:
+        rel_ci = float("inf")
+
+    median = float(np.median(arr))
+    drift = 0.0
+    if arr.size >= 4 and median > 0:
+        # Theil-Sen estimate of the slope: the median of the slopes of all pairs
+        first, second = np.triu_indices(arr.size, 1)
+        slope = np.median((arr[second] - arr[first]) / (second - first))
+        drift = float(slope) * (arr.size - 1) / median
+
+    return TimingStats(mean=mean, results=results, median=median, std=std, cv=cv,
+                       rel_ci=rel_ci, p10=float(np.percentile(arr, 10)),
+                       p90=float(np.percentile(arr, 90)), outliers=outliers,
+                       drift=drift, converged=converged)
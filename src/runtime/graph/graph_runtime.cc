@@ -34,6 +34,7 @@
 #include <memory>
 #include <numeric>
 #include <string>
+#include <unordered_map>
 #include <unordered_set>
 #include <utility>
 #include <vector>
@@ -128,6 +129,33 @@ void GraphRuntime::SetInputZeroCopy(int index, DLTensor* data_ref) {
     t->data = data_ref->data;
   }
 }
+/*!
+ * \brief set index-th output of the graph to be written to data_ref directly.
+ * \param index The output index.
+ * \param data_ref The output buffer that is referred.
+ */
+void GraphRuntime::SetOutputZeroCopy(int index, DLTensor* data_ref) {
+  CHECK_LT(static_cast<size_t>(index), outputs_.size());
+  CHECK(output_zero_copy_ok_[index])
+      << "Output " << index << " aliases an input or another entry and must be copied";
+  uint32_t eid = this->entry_id(outputs_[index]);
+  const DLTensor* old_t = data_entry_[eid].operator->();
+
+  // check the consistency of output
+  CHECK_EQ(data_alignment_[eid], details::GetDataAlignment(*data_ref));
+  CHECK_EQ(reinterpret_cast<size_t>(data_ref->data) % kAllocAlignment, 0);
+  CHECK_EQ(old_t->ndim, static_cast<size_t>(data_ref->ndim));
+  CHECK_EQ(old_t->ctx.device_type, data_ref->ctx.device_type);
+  CHECK_EQ(old_t->ctx.device_id, data_ref->ctx.device_id);
+  for (auto i = 0; i < data_ref->ndim; ++i) {
+    CHECK_EQ(old_t->shape[i], data_ref->shape[i]);
+  }
+
+  // Update the data pointer of every op argument that refers to the output
+  for (DLTensor* t : output_dltensors_[index]) {
+    t->data = data_ref->data;
+  }
+}
 /*!
  * \brief Get the number of outputs
  *
@@ -307,6 +335,19 @@ void GraphRuntime::SetupOpExecs() {
     uint32_t nid = input_nodes_[i];
     input_node_eids.insert(entry_id(nid, 0));
   }
+  // outputs that are graph inputs, params or produced by a nop that aliases its
+  // input cannot be redirected to an external buffer
+  output_dltensors_.resize(outputs_.size());
+  output_zero_copy_ok_.assign(outputs_.size(), true);
+  std::unordered_map<uint32_t, std::vector<size_t>> output_eids;
+  for (size_t i = 0; i < outputs_.size(); i++) {
+    uint32_t eid = this->entry_id(outputs_[i]);
+    output_eids[eid].push_back(i);
+    const auto& onode = nodes_[outputs_[i].node_id];
+    if (onode.op_type == "null" || onode.param.func_name == "__nop") {
+      output_zero_copy_ok_[i] = false;
+    }
+  }
 
   // setup the array and requirements.
   for (uint32_t nid = 0; nid < this->GetNumOfNodes(); ++nid) {
@@ -333,6 +374,21 @@ void GraphRuntime::SetupOpExecs() {
         input_dltensors_[eid].push_back(static_cast<DLTensor*>(op_args->arg_values[i].v_handle));
       }
     }
+    // collect the op arguments that read or write an output
+    size_t num_args = inode.inputs.size() + inode.param.num_outputs;
+    for (size_t i = 0; i < num_args; i++) {
+      uint32_t eid = i < inode.inputs.size()
+                         ? this->entry_id(inode.inputs[i])
+                         : this->entry_id(nid, static_cast<uint32_t>(i - inode.inputs.size()));
+      auto it = output_eids.find(eid);
+      if (it == output_eids.end()) continue;
+      for (size_t out_idx : it->second) {
+        output_dltensors_[out_idx].push_back(
+            static_cast<DLTensor*>(op_args->arg_values[i].v_handle));
+        // a nop reading the output aliases it with another entry
+        if (inode.param.func_name == "__nop") output_zero_copy_ok_[out_idx] = false;
+      }
+    }
   }
 }
 
@@ -406,6 +462,10 @@ PackedFunc GraphRuntime::GetFunction(const std::string& name,
         this->SetInputZeroCopy(args[0], args[1]);
       }
     });
+  } else if (name == "set_output_zero_copy") {
+    return PackedFunc([sptr_to_self, this](TVMArgs args, TVMRetValue* rv) {
+      this->SetOutputZeroCopy(args[0], args[1]);
+    });
   } else if (name == "get_output") {
     return PackedFunc([sptr_to_self, this](TVMArgs args, TVMRetValue* rv) {
       if (args.num_args == 2) {
@@ -118,6 +118,12 @@ class TVM_DLL GraphRuntime : public ModuleNode {
    * \param data_ref The input data that is referred.
    */
   void SetInputZeroCopy(int index, DLTensor* data_ref);
+  /*!
+   * \brief set index-th output of the graph to be written to data_ref directly.
+   * \param index The output index.
+   * \param data_ref The output buffer that is referred.
+   */
+  void SetOutputZeroCopy(int index, DLTensor* data_ref);
   /*!
    * \brief Get the number of outputs
    *
@@ -383,6 +389,10 @@ class TVM_DLL GraphRuntime : public ModuleNode {
   std::unordered_map<std::string, uint32_t> input_map_;
   /*! \brief Used for quick node input DLTensor* lookup given an input eid. */
   std::vector<std::vector<DLTensor*>> input_dltensors_;
+  /*! \brief The op argument DLTensor* that refer to each output. */
+  std::vector<std::vector<DLTensor*>> output_dltensors_;
+  /*! \brief Whether each output can be bound to an external buffer. */
+  std::vector<bool> output_zero_copy_ok_;
   /*! \brief Used for quick entry indexing. */
   std::vector<uint32_t> node_row_ptr_;
   /*! \brief Output entries. */
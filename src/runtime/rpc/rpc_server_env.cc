@@ -21,8 +21,14 @@
  * \file rpc_server_env.cc
  * \brief Server environment of the RPC.
  */
+#include <dmlc/logging.h>
 #include <tvm/runtime/registry.h>
 
+#include <algorithm>
+#include <cstdio>
+#include <string>
+#include <vector>
+
 #include "../file_util.h"
 
 namespace tvm {
@@ -52,6 +58,123 @@ TVM_REGISTER_GLOBAL("tvm.rpc.server.download").set_body([](TVMArgs args, TVMRetV
   *rv = arr;
 });
 
+/*!
+ * \brief Update the CRC-32 (IEEE 802.3, as zlib.crc32) of a byte sequence.
+ * \param crc The CRC-32 of the preceding bytes, 0 at the beginning.
+ * \param data The bytes.
+ * \param size The number of bytes.
+ * \return The CRC-32 of the preceding bytes followed by data.
+ */
+uint32_t RPCCrc32(uint32_t crc, const char* data, size_t size) {
+  static const std::vector<uint32_t> table = [] {
+    std::vector<uint32_t> t(256);
+    for (uint32_t i = 0; i < 256; ++i) {
+      uint32_t c = i;
+      for (int k = 0; k < 8; ++k) {
+        c = (c & 1) ? 0xEDB88320U ^ (c >> 1) : c >> 1;
+      }
+      t[i] = c;
+    }
+    return t;
+  }();
+  crc = ~crc;
+  for (size_t i = 0; i < size; ++i) {
+    crc = table[(crc ^ static_cast<uint8_t>(data[i])) & 0xFF] ^ (crc >> 8);
+  }
+  return ~crc;
+}
+
+// Get the size of a file, -1 if it does not exist.
+TVM_REGISTER_GLOBAL("tvm.rpc.server.file_size").set_body([](TVMArgs args, TVMRetValue* rv) {
+  std::string file_name = RPCGetPath(args[0]);
+  FILE* fp = fopen(file_name.c_str(), "rb");
+  if (fp == nullptr) {
+    *rv = static_cast<int64_t>(-1);
+    return;
+  }
+  fseek(fp, 0, SEEK_END);
+  *rv = static_cast<int64_t>(ftell(fp));
+  fclose(fp);
+});
+
+// Get the CRC-32 of the first nbytes of a file.
+TVM_REGISTER_GLOBAL("tvm.rpc.server.file_crc32").set_body([](TVMArgs args, TVMRetValue* rv) {
+  std::string file_name = RPCGetPath(args[0]);
+  int64_t nbytes = args[1];
+  FILE* fp = fopen(file_name.c_str(), "rb");
+  CHECK(fp != nullptr) << "Cannot open " << file_name;
+  std::string buf(1 << 20, '\0');
+  uint32_t crc = 0;
+  while (nbytes > 0) {
+    size_t nread = fread(&buf[0], 1, std::min<int64_t>(nbytes, buf.size()), fp);
+    if (nread == 0) break;
+    crc = RPCCrc32(crc, buf.data(), nread);
+    nbytes -= nread;
+  }
+  fclose(fp);
+  *rv = static_cast<int64_t>(crc);
+});
+
+// Write a chunk of a file at offset after checking its CRC-32,
+// a chunk at offset 0 creates or truncates the file.
+TVM_REGISTER_GLOBAL("tvm.rpc.server.upload_chunk").set_body([](TVMArgs args, TVMRetValue* rv) {
+  std::string file_name = RPCGetPath(args[0]);
+  int64_t offset = args[1];
+  std::string data = args[2];
+  int64_t crc = args[3];
+  CHECK_EQ(static_cast<int64_t>(RPCCrc32(0, data.data(), data.length())), crc)
+      << "Checksum mismatch of the chunk at " << offset << " of " << file_name;
+  FILE* fp = fopen(file_name.c_str(), offset == 0 ? "wb" : "r+b");
+  CHECK(fp != nullptr) << "Cannot open " << file_name;
+  CHECK_EQ(fseek(fp, offset, SEEK_SET), 0) << "Cannot seek to " << offset << " of " << file_name;
+  size_t nwrite = fwrite(data.data(), 1, data.length(), fp);
+  fclose(fp);
+  CHECK_EQ(nwrite, data.length()) << "Cannot write " << file_name;
+});
+
+// Read a chunk of at most nbytes of a file at offset.
+TVM_REGISTER_GLOBAL("tvm.rpc.server.download_chunk").set_body([](TVMArgs args, TVMRetValue* rv) {
+  std::string file_name = RPCGetPath(args[0]);
+  int64_t offset = args[1];
+  int64_t nbytes = args[2];
+  FILE* fp = fopen(file_name.c_str(), "rb");
+  CHECK(fp != nullptr) << "Cannot open " << file_name;
+  CHECK_EQ(fseek(fp, offset, SEEK_SET), 0) << "Cannot seek to " << offset << " of " << file_name;
+  std::string data(nbytes, '\0');
+  data.resize(fread(&data[0], 1, nbytes, fp));
+  fclose(fp);
+  TVMByteArray arr;
+  arr.data = data.c_str();
+  arr.size = data.length();
+  *rv = arr;
+});
+
+// Write several files packed into one blob after checking its CRC-32,
+// the blob is followed by the name and the number of bytes of each file.
+TVM_REGISTER_GLOBAL("tvm.rpc.server.upload_batch").set_body([](TVMArgs args, TVMRetValue* rv) {
+  std::string data = args[0];
+  int64_t crc = args[1];
+  CHECK_EQ(static_cast<int64_t>(RPCCrc32(0, data.data(), data.length())), crc)
+      << "Checksum mismatch of a batch of " << (args.size() - 2) / 2 << " files";
+  size_t offset = 0;
+  for (int i = 2; i + 1 < args.size(); i += 2) {
+    std::string file_name = RPCGetPath(args[i]);
+    int64_t nbytes = args[i + 1];
+    CHECK_LE(offset + nbytes, data.length()) << "Batch is too short for " << file_name;
+    SaveBinaryToFile(file_name, data.substr(offset, nbytes));
+    offset += nbytes;
+  }
+  CHECK_EQ(offset, data.length()) << "Batch has extra bytes";
+});
+
+TVM_REGISTER_GLOBAL("tvm.rpc.server.rename").set_body([](TVMArgs args, TVMRetValue* rv) {
+  std::string src = RPCGetPath(args[0]);
+  std::string dst = RPCGetPath(args[1]);
+  // rename does not replace an existing file on every platform
+  std::remove(dst.c_str());
+  CHECK_EQ(std::rename(src.c_str(), dst.c_str()), 0) << "Cannot rename " << src << " to " << dst;
+});
+
 TVM_REGISTER_GLOBAL("tvm.rpc.server.remove").set_body([](TVMArgs args, TVMRetValue* rv) {
   std::string file_name = RPCGetPath(args[0]);
   RemoveFile(file_name);
@@ -60,8 +60,18 @@ class ThreadGroup::Impl {
     }
   }
 
-  int Configure(AffinityMode mode, int nthreads, bool exclude_worker0) {
+  int Configure(AffinityMode mode, int nthreads, bool exclude_worker0,
+                const std::vector<unsigned int>& cpus) {
     int num_workers_used = 0;
+    if (!cpus.empty()) {
+      num_workers_used = nthreads ? nthreads : static_cast<int>(cpus.size());
+      num_workers_used = std::min(num_workers_, num_workers_used);
+      const char* val = getenv("TVM_BIND_THREADS");
+      if (val == nullptr || atoi(val) == 1) {
+        SetAffinityToCpus(cpus, exclude_worker0);
+      }
+      return num_workers_used;
+    }
     if (mode == kLittle) {
       num_workers_used = little_count_;
     } else if (mode == kBig) {
@@ -140,6 +150,32 @@ class ThreadGroup::Impl {
 #endif
   }
 
+  // bind worker threads to the given cores round robin,
+  // the master thread can migrate among all of them.
+  void SetAffinityToCpus(const std::vector<unsigned int>& cpus, bool exclude_worker0) {
+#if defined(__linux__) || defined(__ANDROID__)
+    cpu_set_t cpuset;
+    for (unsigned i = 0; i < threads_.size(); ++i) {
+      CPU_ZERO(&cpuset);
+      CPU_SET(cpus[(i + exclude_worker0) % cpus.size()], &cpuset);
+#if defined(__ANDROID__)
+      sched_setaffinity(threads_[i].native_handle(), sizeof(cpu_set_t), &cpuset);
+#else
+      pthread_setaffinity_np(threads_[i].native_handle(), sizeof(cpu_set_t), &cpuset);
+#endif
+    }
+    CPU_ZERO(&cpuset);
+    for (unsigned int cpu : cpus) {
+      CPU_SET(cpu, &cpuset);
+    }
+#if defined(__ANDROID__)
+    sched_setaffinity(pthread_self(), sizeof(cpu_set_t), &cpuset);
+#else
+    pthread_setaffinity_np(pthread_self(), sizeof(cpu_set_t), &cpuset);
+#endif
+#endif
+  }
+
   void SetMasterThreadFullCpuAffinity(bool reverse) {
 #if defined(__linux__) || defined(__ANDROID__)
     cpu_set_t cpuset;
@@ -231,8 +267,9 @@ ThreadGroup::ThreadGroup(int num_workers, std::function<void(int)> worker_callba
 ThreadGroup::~ThreadGroup() { delete impl_; }
 void ThreadGroup::Join() { impl_->Join(); }
 
-int ThreadGroup::Configure(AffinityMode mode, int nthreads, bool exclude_worker0) {
-  return impl_->Configure(mode, nthreads, exclude_worker0);
+int ThreadGroup::Configure(AffinityMode mode, int nthreads, bool exclude_worker0,
+                           const std::vector<unsigned int>& cpus) {
+  return impl_->Configure(mode, nthreads, exclude_worker0, cpus);
 }
 
 void Yield() { std::this_thread::yield(); }
@@ -0,0 +1,99 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Test the compile cache"""
+import ctypes
+import os
+import sys
+import threading
+
+from tvm.contrib import cc, compile_cache, util
+
+
+def test_compile_cache():
+    if not sys.platform.startswith("linux"):
+        return
+    temp = util.tempdir()
+    cache = compile_cache.enable(temp.relpath("cache"), max_size=None)
+    try:
+        def build(value, index):
+            with open(temp.relpath("value.h"), "w") as f:
+                f.write("#define VALUE %d\n" % value)
+            src = temp.relpath("add%d.cc" % index)
+            with open(src, "w") as f:
+                f.write('#include "value.h"\nextern "C" int get() { return VALUE; }\n')
+            obj = temp.relpath("add%d.o" % index)
+            cc.create_object(obj, src, ["-I" + temp.temp_dir])
+            lib = temp.relpath("add%d.so" % index)
+            cc.create_shared(lib, [obj])
+            return ctypes.CDLL(lib).get()
+
+        assert build(1, 0) == 1
+        assert cache.stats() == {"hits": 0, "misses": 2, "evictions": 0, "hit_rate": 0.0}
+        # the same source in another file
+        assert build(1, 1) == 1
+        assert cache.stats()["hits"] == 2
+        # a change of an included header is a miss
+        assert build(2, 2) == 2
+        assert cache.stats()["misses"] == 4
+        assert cache.stats(shared=True)["hits"] == 2
+        assert cache.size()[0] == 4
+
+        # least recently used entries are evicted
+        cache.max_size = cache.size()[1] - 1
+        cache.evict()
+        assert cache.size()[0] < 4
+        assert cache.stats()["evictions"] > 0
+        assert build(2, 3) == 2
+    finally:
+        compile_cache.disable()
+    assert compile_cache.current() is None
+
+
+def test_compile_cache_threads():
+    temp = util.tempdir()
+    cache = compile_cache.CompileCache(temp.relpath("cache"), max_size=1 << 30)
+    key = cache.key("output")
+    built = []
+
+    def build(index):
+        output = temp.relpath("out%d" % index)
+        def _func():
+            built.append(index)
+            with open(output, "w") as f:
+                f.write("output")
+        cache.build(key, ".o", output, _func)
+
+    # threads of a process building the same key wait for the first one
+    threads = [threading.Thread(target=build, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert cache.stats(shared=True)["hits"] == 7
+
+    # eviction compacts the stats file without losing counts
+    cache.evict()
+    assert not os.path.exists(os.path.join(cache.cache_dir, cache.STATS_FILE))
+    assert cache.stats(shared=True)["hits"] == 7
+    cache.reset_stats()
+    assert cache.stats(shared=True)["hits"] == 0
+
+
+if __name__ == "__main__":
+    test_compile_cache()
+    test_compile_cache_threads()
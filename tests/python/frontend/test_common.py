@@ -14,6 +14,11 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+import numpy as np
+
+import tvm
+from tvm import relay
+from tvm.relay.frontend import common
 from tvm.relay.frontend.common import StrAttrsDict
 
 
@@ -27,6 +32,46 @@ def test_key_is_not_present():
     assert not attrs.has_attr("b")
 
 
+def test_infer_value_cache():
+    common.clear_infer_value_cache()
+    x = relay.var("x", shape=(2, 3))
+    y = relay.var("y", shape=(2, 3))
+    params = {"x": tvm.nd.array(np.ones((2, 3), "float32")),
+              "y": tvm.nd.array(np.full((2, 3), 2, "float32"))}
+    out = common.infer_value(x + y, params)
+    np.testing.assert_allclose(out.asnumpy(), np.full((2, 3), 3))
+    assert common.infer_value(x + y, params) is out
+
+    # new param values are a different entry
+    params["y"] = tvm.nd.array(np.zeros((2, 3), "float32"))
+    out = common.infer_value(x + y, params)
+    np.testing.assert_allclose(out.asnumpy(), np.ones((2, 3)))
+
+    # entries are keyed by the param values and only hold the results
+    params["y"] = tvm.nd.array(np.zeros((2, 3), "float32"))
+    assert common.infer_value(x + y, params) is out
+    assert len(common._INFER_VALUE_CACHE) == 2
+    assert all(isinstance(v, tvm.nd.NDArray) for v in common._INFER_VALUE_CACHE.values())
+
+    # evaluations with a module or large params are not cached
+    mod = tvm.IRModule()
+    assert common.infer_value(x + y, params, mod) is not out
+    z = relay.var("z", shape=(256, 256))
+    common.infer_value(z + z, {"z": tvm.nd.array(np.ones((256, 256), "float32"))})
+    assert len(common._INFER_VALUE_CACHE) == 2
+
+
+def test_infer_value_shape_arithmetic():
+    x = relay.var("x", shape=(4, 5))
+    # only the shape of x is needed, no dummy input is created
+    params = {}
+    out = common.infer_value_simulated(relay.shape_of(x) * relay.const(2, "int32"), params)
+    np.testing.assert_array_equal(out.asnumpy(), [8, 10])
+    assert not params
+
+
 if __name__ == '__main__':
     test_key_is_present()
     test_key_is_present()
+    test_infer_value_cache()
+    test_infer_value_shape_arithmetic()
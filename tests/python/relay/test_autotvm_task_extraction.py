@@ -15,6 +15,9 @@
 # specific language governing permissions and limitations
 # under the License.
 """Test task extraction for autotvm"""
+import os
+import tempfile
+
 import tvm.relay.testing
 from tvm import relay
 from tvm import autotvm
@@ -97,5 +100,43 @@ def test_task_extraction():
                                                        ops=(conv2d,))
     assert len(tasks) == 31
 
+def test_task_extraction_parallel_cache():
+    target = 'llvm'
+    conv2d = relay.op.get("nn.conv2d")
+    mods, params = [], []
+    for name in ['resnet-18', 'mobilenet']:
+        mod, param, _ = get_network(name, batch_size=1)
+        mods.append(mod)
+        params.append(param)
+
+    def _keys(tasks):
+        return [(t.name, t.args) for t in tasks]
+
+    serial = autotvm.task.extract_from_multiple_program(mods, params, target=target,
+                                                        ops=(conv2d,))
+    parallel = autotvm.task.extract_from_multiple_program(mods, params, target=target,
+                                                          ops=(conv2d,), n_parallel=2)
+    assert _keys(serial) == _keys(parallel)
+
+    cache_dir = tempfile.mkdtemp()
+    tasks = autotvm.task.extract_from_multiple_program(mods, params, target=target,
+                                                       ops=(conv2d,), cache_dir=cache_dir)
+    assert _keys(tasks) == _keys(serial)
+    assert len(os.listdir(cache_dir)) == 2
+
+    # a cache hit does not lower the program again
+    tasks = autotvm.task.extract_from_multiple_program(mods, params, target=target,
+                                                       ops=(conv2d,), cache_dir=cache_dir)
+    assert _keys(tasks) == _keys(serial)
+    assert len(os.listdir(cache_dir)) == 2
+
+    # different ops use different cache entries
+    dense = relay.op.get("nn.dense")
+    tasks = autotvm.task.extract_from_program(mods[0], params[0], target=target,
+                                              ops=(dense,), cache_dir=cache_dir)
+    assert len(tasks) == 1
+    assert len(os.listdir(cache_dir)) == 3
+
 if __name__ == '__main__':
     test_task_extraction()
+    test_task_extraction_parallel_cache()
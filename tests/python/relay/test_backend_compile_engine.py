@@ -146,6 +146,44 @@ def test_select_implementation():
                 impl, _ = _select_impl((1, 16, 7, 7), (32, 16, 3, 3), True)
                 assert impl.name == "conv2d_1"
 
+def test_select_implementation_cache():
+    target = tvm.target.create("llvm")
+    compile_engine = relay.backend.compile_engine
+
+    def _select_impl(dshape, wshape):
+        data = relay.var("data", shape=dshape)
+        weight = relay.var("wshape", shape=wshape)
+        out = relay.nn.conv2d(data, weight, padding=(1, 1))
+        out = run_infer_type(out)
+        return compile_engine.select_implementation(
+            relay.op.get("nn.conv2d"),
+            out.attrs,
+            [te.placeholder(dshape), te.placeholder(wshape)],
+            out.checked_type,
+            target)
+
+    with TempOpAttr("nn.conv2d", "FTVMStrategy", _tmp_strategy):
+        compile_engine.clear_select_implementation_cache()
+        records = [_create_record("test/conv2d_1", (1, 8, 7, 7), (32, 8, 3, 3), target, 0.5)]
+        with target:
+            with autotvm.apply_history_best(records) as dispatch_ctx:
+                for _ in range(3):
+                    impl, _ = _select_impl((1, 8, 7, 7), (32, 8, 3, 3))
+                    assert impl.name == "conv2d_1"
+                assert compile_engine.select_implementation_stats() == {"hit": 2, "miss": 1}
+
+                # loading more records invalidates the cached selections
+                dispatch_ctx.load([_create_record("test/conv2d_2", (1, 8, 7, 7), (32, 8, 3, 3),
+                                                  target, 0.2)])
+                impl, _ = _select_impl((1, 8, 7, 7), (32, 8, 3, 3))
+                assert impl.name == "conv2d_2"
+                assert compile_engine.select_implementation_stats() == {"hit": 2, "miss": 2}
+
+                # different shapes are different entries
+                impl, _ = _select_impl((1, 16, 7, 7), (32, 16, 3, 3))
+                assert impl.name == "conv2d_3"
+                assert compile_engine.select_implementation_stats() == {"hit": 2, "miss": 3}
+
 def test_compile_engine():
     engine = relay.backend.compile_engine.get()
     def get_func(shape):
@@ -237,6 +275,7 @@ def test_compile_nhwc_pack():
 if __name__ == "__main__":
     test_get_valid_implementations()
     test_select_implementation()
+    test_select_implementation_cache()
     test_compile_engine()
     test_compile_placeholder_bypass()
     test_compile_injective_with_tuple()
@@ -0,0 +1,108 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Test the on-disk cache of relay.build"""
+import os
+
+import numpy as np
+
+import tvm
+from tvm import relay, autotvm, te
+from tvm.contrib import graph_runtime, util
+
+
+def _get_module(n=10):
+    x = relay.var('x', shape=(n, 5))
+    y = relay.var('y', shape=(1, 5))
+    func = relay.Function([x, y], relay.exp(relay.add(x, y)))
+    return tvm.IRModule.from_expr(func)
+
+
+def _get_dense_module():
+    x = relay.var('x', shape=(1, 16))
+    w = relay.var('w', shape=(16, 16))
+    return tvm.IRModule.from_expr(relay.Function([x, w], relay.nn.dense(x, w)))
+
+
+def _run(graph, lib, params, x_data):
+    mod = graph_runtime.create(graph, lib, ctx=tvm.cpu(0))
+    mod.set_input(**params)
+    mod.set_input(x=x_data)
+    mod.run()
+    return mod.get_output(0).asnumpy()
+
+
+def _create_records(target):
+    args = [te.placeholder((1, 16)), te.placeholder((16, 16)), None, 'float32']
+    task = autotvm.task.create("dense_nopack.x86", args, target)
+    inp = autotvm.MeasureInput(target=target, task=task, config=task.config_space.get(0))
+    result = autotvm.MeasureResult(costs=(1.0,), error_no=0, all_cost=-1, timestamp=-1)
+    return [(inp, result)]
+
+
+def _entries(cache_dir):
+    return [x for x in os.listdir(cache_dir) if not x.startswith(".")]
+
+
+def test_build_cache():
+    cache_dir = util.tempdir().temp_dir
+    x_data = np.random.rand(10, 5).astype('float32')
+    y_data = np.random.rand(1, 5).astype('float32')
+    params = {"y": y_data}
+
+    graph, lib, out_params = relay.build(_get_module(), "llvm", params=params, cache=cache_dir)
+    assert len(_entries(cache_dir)) == 1
+    ref_res = _run(graph, lib, out_params, x_data)
+    tvm.testing.assert_allclose(ref_res, np.exp(x_data + y_data), rtol=1e-5)
+
+    # hit
+    graph, lib, out_params = relay.build(_get_module(), "llvm", params=params, cache=cache_dir)
+    assert len(_entries(cache_dir)) == 1
+    tvm.testing.assert_allclose(_run(graph, lib, out_params, x_data), ref_res, rtol=1e-5)
+
+    # different parameter values, opt levels and dispatch contexts are different builds
+    relay.build(_get_module(), "llvm", params={"y": y_data + 1}, cache=cache_dir)
+    assert len(_entries(cache_dir)) == 2
+    with tvm.transform.PassContext(opt_level=1):
+        relay.build(_get_module(), "llvm", params=params, cache=cache_dir)
+    assert len(_entries(cache_dir)) == 3
+    # the records are queried by the dense of the module
+    relay.build(_get_dense_module(), "llvm", cache=cache_dir)
+    assert len(_entries(cache_dir)) == 4
+    with autotvm.ApplyHistoryBest(_create_records(tvm.target.create("llvm"))):
+        relay.build(_get_dense_module(), "llvm", cache=cache_dir)
+    assert len(_entries(cache_dir)) == 5
+
+    # a library that cannot be exported is returned without being cached
+    class _BrokenLib(object):
+        def export_library(self, path):
+            raise RuntimeError("cannot link")
+    assert not relay.BuildCache(cache_dir).save("broken", "{}", _BrokenLib(), {})
+    assert len(_entries(cache_dir)) == 5
+
+    # eviction keeps the newest entry
+    cache = relay.BuildCache(cache_dir, max_size=1)
+    relay.build(_get_module(20), "llvm", params=params, cache=cache)
+    assert len(_entries(cache_dir)) == 1
+    target = relay.build_module._update_target("llvm")
+    # relay.build computes the key under the tophub context
+    with autotvm.tophub.context(list(target.values())):
+        key = cache.key(_get_module(20), target, None, params)
+    assert _entries(cache_dir) == [key]
+
+
+if __name__ == "__main__":
+    test_build_cache()
@@ -53,6 +53,47 @@ def test_ndarray_reflection():
     np.testing.assert_equal(deser_param_dict['x'].asnumpy(), deser_param_dict['y'].asnumpy())
 
 
+def test_save_load_mmap():
+    params = {"x": np.random.uniform(size=(10, 2)).astype("float32"),
+              "y": tvm.nd.array(np.arange(6).astype("int64").reshape(1, 2, 3)),
+              "z": np.ones((3,)).astype("int8")}
+    temp = util.tempdir()
+    relay.save_param_mmap(params, temp.relpath("a.params"))
+    # convert from bytes and from a file
+    param_bytes = relay.save_param_dict(params)
+    relay.convert_param_dict(param_bytes, temp.relpath("b.params"))
+    with open(temp.relpath("c.bin"), "wb") as fo:
+        fo.write(param_bytes)
+    relay.convert_param_dict(temp.relpath("c.bin"), temp.relpath("c.params"))
+
+    for name in ["a.params", "b.params", "c.params"]:
+        param2 = relay.load_param_mmap(temp.relpath(name))
+        assert len(param2) == 3
+        for k, v in params.items():
+            v = v.asnumpy() if isinstance(v, tvm.nd.NDArray) else v
+            assert param2[k].dtype == v.dtype
+            assert param2[k].ctypes.data % relay.param_dict.MMAP_ALIGNMENT == 0
+            assert not param2[k].flags["WRITEABLE"]
+            np.testing.assert_equal(param2[k], v)
+
+
+def test_graph_runtime_load_params_mmap():
+    x = relay.var("x", shape=(4, 8))
+    w = relay.var("w", shape=(4, 8))
+    func = relay.Function([x, w], relay.add(x, w))
+    graph, lib, _ = relay.build(tvm.IRModule.from_expr(func), target="llvm")
+
+    w_np = np.random.uniform(size=(4, 8)).astype("float32")
+    x_np = np.random.uniform(size=(4, 8)).astype("float32")
+    temp = util.tempdir()
+    relay.save_param_mmap({"w": w_np}, temp.relpath("deploy.params"))
+
+    mod = graph_runtime.create(graph, lib, tvm.cpu(0))
+    mod.load_params_mmap(temp.relpath("deploy.params"))
+    mod.run(x=x_np)
+    np.testing.assert_allclose(mod.get_output(0).asnumpy(), x_np + w_np)
+
+
 def test_bigendian_rpc_param():
     """Test big endian rpc when there is a PowerPC RPC server available"""
     host = os.environ.get("TVM_POWERPC_TEST_HOST", None)
@@ -92,4 +133,6 @@ def test_bigendian_rpc_param():
 if __name__ == "__main__":
     test_save_load()
     test_ndarray_reflection()
+    test_save_load_mmap()
+    test_graph_runtime_load_params_mmap()
     test_bigendian_rpc_param()
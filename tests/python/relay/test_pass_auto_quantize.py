@@ -103,9 +103,32 @@ def test_calibrate_memory_bound():
         relay.quantize.quantize(mod, params, dataset)
 
 
+def test_calibrate_stream():
+    mod, params = testing.resnet.get_workload(num_layers=18)
+    dataset = get_calibration_dataset("data")
+    with relay.quantize.qconfig(calibrate_mode="kl_divergence_stream"):
+        relay.quantize.quantize(mod, params, dataset)
+
+
+def test_streaming_histogram():
+    from tvm.relay.quantize.kl_divergence import _StreamingHistogram
+    hist = _StreamingHistogram(num_bins=101)
+    data = [np.zeros(10), np.random.randn(1000) * 0.1,
+            np.random.randn(1000), np.random.randn(1000) * 50]
+    for arr in data:
+        hist.update(arr)
+    data = np.concatenate(data)
+    assert hist.thres >= np.abs(data).max()
+    ref, _ = np.histogram(data, bins=101, range=(-hist.thres, hist.thres))
+    np.testing.assert_array_equal(hist.hist, ref)
+    assert hist.min_val == data.min()
+
+
 if __name__ == "__main__":
     test_mul_rewrite()
     test_batch_flatten_rewrite()
     test_calibrate_target(False)
     test_calibrate_target(True)
     test_calibrate_memory_bound()
+    test_calibrate_stream()
+    test_streaming_histogram()
@@ -17,11 +17,15 @@
 """Test database"""
 import copy
 import logging
+import os
+import tempfile
+import threading
 
+from tvm import autotvm
 from tvm.autotvm import database
 from tvm.autotvm.record import encode, MeasureResult
 
-from test_autotvm_common import get_sample_records
+from test_autotvm_common import DummyRunner, get_sample_records, get_sample_task
 
 def test_save_load():
     logging.info("test basic db load/save ...")
@@ -110,9 +114,86 @@ def test_db_filter():
     records = _db.filter(lambda inp, ress: any(r.costs[0] <= 2 for r in ress))
     assert len(records) == 2
 
+def test_sqlite_db():
+    logging.info("test sqlite db ...")
+    records = get_sample_records(5)
+    path = os.path.join(tempfile.mkdtemp(), "records.db")
+    _db = database.SQLiteDatabase(path)
+    for inp, result in records[:4]:
+        _db.save(inp, result)
+    # the same measurement is saved only once
+    _db.save(*records[0], extend=True)
+    _db.save_batch(records[:2])
+    assert len(_db) == 4
+
+    # another instance sees the records
+    _db = database.SQLiteDatabase(path)
+    inp, res = records[0]
+    assert encode(inp, _db.load(inp)) == encode(inp, res)
+    assert _db.load(records[4][0]) is None
+    res2 = MeasureResult((0.5,), 0, 0, res.timestamp + 1)
+    _db.save(inp, res2, extend=True)
+    assert _db.load(inp).timestamp == res2.timestamp
+    assert len(_db.load(inp, get_all=True)) == 2
+
+    best = _db.load_best(target=inp.target, task_name=inp.task.name,
+                         workload=inp.task.workload, k=2)
+    assert [r.costs[0] for _, r in best] == [0.5, 1]
+    assert len(_db.filter(lambda inp, ress: any(r.costs[0] <= 2 for r in ress))) == 2
+
+    partial_results, unsaved = database.filter_inputs(_db, [inp for inp, _ in records])
+    assert [r is None for r in partial_results] == [False] * 4 + [True]
+    assert unsaved == [records[4][0]]
+
+    # concurrent writers
+    def _save(i):
+        _db.save(records[4][0], MeasureResult((i,), 0, 0, float(i)), extend=True)
+    threads = [threading.Thread(target=_save, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(_db.load(records[4][0], get_all=True)) == 8
+
+class CountingRunner(DummyRunner):
+    """A DummyRunner recording the indices of the configs it measures"""
+    def __init__(self):
+        super(CountingRunner, self).__init__()
+        self.measured = []
+
+    def run(self, measure_inputs, build_results):
+        self.measured.extend(inp.config.index for inp in measure_inputs)
+        return super(CountingRunner, self).run(measure_inputs, build_results)
+
+def test_sqlite_db_tune():
+    logging.info("test tuning with sqlite db ...")
+    task, _ = get_sample_task()
+    runner = CountingRunner()
+    measure_option = autotvm.measure_option(builder=autotvm.LocalBuilder(), runner=runner)
+    _db = database.SQLiteDatabase(os.path.join(tempfile.mkdtemp(), "records.db"))
+
+    tuner = autotvm.tuner.GridSearchTuner(task)
+    tuner.tune(n_trial=8, measure_option=measure_option, database=_db)
+    assert len(_db) == 8
+    assert sorted(runner.measured) == list(range(8))
+    saved = [inp.config.index for inp, _ in _db.filter(lambda inp, ress: True)]
+
+    # the configs measured before are not measured again
+    runner.measured = []
+    measured = []
+    tuner = autotvm.tuner.GridSearchTuner(task)
+    tuner.tune(n_trial=12, measure_option=measure_option, database=_db,
+               callbacks=[lambda _, inputs, results: measured.extend(results)])
+    assert len(measured) == 12
+    assert sorted(runner.measured) == list(range(8, 12))
+    assert len(_db) == 12
+    assert sorted(saved) == list(range(8))
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
     test_save_load()
     test_db_hash()
     test_db_latest_all()
     test_db_filter()
+    test_sqlite_db()
+    test_sqlite_db_tune()
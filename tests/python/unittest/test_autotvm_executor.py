@@ -15,9 +15,10 @@
 # specific language governing permissions and limitations
 # under the License.
 """Test local executor"""
+import os
 import time
 
-from tvm.autotvm.measure import LocalExecutor, executor
+from tvm.autotvm.measure import LocalExecutor, LocalPoolExecutor, executor
 
 def slow(n):
     r = 0
@@ -58,6 +59,26 @@ def test_timeout():
     res = f1.get()
     assert isinstance(res, executor.TimeoutError)
 
+def crash_job(n):
+    os._exit(n)
+
+def test_pool_executor():
+    ex = LocalPoolExecutor(2, timeout=0.5, max_jobs_per_worker=2)
+
+    futures = [ex.submit(fast, n) for n in range(6)]
+    futures.append(ex.submit(timeout_job, 0.5))
+    futures.append(ex.submit(crash_job, 1))
+    futures.append(ex.submit(fast, 10))
+    done = list(ex.as_completed(futures))
+    assert len(done) == len(futures)
+
+    assert [f.get() for f in futures[:6]] == [fast(n) for n in range(6)]
+    assert isinstance(futures[6].get(), executor.TimeoutError)
+    assert isinstance(futures[7].get(), executor.ExecutionError)
+    assert futures[8].get() == fast(10)
+    ex.shutdown()
+
 if __name__ == "__main__":
     test_local_measure_async()
     test_timeout()
+    test_pool_executor()
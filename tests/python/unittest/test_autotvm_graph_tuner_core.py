@@ -200,6 +200,76 @@ def test_DPTuner_run():
     assert os.path.isfile(log_file), "No log file with name %s exists." % log_file
 
 
+def test_DPTuner_prune_candidates():
+    target = "llvm"
+    dtype = "float32"
+    layout = "NCHW"
+    dshape = (1, 3, 8, 8)
+    conv2d = relay.op.get("nn.conv2d")
+    target_ops = [conv2d]
+
+    g, records, ltf_records, ltf_keys, tasks = _create_data(target, dshape, dtype, layout)
+    mod = tvm.IRModule()
+    mod["main"] = g
+    costs = [0.02, 0.02, 0.045, 1.0]
+    config_list = []
+    cfg_dict = {"index": -1,
+                "code_hash": None,
+                "entity": [["tile_ic", "sp", [1, 3]],
+                           ["tile_oc", "sp", [2, 8]],
+                           ["tile_ow", "sp", [4, 2]],
+                           ["unroll_kw", "ot", True]]}
+    config_list.append(ConfigEntity.from_json_dict(cfg_dict))
+    cfg_dict = {"index": -1,
+                "code_hash": None,
+                "entity": [["tile_ic", "sp", [4, 4]],
+                           ["tile_oc", "sp", [2, 16]],
+                           ["tile_oh", "ot", 1],
+                           ["tile_ow", "sp", [4, 2]]]}
+    config_list.append(ConfigEntity.from_json_dict(cfg_dict))
+    cfg_dict = {"index": -1,
+                "code_hash": None,
+                "entity": [["tile_ic", "sp", [16, 2]],
+                           ["tile_oc", "sp", [8, 4]],
+                           ["tile_ow", "sp", [2, 4]],
+                           ["unroll_kw", "ot", False]]}
+    config_list.append(ConfigEntity.from_json_dict(cfg_dict))
+    # a much slower schedule of the first conv2d with the layouts of the first config,
+    # so it is dominated by it
+    cfg_dict = {"index": -1,
+                "code_hash": None,
+                "entity": [["tile_ic", "sp", [1, 3]],
+                           ["tile_oc", "sp", [2, 8]],
+                           ["tile_ow", "sp", [2, 4]],
+                           ["unroll_kw", "ot", False]]}
+    config_list.append(ConfigEntity.from_json_dict(cfg_dict))
+    for cost, config, task in zip(costs, config_list, tasks + tasks[:1]):
+        ms_input = MeasureInput(target=target, task=task, config=config)
+        ms_output = MeasureResult(costs=(cost,), error_no=0, all_cost=-1, timestamp=-1)
+        records.append((ms_input, ms_output))
+
+    executor = DPTuner(mod, {"data": dshape}, records, target_ops, target)
+    executor.benchmark_layout_transform(layout_records=ltf_records, infer_layout=True)
+    executor.run(prune_candidates=False)
+    expected_out = [record[0].config for record in executor.get_optimal_records()]
+    num_states, num_unpruned_states = executor.num_states
+    assert num_unpruned_states is None
+
+    executor = DPTuner(mod, {"data": dshape}, records, target_ops, target)
+    executor.benchmark_layout_transform(layout_records=ltf_records, infer_layout=True)
+    executor.run()
+    out = [record[0].config for record in executor.get_optimal_records()]
+    assert expected_out == out, "Output mismatch: expecting %s but got %s" \
+                                % (str(expected_out), str(out))
+    pruned_num_states, num_unpruned_states = executor.num_states
+    assert num_unpruned_states == num_states
+    assert pruned_num_states < num_states
+    # the slow schedule is removed
+    for node_entry in executor._node_list:
+        for record in node_entry.get("record_candidates", []):
+            assert record[1].costs[0] != costs[-1]
+
+
 def test_PBQPTuner_run():
     target = "llvm"
     dtype = "float32"
@@ -557,6 +627,7 @@ def test_triangle_block():
 if __name__=="__main__":
     test_graph_tuner_layout_transform()
     test_DPTuner_run()
+    test_DPTuner_prune_candidates()
     test_PBQPTuner_run()
     test_many_sub_graphs()
     test_tuple()
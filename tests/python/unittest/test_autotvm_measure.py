@@ -46,6 +46,107 @@ def test_task_tuner_without_measurement():
         tuner.tune(n_trial=10, measure_option=measure_option)
         assert tuner.best_flops > 1
 
+def test_pipelined_tuning():
+    """test tuning with building and measuring pipelined"""
+    task, _ = get_sample_task()
+
+    measure_option = autotvm.measure_option(
+        builder=autotvm.LocalBuilder(n_parallel=2, use_worker_pool=True),
+        runner=DummyRunner()
+    )
+
+    measured = []
+    def _callback(tuner, measure_inputs, measure_results):
+        measured.extend(str(inp.config) for inp in measure_inputs)
+
+    tuner = autotvm.tuner.RandomTuner(task)
+    tuner.tune(n_trial=10, measure_option=measure_option, pipeline=True,
+               callbacks=[_callback])
+    assert tuner.best_flops > 1
+    assert len(measured) == 10 and len(set(measured)) == 10
+    assert tuner.pipeline_stats["wall_time"] > 0
+
+    # a failing callback leaves no tuning state behind
+    def _failing_callback(tuner, measure_inputs, measure_results):
+        raise ValueError("callback failed")
+
+    tuner = autotvm.tuner.RandomTuner(task)
+    try:
+        tuner.tune(n_trial=10, measure_option=measure_option, pipeline=True,
+                   callbacks=[_failing_callback])
+        assert False
+    except ValueError:
+        pass
+    assert not autotvm.GLOBAL_SCOPE.in_tuning
+
+def test_num_free_devices():
+    """test reusing the number of free devices queried from the tracker"""
+    task, _ = get_sample_task()
+
+    runner = autotvm.LocalRunner()
+    server, tracker = runner.set_task(task)
+    num = runner.get_num_free_devices()
+    assert num is not None
+    tracker.terminate()
+    server.terminate()
+    # the tracker is not connected again for every batch
+    assert runner.get_num_free_devices() == num
+
+def test_task_scheduler():
+    """test tuning multiple tasks with the task scheduler"""
+    tasks = [get_sample_task(n)[0] for n in (32, 64)]
+
+    measure_option = autotvm.measure_option(
+        builder=autotvm.LocalBuilder(),
+        runner=DummyRunner()
+    )
+
+    scheduler = autotvm.tuner.TaskScheduler(tasks, task_weights=[1, 3], tuner='random',
+                                            trials_per_round=4)
+    scheduler.tune(n_trial=20, measure_option=measure_option)
+    assert sum(scheduler.task_trials) == 20
+    assert all(x > 0 for x in scheduler.task_trials)
+    assert len(scheduler.history) == 5
+    assert scheduler.history[-1][1] < float('inf')
+
+def test_persistent_session():
+    """test measuring a batch on one leased session"""
+    task, target = get_sample_task()
+
+    measure_option = autotvm.measure_option(
+        builder=autotvm.LocalBuilder(),
+        runner=autotvm.LocalRunner(check_correctness=True, persistent_session=True)
+    )
+
+    results = []
+    def _callback(_, measure_inputs, measure_results):
+        results.extend(measure_results)
+
+    tuner = autotvm.tuner.RandomTuner(task)
+    tuner.tune(n_trial=8, measure_option=measure_option, callbacks=[_callback])
+    assert len(results) == 8
+    assert all(res.error_no == 0 for res in results)
+
+def test_adaptive_measure():
+    """test reporting the costs of adaptive measurements"""
+    task, target = get_sample_task()
+
+    measure_option = autotvm.measure_option(
+        builder=autotvm.LocalBuilder(),
+        runner=autotvm.LocalRunner(repeat=3, adaptive={"target": 0.05, "max_time_ms": 500})
+    )
+
+    results = []
+    def _callback(_, measure_inputs, measure_results):
+        results.extend(measure_results)
+
+    tuner = autotvm.tuner.RandomTuner(task)
+    tuner.tune(n_trial=4, measure_option=measure_option, callbacks=[_callback])
+    assert len(results) == 4
+    for res in results:
+        assert res.error_no == 0
+        assert len(res.costs) >= 3 and all(x > 0 for x in res.costs)
+
 def test_check_correctness():
     task, target = get_sample_task()
 
@@ -80,4 +181,9 @@ if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
 
     test_task_tuner_without_measurement()
+    test_pipelined_tuning()
+    test_num_free_devices()
+    test_task_scheduler()
+    test_persistent_session()
+    test_adaptive_measure()
     test_check_correctness()
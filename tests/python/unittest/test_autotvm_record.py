@@ -15,6 +15,7 @@
 # specific language governing permissions and limitations
 # under the License.
 """test the correctness of dump and load of data log"""
+import os
 import time
 
 import tvm
@@ -24,6 +25,9 @@ from tvm.contrib import util
 from tvm import autotvm
 from tvm.autotvm.measure import MeasureInput, MeasureResult, MeasureErrorNo
 from tvm.autotvm.record import encode, decode, ApplyHistoryBest, measure_str_key
+from tvm.autotvm.binary_record import BinaryRecordStore, convert_json_to_binary, \
+    convert_binary_to_json, is_binary_record_file
+from tvm.autotvm.record_merge import merge_records
 
 from test_autotvm_common import get_sample_task
 
@@ -83,7 +87,124 @@ def test_apply_history_best():
     assert str(x) == str(tsk.config_space.get(2))
 
 
+def test_binary_record():
+    temp = util.tempdir()
+    json_path = temp.relpath("temp.log")
+    bin_path = temp.relpath("temp.bin")
+
+    tsk, target = get_sample_task()
+    inputs = [MeasureInput(target, tsk, tsk.config_space.get(i)) for i in range(0, 10)]
+    results = [MeasureResult((0.1 * (10 - i), ), 0, 2.3, i) for i in range(0, 10)]
+    results[-1] = MeasureResult((RuntimeError("error"), ), MeasureErrorNo.RUNTIME_DEVICE, 2.3, 9)
+
+    with open(json_path, "w") as fo:
+        autotvm.callback.log_to_file(fo)(None, inputs, results)
+    convert_json_to_binary(json_path, bin_path)
+    assert is_binary_record_file(bin_path)
+    assert not is_binary_record_file(json_path)
+
+    # records survive the round trip
+    loaded = list(autotvm.record.load_from_file(bin_path))
+    assert len(loaded) == 10
+    for inp, (inp_2, res_2) in zip(inputs, loaded):
+        assert measure_str_key(inp) == measure_str_key(inp_2)
+    assert loaded[0][1].costs == results[0].costs
+
+    # the store is closed when the records are not all consumed
+    closed = []
+    close = BinaryRecordStore.close
+    BinaryRecordStore.close = lambda self: closed.append(close(self))
+    try:
+        records = autotvm.record.load_from_file(bin_path)
+        next(records)
+        records.close()
+    finally:
+        BinaryRecordStore.close = close
+    assert len(closed) == 1
+
+    # the best record is looked up from the index only
+    hist_best = ApplyHistoryBest(bin_path)
+    assert not hist_best.best_by_targetkey
+    x = hist_best.query(target, tsk.workload)
+    assert str(x) == str(tsk.config_space.get(8))
+
+    # append and reopen
+    cb = autotvm.callback.log_to_binary_file(bin_path)
+    cb(None, [MeasureInput(target, tsk, tsk.config_space.get(10))],
+       [MeasureResult((0.01, ), 0, 2.3, 10)])
+    store = BinaryRecordStore(bin_path)
+    assert len(store) == 11
+    inp, _ = store.best_by_targetkey(target.keys[0], tsk.workload)
+    assert str(inp.config) == str(tsk.config_space.get(10))
+
+    # a lost index is rebuilt from the data file
+    os.remove(bin_path + ".idx")
+    assert len(BinaryRecordStore(bin_path)) == 11
+
+    convert_binary_to_json(bin_path, json_path)
+    for (inp, res), (inp_2, res_2) in zip(autotvm.record.load_from_file(json_path),
+                                          BinaryRecordStore(bin_path)):
+        assert measure_str_key(inp) == measure_str_key(inp_2)
+        assert res.costs == res_2.costs
+
+
+def test_merge_records():
+    temp = util.tempdir()
+    tsk, target = get_sample_task()
+    tsk_2, _ = get_sample_task(64)
+
+    # each log has every config of both workloads, the costs differ between logs
+    for k in range(3):
+        inputs, results = [], []
+        for i in range(8):
+            for t in (tsk, tsk_2):
+                inputs.append(MeasureInput(target, t, t.config_space.get(i)))
+                results.append(MeasureResult((0.1 * i + 0.01 * k, ), 0, 2.3, k))
+        inputs.append(MeasureInput(target, tsk, tsk.config_space.get(9)))
+        results.append(MeasureResult((RuntimeError("error"), ),
+                                     MeasureErrorNo.RUNTIME_DEVICE, 2.3, k))
+        with open(temp.relpath("%d.log" % k), "w") as fo:
+            autotvm.callback.log_to_file(fo)(None, inputs, results)
+    convert_json_to_binary(temp.relpath("2.log"), temp.relpath("2.bin"))
+
+    out_path = temp.relpath("best.txt")
+    for files in [temp.temp_dir, [temp.relpath("0.log"), temp.relpath("1.log"),
+                                  temp.relpath("2.bin")]]:
+        # small runs and ranges to exercise spilling and splitting
+        stats = merge_records(files, out_path, top_k=3, num_workers=2,
+                              max_records=5, split_size=1000, max_open_runs=2)
+        records = list(autotvm.record.load_from_file(out_path))
+        assert len(records) == 6
+        for t in (tsk, tsk_2):
+            picked = [(inp.config.index, res.costs[0]) for inp, res in records
+                      if inp.task.workload == t.workload]
+            assert picked == [(0, 0.0), (1, 0.1), (2, 0.2)]
+        task_stats = stats["%s %s" % (target, tsk.name)]
+        assert task_stats["records"] == 51
+        assert task_stats["errors"] == 3
+        assert task_stats["workloads"] == 2
+        assert task_stats["output"] == 6
+
+    # records are picked per target key and per device model, and written once
+    target_m = tvm.target.create("llvm -model=m1")
+    model_path = temp.relpath("model.txt")
+    with open(model_path, "w") as fo:
+        autotvm.callback.log_to_file(fo)(
+            None, [MeasureInput(target_m, tsk, tsk.config_space.get(i)) for i in (3, 5, 6)],
+            [MeasureResult((cost, ), 0, 2.3, 0) for cost in (0.001, 0.5, 0.6)])
+    stats = merge_records([temp.relpath("0.log"), model_path], out_path, top_k=3)
+    records = list(autotvm.record.load_from_file(out_path))
+    picked = sorted((inp.target.model, inp.config.index) for inp, _ in records
+                    if inp.task.workload == tsk.workload)
+    assert picked == [("m1", 3), ("m1", 5), ("m1", 6), ("unknown", 0), ("unknown", 1)]
+    assert stats["%s %s" % (target, tsk.name)]["output"] == 5
+    assert stats["%s %s" % (target_m, tsk.name)]["output"] == 3
+    assert stats["%s %s" % (target_m, tsk.name)]["workloads"] == 1
+
+
 if __name__ == "__main__":
     test_load_dump()
     test_apply_history_best()
     test_file_io()
+    test_binary_record()
+    test_merge_records()
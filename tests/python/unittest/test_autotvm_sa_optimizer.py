@@ -0,0 +1,67 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Test the simulated annealing model optimizer"""
+import numpy as np
+
+from tvm.autotvm.tuner.model_based_tuner import CostModel, point2knob, knob2point, \
+    points2knobs, knobs2points
+from tvm.autotvm.tuner.sa_model_optimizer import SimulatedAnnealingOptimizer, random_walk_batch
+
+from test_autotvm_common import get_sample_task
+
+
+class DummyCostModel(CostModel):
+    """Prefer configs with large indexes"""
+    def predict(self, xs, output_margin=False):
+        return np.asarray(xs, dtype=np.float64)
+
+
+def test_knob_conversion():
+    dims = [3, 1, 4, 5]
+    points = np.arange(60)
+    knobs = points2knobs(points, dims)
+    for p in points:
+        assert list(knobs[p]) == point2knob(p, dims)
+        assert knob2point(knobs[p], dims) == p
+    assert (knobs2points(knobs, dims) == points).all()
+
+
+def test_random_walk_batch():
+    dims = [3, 1, 4, 5]
+    points = np.random.randint(0, 60, size=1000)
+    new_points = random_walk_batch(points, dims)
+    diff = points2knobs(points, dims) != points2knobs(new_points, dims)
+    assert (diff.sum(axis=1) == 1).all()
+    assert not diff[:, 1].any()
+
+
+def test_find_maximums():
+    task, _ = get_sample_task()
+    n = len(task.config_space)
+    opt = SimulatedAnnealingOptimizer(task, n_iter=50, parallel_size=16, log_interval=10)
+    exclusive = set(range(n - 4, n))
+    maximums = opt.find_maximums(DummyCostModel(), 8, exclusive)
+    assert len(maximums) == 8
+    assert len(set(maximums)) == 8
+    assert not exclusive & set(maximums)
+    assert list(maximums) == sorted(maximums, reverse=True)
+
+
+if __name__ == "__main__":
+    test_knob_conversion()
+    test_random_walk_batch()
+    test_find_maximums()
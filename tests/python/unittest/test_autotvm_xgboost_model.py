@@ -18,11 +18,14 @@ import time
 
 import numpy as np
 
+from tvm.contrib import util
+
 import tvm
 from tvm import te
 from tvm import autotvm
 from tvm.autotvm import MeasureInput, MeasureResult
 from tvm.autotvm.tuner.xgboost_cost_model import XGBoostCostModel
+from tvm.autotvm.tuner.model_based_tuner import FeatureStore
 
 from test_autotvm_common import get_sample_task, get_sample_records
 
@@ -51,7 +54,56 @@ def test_tuner():
     tuner.load_history(records)
 
 
+def test_feature_store():
+    store = FeatureStore(3, capacity=4)
+    rows = store.allocate([10, 11])
+    store.data[rows] = [[1, 1, 1], [2, 2, 2]]
+    store.commit(rows, [True, False])
+    feas = store.gather(store.lookup([11, 10]))
+    assert (feas == [[0, 0, 0], [1, 1, 1]]).all()
+
+    rows = store.allocate([12, 13])
+    store.commit(rows, [True, True])
+    # a full store evicts unpinned rows instead of dropping everything
+    rows = store.lookup([10])
+    store.commit(store.allocate([14, 15], pinned=rows), [True, True])
+    assert len(store) == 4
+    assert store.lookup([10])[0] >= 0
+    assert (store.gather(store.lookup([10])) == 1).all()
+
+
+def test_feature_extraction():
+    task, target = get_sample_task()
+    model = XGBoostCostModel(task, feature_type='itervar', loss_type='rank')
+    model.feature_cache_size = 16
+
+    indexes = np.arange(40)
+    feas = model._get_feature(indexes)
+    assert feas.shape[0] == 40
+    store = model.feature_cache.get_store('itervar')
+    assert len(store) <= 16
+    assert np.allclose(model._get_feature(indexes[:4]), feas[:4])
+
+
+def test_global_model():
+    task, target = get_sample_task()
+    records = get_sample_records(n=500)
+
+    global_model = XGBoostCostModel(None, feature_type='global', loss_type='rank')
+    assert global_model.fit_log(records, plan_size=32)
+    temp = util.tempdir()
+    global_model.save(temp.relpath("global.xgb"))
+
+    tuner = autotvm.tuner.XGBTuner(task)
+    tuner.load_global_model(temp.relpath("global.xgb"))
+    assert len(tuner.trials) > 0
+    assert tuner.cost_model.base_model is not None
+
+
 if __name__ == "__main__":
     test_fit()
     test_tuner()
+    test_feature_store()
+    test_feature_extraction()
+    test_global_model()
 
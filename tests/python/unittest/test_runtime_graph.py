@@ -15,6 +15,7 @@
 # specific language governing permissions and limitations
 # under the License.
 import tvm
+import tvm.testing
 from tvm import te
 import numpy as np
 import json
@@ -123,5 +124,93 @@ def test_graph_simple():
     check_remote()
     check_sharing()
 
+def test_graph_zero_copy():
+    if not tvm.runtime.enabled("llvm"):
+        print("Skip because llvm is not enabled")
+        return
+    from tvm import relay
+    x = relay.var("x", shape=(4, 8))
+    func = relay.Function([x], relay.exp(x) + relay.const(1.0))
+    graph, lib, _ = relay.build(tvm.IRModule.from_expr(func), "llvm")
+    mod = graph_runtime.create(graph, lib, tvm.cpu(0))
+
+    x_data = graph_runtime.empty_aligned((4, 8), "float32")
+    x_data[:] = np.random.uniform(size=(4, 8))
+    out = graph_runtime.empty_aligned((4, 8), "float32")
+    mod.set_input_zero_copy(x=x_data)
+    mod.set_output_zero_copy(0, out)
+    mod.run()
+    tvm.testing.assert_allclose(out, np.exp(x_data) + 1, rtol=1e-5)
+
+    # the bound buffers are used by the next run without setting them again
+    x_data[:] = 0
+    mod.run()
+    tvm.testing.assert_allclose(out, np.full((4, 8), 2), rtol=1e-5)
+    tvm.testing.assert_allclose(mod.get_output(0).asnumpy(), out, rtol=1e-5)
+
+    # misaligned or mismatching buffers are copied
+    unaligned = np.empty(4 * 8 + 1, "float32")
+    unaligned = unaligned[1:] if unaligned.ctypes.data % 128 == 0 else unaligned[:-1]
+    unaligned = unaligned.reshape((4, 8))
+    unaligned[:] = 1
+    out64 = np.zeros((4, 8), "float64")
+    mod.set_input_zero_copy(x=unaligned)
+    mod.set_output_zero_copy(0, out64)
+    mod.run()
+    tvm.testing.assert_allclose(out64, np.exp(unaligned) + 1, rtol=1e-5)
+
+    # copying set_input restores the runtime buffer
+    mod.set_input(x=np.zeros((4, 8), "float32"))
+    mod.run()
+    tvm.testing.assert_allclose(mod.get_output_view(0), np.full((4, 8), 2), rtol=1e-5)
+
+
+def test_inference_server():
+    if not tvm.runtime.enabled("llvm"):
+        print("Skip because llvm is not enabled")
+        return
+    from tvm import relay
+    from tvm.contrib import inference_server
+    assert inference_server.split_cores(2, [0, 1, 2, 3, 4]) == [[0, 1], [2, 3, 4]]
+    assert inference_server.split_cores(3, [0, 1]) is None
+
+    x = relay.var("x", shape=(4, 8))
+    w = relay.var("w", shape=(8,))
+    func = relay.Function([x, w], relay.add(x * relay.const(2.0), w))
+    graph, lib, _ = relay.build(tvm.IRModule.from_expr(func), "llvm")
+    w_data = np.random.uniform(size=(8,)).astype("float32")
+
+    with inference_server.InferenceServer(graph, lib, tvm.cpu(0), params={"w": w_data},
+                                          num_instances=2, max_latency_ms=50) as server:
+        assert server.batch_size is None
+        inputs = [np.random.uniform(size=(1 + i % 2, 8)).astype("float32")
+                  for i in range(16)]
+        futures = [server.submit(x=data) for data in inputs]
+        assert server.batch_size == 4
+        for data, future in zip(inputs, futures):
+            out, = future.result()
+            tvm.testing.assert_allclose(out, data * 2 + w_data, rtol=1e-5)
+
+        stats = server.stats()
+        assert stats["requests"] == 16
+        # concurrent requests were batched together
+        assert stats["mean_batch_size"] > 1.5
+        assert 0 < stats["p50_ms"] <= stats["p99_ms"]
+        assert stats["throughput"] > 0
+
+        try:
+            server.submit(x=np.zeros((5, 8), "float32"))
+            assert False
+        except ValueError:
+            pass
+    try:
+        server.submit(x=inputs[0])
+        assert False
+    except RuntimeError:
+        pass
+
+
 if __name__ == "__main__":
     test_graph_simple()
+    test_graph_zero_copy()
+    test_inference_server()
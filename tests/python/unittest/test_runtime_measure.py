@@ -20,6 +20,7 @@ import ctypes
 import tvm
 from tvm import te
 from tvm.contrib.util import tempdir
+from tvm.runtime.timing import summarize
 
 
 def test_min_repeat_ms():
@@ -59,6 +60,49 @@ def test_min_repeat_ms():
     assert ct > 10 + 2
 
 
+def test_timing_stats():
+    costs = [1.0, 1.01, 0.99, 1.0, 1.02, 0.98, 1.0, 5.0]
+    stats = summarize(costs)
+    assert stats.outliers == (7,)
+    assert stats.inliers == tuple(costs[:7])
+    assert abs(stats.mean - 1.0) < 1e-9
+    assert stats.median == 1.0
+    assert 0 < stats.cv < 0.05 and 0 < stats.rel_ci < 0.05
+    assert stats.p10 <= stats.median <= stats.p90
+
+    # a device slowing down by 20% over the measurement
+    stats = summarize([1.0 + 0.02 * i for i in range(10)])
+    assert stats.drift > 0.05
+    assert abs(summarize([1.0, 1.1, 1.0, 1.1, 1.0, 1.1]).drift) < 0.05
+
+
+def test_adaptive_time_evaluator():
+    n = 1024
+    A = te.placeholder((n,), name="A")
+    B = te.compute((n,), lambda i: A[i] + 1.0, name="B")
+    s = te.create_schedule(B.op)
+    func = tvm.build(s, [A, B])
+    a = tvm.nd.empty((n,), dtype="float32")
+    b = tvm.nd.empty((n,), dtype="float32")
+
+    ftimer = func.time_evaluator(func.entry_name, tvm.cpu(), number=10, repeat=3,
+                                 adaptive=True, target=0.5, max_repeat=30)
+    stats = ftimer(a, b)
+    assert len(stats.results) >= 3
+    assert stats.converged and stats.rel_ci <= 0.5
+
+    # an unreachable target stops at the repeat limit
+    ftimer = func.time_evaluator(func.entry_name, tvm.cpu(), number=1, repeat=4,
+                                 adaptive=True, target=0, criterion="cv",
+                                 max_time_ms=60000, max_repeat=10)
+    stats = ftimer(a, b)
+    assert len(stats.results) == 8
+    assert not stats.converged
+    assert stats.mean > 0 and stats.median > 0
+
+
 if __name__ == "__main__":
     test_min_repeat_ms()
+    test_timing_stats()
+    test_adaptive_time_evaluator()
 
@@ -16,7 +16,7 @@
 # under the License.
 import tvm
 from tvm import te
-from tvm.contrib import cc, util
+from tvm.contrib import cc, compile_cache, util
 import ctypes
 import os
 import sys
@@ -215,7 +215,76 @@ def test_combine_module_llvm():
 
 
 
+_link_count = [0]
+
+def _counting_create_shared(output, objects, **kwargs):
+    _link_count[0] += 1
+    cc.create_shared(output, objects, **kwargs)
+
+
+def _edited_create_shared(output, objects, **kwargs):
+    _link_count[0] += 1
+    assert objects
+    cc.create_shared(output, objects, **kwargs)
+
+# an edit of _counting_create_shared
+_edited_create_shared.__qualname__ = _counting_create_shared.__qualname__
+
+
+def test_export_library_cache():
+    """Test that export_library reuses the libraries of the same inputs."""
+    if not tvm.runtime.enabled("llvm"):
+        print("Skip because llvm is not enabled" )
+        return
+    nn = 12
+    A = te.placeholder((nn,), name='A')
+    B = te.compute(A.shape, lambda *i: A(*i) + 1.0, name='B')
+    s = te.create_schedule(B.op)
+    temp = util.tempdir()
+    cache_dir = temp.relpath("cache")
+    ctx = tvm.cpu(0)
+
+    def export(name, lib_name, fcompile=_counting_create_shared):
+        fadd = tvm.build(s, [A, B], "llvm", name=name)
+        path_dso = temp.relpath(lib_name)
+        fadd.export_library(path_dso, fcompile,
+                            cache_dir=cache_dir, num_workers=2)
+        m = tvm.runtime.load_module(path_dso)
+        a = tvm.nd.array(np.random.uniform(size=nn).astype(A.dtype), ctx)
+        b = tvm.nd.array(np.zeros(nn, dtype=A.dtype), ctx)
+        m[name](a, b)
+        np.testing.assert_equal(b.asnumpy(), a.asnumpy() + 1)
+
+    export("myadd", "lib0.so")
+    assert _link_count[0] == 1
+    # the same module is not linked again
+    export("myadd", "lib1.so")
+    assert _link_count[0] == 1
+    export("myadd2", "lib2.so")
+    assert _link_count[0] == 2
+    # nor is it linked by a stale library after the compile function changes
+    export("myadd", "lib3.so", _edited_create_shared)
+    assert _link_count[0] == 3
+
+    # the default fcompile compiles and caches the objects of C sources
+    c_cache_dir = temp.relpath("c_cache")
+    c_cache = compile_cache.CompileCache(c_cache_dir)
+    fadd = tvm.build(s, [A, B], "c", name="myadd")
+    for i in range(2):
+        path_dso = temp.relpath("libc%d.so" % i)
+        fadd.export_library(path_dso, cache_dir=c_cache_dir)
+        m = tvm.runtime.load_module(path_dso)
+        a = tvm.nd.array(np.random.uniform(size=nn).astype(A.dtype), ctx)
+        b = tvm.nd.array(np.zeros(nn, dtype=A.dtype), ctx)
+        m["myadd"](a, b)
+        np.testing.assert_equal(b.asnumpy(), a.asnumpy() + 1)
+    # the object and the library are built once, then copied from the cache
+    assert c_cache.stats(shared=True)["misses"] == 2
+    assert c_cache.stats(shared=True)["hits"] == 2
+
+
 if __name__ == "__main__":
     test_combine_module_llvm()
     test_device_module_dump()
     test_dso_module_load()
+    test_export_library_cache()
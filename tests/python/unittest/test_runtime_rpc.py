@@ -22,6 +22,8 @@ import stat
 import logging
 import time
 import multiprocessing
+import socket
+import threading
 
 import pytest
 import numpy as np
@@ -179,6 +181,62 @@ def test_rpc_file_exchange():
     rev = remote.download("dat.bin")
     assert(rev == blob)
 
+def test_rpc_chunked_file_exchange():
+    if not tvm.runtime.enabled("rpc"):
+        return
+    server = rpc.Server("localhost")
+    remote = rpc.connect(server.host, server.port)
+    temp = util.tempdir()
+    data = np.random.randint(0, 256, size=(1000,)).astype("uint8").tobytes()
+    with open(temp.relpath("dat.bin"), "wb") as fo:
+        fo.write(data)
+
+    sent = []
+    remote.upload(temp.relpath("dat.bin"), chunk_size=64,
+                  progress=lambda nbytes, total: sent.append(nbytes))
+    assert sent[-1] == 1000 and len(sent) == 16
+    assert remote.download("dat.bin", chunk_size=100) == bytearray(data)
+
+    # the same file is not uploaded again
+    sent = []
+    remote.upload(temp.relpath("dat.bin"), chunk_size=64,
+                  progress=lambda nbytes, total: sent.append(nbytes))
+    assert sent == [1000]
+
+    # resume an interrupted upload from the partial file
+    remote.upload(bytearray(data[:640]), "resume.bin.part", chunk_size=1024)
+    sent = []
+    remote.upload(bytearray(data), "resume.bin", chunk_size=64,
+                  progress=lambda nbytes, total: sent.append(nbytes))
+    assert sent[0] == 704
+    assert remote.download("resume.bin") == bytearray(data)
+
+    # download to a file, resuming from a partial file
+    with open(temp.relpath("out.bin.part"), "wb") as fo:
+        fo.write(data[:300])
+    remote.download("dat.bin", temp.relpath("out.bin"), chunk_size=64)
+    with open(temp.relpath("out.bin"), "rb") as fi:
+        assert fi.read() == data
+    assert not os.path.exists(temp.relpath("out.bin.part"))
+
+def test_rpc_upload_batch():
+    if not tvm.runtime.enabled("rpc"):
+        return
+    server = rpc.Server("localhost")
+    remote = rpc.connect(server.host, server.port)
+    temp = util.tempdir()
+    files = []
+    for i, size in enumerate([10, 300, 0, 2000, 50]):
+        files.append(temp.relpath("dat%d.bin" % i))
+        with open(files[-1], "wb") as fo:
+            fo.write(np.random.randint(0, 256, size=(size,)).astype("uint8").tobytes())
+
+    # the 2000 byte file is uploaded by itself, the others in batches
+    remote.upload_batch(files, chunk_size=512)
+    for path in files:
+        with open(path, "rb") as fi:
+            assert remote.download(os.path.basename(path)) == bytearray(fi.read())
+
 def test_rpc_remote_module():
     if not tvm.runtime.enabled("rpc"):
         return
@@ -429,6 +487,41 @@ def test_rpc_tracker_register():
 
     tracker.terminate()
 
+def test_rpc_message_framing():
+    from tvm.rpc import base
+    value = [base.TrackerCode.REQUEST, "key", None, True, 1.5, -(1 << 40),
+             {"shape": [1, 2], "blob": b"\x00\xff" * 100}]
+    sock0, sock1 = socket.socketpair()
+    base.sendmsg(sock0, value, binary=True)
+    assert base.recvmsg(sock1, binary=True) == value
+    base.sendjson(sock0, value[:-1])
+    assert base.recvjson(sock1) == value[:-1]
+    buf = bytearray(1 << 20)
+    # send from another thread as the data does not fit into the socket buffer
+    sender = threading.Thread(target=sock0.sendall, args=(bytes(range(256)) * 4096,))
+    sender.start()
+    base.recv_into(sock1, buf)
+    sender.join()
+    assert buf == bytes(range(256)) * 4096
+    sock0.close()
+    sock1.close()
+
+    # tracker with binary messages
+    tracker = Tracker('localhost', port=9000, port_end=10000)
+    device_key = 'test_device'
+    server = rpc.Server('localhost', port=9000, port_end=10000,
+                        key=device_key,
+                        tracker_addr=(tracker.host, tracker.port))
+    time.sleep(1)
+    client = rpc.connect_tracker(tracker.host, tracker.port, binary=True)
+    summary = client.summary()
+    assert summary['queue_info'][device_key]['free'] == 1
+    remote = client.request(device_key)
+    assert client.summary()['queue_info'][device_key]['free'] == 0
+    del remote
+    server.terminate()
+    tracker.terminate()
+
 def test_rpc_tracker_request():
     # test concurrent request
     tracker = Tracker('localhost', port=9000, port_end=10000)
@@ -473,6 +566,69 @@ def test_rpc_tracker_request():
     tracker.terminate()
 
 
+def test_rpc_tracker_fair_share():
+    from tvm.rpc.tracker import FairShareScheduler
+
+    class _Conn(object):
+        def __init__(self):
+            self.pending_matchkeys = set()
+
+    def _put(sched, conn, idx):
+        value = (conn, "localhost", 9000, "key:%d" % idx)
+        conn.pending_matchkeys.add(value[-1])
+        sched.put(value)
+
+    sched = FairShareScheduler("dev", shares={"b": 2})
+    granted = []
+    for _ in range(6):
+        sched.request("a", 0, lambda value: granted.append("a") or True)
+    for _ in range(6):
+        sched.request("b", 0, lambda value: granted.append("b") or True)
+    conns = [_Conn() for _ in range(3)]
+    for i, conn in enumerate(conns):
+        _put(sched, conn, i)
+    # "b" has twice the share of "a"
+    assert sorted(granted) == ["a", "b", "b"]
+    summary = sched.summary()
+    assert summary["busy"] == 3 and summary["free"] == 0 and summary["pending"] == 9
+    assert summary["users"]["b"]["active"] == 2
+
+    # the lease ends when the server reports itself free again
+    _put(sched, conns[0], 3)
+    assert len(granted) == 4
+    assert sched.summary()["users"]["a"]["granted"] + \
+        sched.summary()["users"]["b"]["granted"] == 4
+    assert 0 < sched.summary()["utilization"] <= 1
+
+    # devices of a closed server are removed
+    sched = FairShareScheduler("dev", lease_timeout=0.01)
+    conn = _Conn()
+    value = (conn, "localhost", 9000, "key:0")
+    conn.pending_matchkeys.add("key:0")
+    sched.put(value)
+    sched.remove(value)
+    assert sched.summary()["free"] == 0
+    sched.request("a", 0, lambda value: True)
+    assert sched.summary()["pending"] == 1
+    _put(sched, conn, 1)
+    assert sched.summary()["busy"] == 1
+    time.sleep(0.02)
+    # the lease expires, but the device stays busy until its server is free
+    summary = sched.summary()
+    assert summary["expired"] == 1 and summary["expired_busy"] == 1
+    assert summary["busy"] == 1 and summary["free"] == 0
+    # expired leases do not count against the user
+    assert summary["users"]["a"]["active"] == 0
+    sched.request("a", 0, lambda value: True)
+    assert sched.summary()["pending"] == 1
+    _put(sched, conn, 2)
+    summary = sched.summary()
+    assert summary["busy"] == 1 and summary["pending"] == 0
+    # only the new lease may have expired since
+    assert summary["expired_busy"] == summary["expired"] - 1
+    assert summary["users"]["a"]["granted"] == 2
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     test_rpc_echo()
@@ -482,9 +638,13 @@ if __name__ == "__main__":
     test_bigendian_rpc()
     test_rpc_remote_module()
     test_rpc_file_exchange()
+    test_rpc_chunked_file_exchange()
+    test_rpc_upload_batch()
     test_rpc_array()
     test_rpc_simple()
     test_local_func()
     test_rpc_tracker_register()
+    test_rpc_message_framing()
     test_rpc_tracker_request()
+    test_rpc_tracker_fair_share()
     test_rpc_large_array()